@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Jingshuonium Benchmark Runner
+
+Times world generation, saving/loading, physics, AI, particles and full frames
+in headless mode with a fixed random seed, writes the results to JSON and can
+compare them against an earlier run to catch regressions.
+
+    python benchmarks/run_benchmarks.py                          # run everything
+    python benchmarks/run_benchmarks.py -k worldgen              # only names containing 'worldgen'
+    python benchmarks/run_benchmarks.py --compare baseline.json  # fail on regressions
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SEED = 1234
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, 'benchmarks', 'results', 'latest.json')
+
+# Headless mode and the seed must be in place before main (and pygame) is imported.
+os.environ['JINGSHUONIUM_HEADLESS'] = '1'
+os.environ.setdefault('JINGSHUONIUM_SEED', str(DEFAULT_SEED))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, PROJECT_ROOT)
+
+import pygame
+import main
+from src.game.core import assets
+from src.game.systems.headless import default_input_script
+from src.game.world.block_index import BlockList
+from src.game.world import dungeon
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=5):
+    """Registers a benchmark. The decorated function does its setup and returns the callable to time."""
+    def register(setup):
+        BENCHMARKS.append({'name': name, 'setup': setup, 'repeat': repeat})
+        return setup
+    return register
+
+
+# --- Helpers ---
+def build_world(chunks=8, world_type='farm'):
+    """Generates a strip of chunks as a flat list of blocks."""
+    blocks = []
+    for chunk_x in range(-chunks // 2, chunks // 2):
+        blocks.extend(main.generate_chunk(chunk_x, world_type))
+    return blocks
+
+
+def build_game_state(blocks, areas=4):
+    """Wraps blocks in the game_state dict that save_game expects, copying them into several areas."""
+    player = main.PlayerController((0, 0))
+    block_entities = {(int(b.grid_pos.x), int(b.grid_pos.y)): {'type': 'chest', 'inventory': [None] * 27} for b in blocks[::200]}
+    area_names = ['farm', 'lakes', 'lumber', 'mines', 'plains'][:areas]
+    game_state = {
+        'player': player, 'blocks': blocks, 'block_entities': block_entities, 'generated_chunks': {0},
+        'time_of_day': 0, 'day': 1, 'difficulty': 'normal', 'money': 0, 'current_area': area_names[0], 'areas': {},
+        'block_entity_ticker': main.BlockEntityTicker(),
+    }
+    for name in area_names:
+        game_state['areas'][name] = {'blocks': blocks, 'enemies': [], 'block_entities': block_entities, 'player_pos': [0, 0], 'generated_chunks': {0}}
+    return game_state
+
+
+def build_floor(width=200, floor_y=20):
+    """A flat stone floor for physics and AI benchmarks."""
+    return [main.Voxel((x, y), 'stone') for x in range(-width // 2, width // 2) for y in range(floor_y, floor_y + 3)]
+
+
+def quiet(fn, *args):
+    """Calls fn with stdout silenced, for functions that print progress."""
+    with open(os.devnull, 'w') as devnull:
+        old_stdout, sys.stdout = sys.stdout, devnull
+        try:
+            return fn(*args)
+        finally:
+            sys.stdout = old_stdout
+
+
+# --- World Generation ---
+for _world_type in ('farm', 'plains', 'lumber', 'lakes'):
+    def _chunk_setup(world_type=_world_type):
+        return lambda: main.generate_chunk(0, world_type)
+    benchmark(f'worldgen.chunk.{_world_type}')(_chunk_setup)
+
+
+@benchmark('worldgen.dungeon')
+def bench_dungeon():
+    return main.generate_dungeon
+
+
+@benchmark('worldgen.dungeon_layout_512x512', repeat=3)
+def bench_dungeon_layout():
+    return lambda: dungeon.generate_layout(512, 512)
+
+
+@benchmark('worldgen.farm')
+def bench_farm():
+    return main.generate_farm
+
+
+@benchmark('world.new_day', repeat=3)
+def bench_new_day():
+    game_state = {'day': 1, 'areas': {}}
+    for name in main.AREA_RESOURCES:
+        game_state['areas'][name] = {'blocks': BlockList(build_world(world_type=name)), 'block_entities': {}}
+    return lambda: quiet(main.process_new_day, game_state)
+
+
+# --- Save / Load ---
+@benchmark('io.save_game', repeat=3)
+def bench_save():
+    game_state = build_game_state(build_world())
+    path = os.path.join(tempfile.mkdtemp(), 'bench_world.json')
+    return lambda: quiet(main.save_game, game_state, path)
+
+
+@benchmark('io.load_game', repeat=3)
+def bench_load():
+    path = os.path.join(tempfile.mkdtemp(), 'bench_world.json')
+    quiet(main.save_game, build_game_state(build_world()), path)
+    return lambda: quiet(main.load_game, path)
+
+
+# --- Spatial Queries ---
+@benchmark('spatial_grid.rebuild')
+def bench_grid_rebuild():
+    blocks = build_world()
+    grid = main.SpatialGrid(cell_size=assets.BLOCK_SIZE * 4)
+    return lambda: grid.rebuild(blocks)
+
+
+@benchmark('spatial_grid.query_1000')
+def bench_grid_query():
+    blocks = build_world()
+    grid = main.SpatialGrid(cell_size=assets.BLOCK_SIZE * 4)
+    grid.rebuild(blocks)
+    rects = [blocks[random.randrange(len(blocks))].rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2) for _ in range(1000)]
+    return lambda: [grid.get_nearby(rect) for rect in rects]
+
+
+@benchmark('lighting.update_lighting')
+def bench_lighting():
+    blocks = build_world(chunks=2)
+    return lambda: main.update_lighting(blocks, blocks)
+
+
+@benchmark('fov.calculate_fov')
+def bench_fov():
+    blocks, _, _ = main.generate_dungeon()
+    solid = {tuple(b.grid_pos) for b in blocks if b.is_solid}
+    player_pos = pygame.Vector2(30 * assets.BLOCK_SIZE, 30 * assets.BLOCK_SIZE)
+    return lambda: [main.calculate_fov(player_pos, solid, 15) for _ in range(10)]
+
+
+# --- Entities ---
+for _enemy_count in (50, 200):
+    def _enemy_setup(count=_enemy_count):
+        blocks = build_floor()
+        grid = main.SpatialGrid(cell_size=assets.BLOCK_SIZE * 4)
+        grid.rebuild(blocks)
+        player = main.PlayerController((0, 17 * assets.BLOCK_SIZE))
+        enemies = [main.EnemyController((random.uniform(-90, 90) * assets.BLOCK_SIZE, 17 * assets.BLOCK_SIZE), random.choice(['zombie', 'zombie_brute', 'crawler'])) for _ in range(count)]
+        particles = []
+        dt = 1.0 / 60
+
+        def run():
+            for _ in range(60):
+                for enemy in enemies:
+                    enemy_blocks = grid.get_nearby(enemy.rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2))
+                    enemy.update(dt, enemy_blocks, player, particles, 0, set(), 'normal')
+        return run
+    benchmark(f'enemies.update_{_enemy_count}x60')(_enemy_setup)
+
+
+@benchmark('enemies.tiered_2000x60')
+def bench_enemy_tiers():
+    """A large population spread over a wide world, updated through the activity tiers as update_simulation does."""
+    blocks = build_floor(width=2000)
+    grid = main.SpatialGrid(cell_size=assets.BLOCK_SIZE * 4)
+    grid.rebuild(blocks)
+    player = main.PlayerController((0, 17 * assets.BLOCK_SIZE))
+    enemies = [main.EnemyController((random.uniform(-990, 990) * assets.BLOCK_SIZE, 17 * assets.BLOCK_SIZE), random.choice(['zombie', 'zombie_brute', 'crawler'])) for _ in range(2000)]
+    activity = main.EnemyActivity(main.config.ENEMY_NEAR_RADIUS * assets.BLOCK_SIZE, main.config.ENEMY_MID_RADIUS * assets.BLOCK_SIZE, main.config.ENEMY_MID_INTERVAL)
+    particles = []
+    dt = 1.0 / 60
+
+    def run():
+        for _ in range(60):
+            for enemy, enemy_dt in activity.schedule(enemies, player.pos, dt):
+                enemy_blocks = grid.get_nearby(enemy.rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2))
+                enemy.update(enemy_dt, enemy_blocks, player, particles, 0, set(), 'normal')
+    return run
+
+
+@benchmark('enemies.spawn_wave_50')
+def bench_enemy_spawn():
+    positions = [(random.uniform(-90, 90) * assets.BLOCK_SIZE, 17 * assets.BLOCK_SIZE) for _ in range(50)]
+    return lambda: [main.EnemyController(pos, random.choice(['zombie', 'zombie_brute', 'crawler'])) for pos in positions]
+
+
+@benchmark('enemies.draw_200x60')
+def bench_enemy_draw():
+    """200 on-screen enemies, half facing right and a quarter flashing from a hit."""
+    surface = pygame.Surface(main.config.WINDOW_SIZE)
+    camera_offset = pygame.Vector2(0, 0)
+    enemies = [main.EnemyController((random.uniform(0, main.config.WINDOW_SIZE[0]), random.uniform(0, main.config.WINDOW_SIZE[1])), random.choice(['zombie', 'zombie_brute', 'crawler'])) for _ in range(200)]
+    for i, enemy in enumerate(enemies):
+        enemy.facing = 1 if i % 2 else -1
+        enemy.damage_flash_timer = 1e9 if i % 4 == 0 else 0
+
+    def run():
+        for _ in range(60):
+            for enemy in enemies:
+                enemy.draw(surface, camera_offset)
+    return run
+
+
+@benchmark('enemies.flow_field_dungeon_x10')
+def bench_flow_field():
+    """Ten full searches from different player tiles in a 96x96 dungeon, as if the player moved ten times."""
+    layout = dungeon.generate_layout(96, 96)
+    blocks = BlockList(main.Voxel((x, y), block_type) for x, y, block_type in layout.solid_cells())
+    standing = [(x, y) for x in range(96) for y in range(95) if not layout.is_solid(x, y) and layout.is_solid(x, y + 1)]
+    rects = [pygame.Rect(x * assets.BLOCK_SIZE + 4, (y + 1) * assets.BLOCK_SIZE - 56, 24, 56) for x, y in random.sample(standing, 10)]
+    field = main.FlowField(main.config.FLOW_FIELD_RADIUS)
+
+    def run():
+        for rect in rects:
+            field.update(rect, blocks)
+    return run
+
+
+@benchmark('horde.update_1000x60')
+def bench_horde():
+    """The array-backed horde on the same floor as the enemy benchmarks, five times the largest of them."""
+    if not main.HAS_NUMPY:
+        return lambda: None
+    horde = main.Horde()
+    horde.follow_blocks(BlockList(build_floor()))
+    for _ in range(1000):
+        horde.spawn((random.uniform(-90, 90) * assets.BLOCK_SIZE, 17 * assets.BLOCK_SIZE), random.choice(['zombie', 'zombie_brute', 'crawler']))
+    player = main.PlayerController((0, 17 * assets.BLOCK_SIZE))
+    particles = []
+    dt = 1.0 / 60
+
+    def run():
+        for _ in range(60):
+            horde.update(dt, player, particles)
+    return run
+
+
+@benchmark('particles.flood_2000x60')
+def bench_particles():
+    blocks = build_floor()
+    grid = main.SpatialGrid(cell_size=assets.BLOCK_SIZE * 4)
+    grid.rebuild(blocks)
+    particles = []
+    for i in range(200):
+        main.create_explosion_particles(particles, (random.uniform(-50, 50) * assets.BLOCK_SIZE, 10 * assets.BLOCK_SIZE), assets.textures['stone'], 10)
+    surface = pygame.Surface(main.config.WINDOW_SIZE)
+    camera_offset = pygame.Vector2(-main.config.WINDOW_SIZE[0] / 2, 0)
+    dt = 1.0 / 60
+
+    def run():
+        for _ in range(60):
+            for particle in particles:
+                particle.update(dt, grid)
+            main.draw_sprites(surface, particles, camera_offset)
+    return run
+
+
+# --- Full Frames ---
+@benchmark('game_loop.frames_120', repeat=3)
+def bench_game_loop():
+    game_data = quiet(main.new_world)
+    return lambda: main.game_loop(game_data, max_ticks=120, input_script=default_input_script(120))
+
+
+# --- Runner ---
+def run_benchmark(bench, seed, repeat=None):
+    """Runs one benchmark and returns its timing summary in milliseconds."""
+    samples = []
+    for i in range(repeat or bench['repeat']):
+        # Reseed before setup so every repeat (and every run) sees the same world.
+        random.seed(seed + i)
+        fn = bench['setup']()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': statistics.median(samples), 'min_ms': min(samples), 'mean_ms': statistics.mean(samples),
+        'stdev_ms': statistics.stdev(samples) if len(samples) > 1 else 0.0, 'repeat': len(samples),
+    }
+
+
+def git_revision():
+    """Returns the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Prints the change against a baseline run and returns the names that got slower than the threshold allows."""
+    regressions = []
+    print(f"\n{'benchmark':<32}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            print(f"{name:<32}{'-':>12}{result['median_ms']:>10.2f}ms{'new':>10}")
+            continue
+        change = (result['median_ms'] - old['median_ms']) / max(old['median_ms'], 1e-9)
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<32}{old['median_ms']:>10.2f}ms{result['median_ms']:>10.2f}ms{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Run the Jingshuonium performance benchmarks.")
+    parser.add_argument('-k', '--filter', default='', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument('--compare', metavar='BASELINE', help="Compare against an earlier results file and exit 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Allowed slowdown before a benchmark counts as a regression (default 0.15 = 15%%)")
+    parser.add_argument('--repeat', type=int, help="Override the number of repeats per benchmark")
+    parser.add_argument('--seed', type=int, default=int(os.environ['JINGSHUONIUM_SEED']), help="Base random seed")
+    parser.add_argument('--list', action='store_true', help="List benchmark names and exit")
+    args = parser.parse_args()
+
+    selected = [b for b in BENCHMARKS if args.filter in b['name']]
+    if args.list:
+        for bench in selected: print(bench['name'])
+        return 0
+
+    # Read the baseline first, it may well be the file this run is about to overwrite.
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+
+    results = {}
+    for bench in selected:
+        result = run_benchmark(bench, args.seed, args.repeat)
+        results[bench['name']] = result
+        print(f"{bench['name']:<32}{result['median_ms']:>10.2f}ms  (min {result['min_ms']:.2f}ms, stdev {result['stdev_ms']:.2f}ms, n={result['repeat']})")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'git_revision': git_revision(), 'seed': args.seed,
+            'python': platform.python_version(), 'pygame': pygame.version.ver, 'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -6,11 +6,20 @@ import os
 # This ensures that modules like 'src' can be found regardless of how the script is run.
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Headless mode has to be known before config is read and pygame starts up.
+if '--headless' in sys.argv:
+    os.environ['JINGSHUONIUM_HEADLESS'] = '1'
+
 from src.game.core import config
 
+if config.HEADLESS:
+    # SDL's dummy drivers give us a display surface and mixer without a screen or sound card.
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
 # --- Initialization ---
-# This block must come BEFORE other game module imports (like assets)
-# because they rely on the display mode being set.
+# Textures are built lazily and converted to the display format when first used,
+# so the display mode is set up before anything can ask for one.
 pygame.init()
 screen = pygame.display.set_mode(tuple(config.WINDOW_SIZE))
 pygame.display.set_caption(config.WINDOW_TITLE)
@@ -18,8 +27,13 @@ clock = pygame.time.Clock()
 
 from src.game.core import assets
 from src.game.core import definitions
+from src.game.core.atlas import texture_atlas
+from src.game.core.sprite_cache import DAMAGE_FLASH, enemy_sprites
 import math
 import json
+import time
+import copy
+import itertools
 from perlin_noise import PerlinNoise
 import random
 from src.game.ui.inventory import PlayerInventory
@@ -31,6 +45,18 @@ from src.game.ui.furnace_ui import FurnaceUI
 from src.game.ui.hud import Hotbar, HealthBar, TimeDisplay
 from src.game.ui.menu_utils import Button
 from src.game.entities.player import PlayerController
+from src.game.systems.timestep import FixedTimestep
+from src.game.systems.headless import default_input_script
+from src.game.systems.profiler import profiler
+from src.game.systems.watchdog import SpikeWatchdog
+from src.game.systems.block_entities import BlockEntityTicker
+from src.game.systems.scheduler import TaskScheduler
+from src.game.systems.activity import EnemyActivity
+from src.game.systems.horde import HAS_NUMPY, Horde
+from src.game.systems.flowfield import FlowField
+from src.game.world.block_index import BlockList, track_area_blocks
+from src.game.world import dungeon
+from src.game.world.streaming import DungeonStreamer
 
 # --- Placeholder Definitions ---
 # These are added to resolve NameErrors for features that are not yet fully implemented.
@@ -98,38 +124,62 @@ class MapMenu:
 
 def save_game(game_state, save_file_name="world.json"):
     """Saves the current game state to a file."""
+    for _ in save_game_steps(game_state, save_file_name): pass
+
+def save_game_steps(game_state, save_file_name="world.json"):
+    """save_game as a scheduler task: snapshots one area per step, then writes the JSON a slice at a time."""
+    inventory = game_state['player'].inventory
     player_data = {
         'pos': [game_state['player'].pos.x, game_state['player'].pos.y],
         'health': game_state['player'].health,
-        'inventory': game_state['player'].inventory.slots,
-        'armor_slot': game_state['player'].inventory.armor_slot
+        # Copies, since the player keeps playing while the file is written
+        'inventory': [dict(slot) if slot else None for slot in inventory.slots],
+        'armor_slot': dict(inventory.armor_slot) if inventory.armor_slot else None
     }
     
+    # Brings the current area's entry up to date with the live world. It's updated in place rather than replaced,
+    # since saves now run alongside play: a day rollover in progress holds this dict, and it keeps its other keys
+    # (resource_counts) too.
     current_area_name = game_state['current_area']
-    game_state['areas'][current_area_name] = {
+    game_state['areas'].setdefault(current_area_name, {}).update({
         'blocks': game_state['blocks'], 'enemies': [], 'block_entities': game_state['block_entities'],
         'player_pos': list(game_state['player'].pos), 'generated_chunks': game_state['generated_chunks']
-    }
+    })
 
     serializable_areas = {}
     for area_name, area_data in game_state['areas'].items():
-        area_blocks_data = [{'pos': [b.grid_pos.x, b.grid_pos.y], 'type': b.type, 'layer': b.layer} for b in area_data['blocks']]
-        area_be_data = {f"{pos[0]},{pos[1]}": entity for pos, entity in area_data['block_entities'].items()}
-        serializable_areas[area_name] = {'blocks': area_blocks_data, 'block_entities': area_be_data, 'player_pos': area_data['player_pos']}
+        area_blocks, area_blocks_data = list(area_data['blocks']), []
+        for start in range(0, len(area_blocks), SAVE_BLOCKS_PER_STEP):
+            area_blocks_data.extend({'pos': [b.grid_pos.x, b.grid_pos.y], 'type': b.type, 'layer': b.layer} for b in area_blocks[start:start + SAVE_BLOCKS_PER_STEP])
+            yield
+        area_be_data = {f"{pos[0]},{pos[1]}": copy.deepcopy(entity) for pos, entity in area_data['block_entities'].items()}
+        serializable_areas[area_name] = {'blocks': area_blocks_data, 'block_entities': area_be_data, 'player_pos': list(area_data['player_pos'])}
+        yield
 
     world_data = {
-        'player': player_data, 'time_of_day': game_state['time_of_day'], 'day': game_state['day'],
+        'player': player_data, 'time_of_day': game_state['time_of_day'], 'day': game_state['day'], 'world_time': game_state['block_entity_ticker'].world_time,
         'difficulty': game_state['difficulty'], 'money': game_state['money'], 'current_area': game_state['current_area'],
         'areas': serializable_areas
     }
 
     try:
-        with open(save_file_name, 'w') as f:
-            json.dump(world_data, f, indent=4)
+        # Written next to the save and swapped in at the end, so a half-written file never replaces a good one
+        tmp_file_name = save_file_name + '.tmp'
+        with open(tmp_file_name, 'w') as f:
+            pieces = json.JSONEncoder(indent=4).iterencode(world_data)
+            while True:
+                batch = ''.join(itertools.islice(pieces, SAVE_PIECES_PER_STEP))
+                if not batch: break
+                f.write(batch)
+                yield
+        os.replace(tmp_file_name, save_file_name)
         print(f"Game saved to {save_file_name}")
     except Exception as e:
         print(f"Error saving game: {e}")
 
+SAVE_BLOCKS_PER_STEP = 2000 # Blocks snapshotted per scheduler step
+SAVE_PIECES_PER_STEP = 2000 # JSON fragments written per scheduler step
+
 def load_game(save_file_name="world.json"):
     """Loads the game state from a file."""
     if not os.path.exists(save_file_name):
@@ -148,7 +198,7 @@ def load_game(save_file_name="world.json"):
 
         areas = {}
         for area_name, area_data in data.get('areas', {}).items():
-            area_blocks = [Voxel(b['pos'], b['type'], b.get('layer', 1)) for b in area_data['blocks']]
+            area_blocks = BlockList(Voxel(b['pos'], b['type'], b.get('layer', 1)) for b in area_data['blocks'])
             area_be = {tuple(map(int, pos_str.split(','))): entity for pos_str, entity in area_data.get('block_entities', {}).items()}
             areas[area_name] = {'blocks': area_blocks, 'enemies': [], 'block_entities': area_be, 'player_pos': area_data['player_pos'], 'generated_chunks': {0}}
 
@@ -167,9 +217,10 @@ def load_game(save_file_name="world.json"):
         enemies, time_of_day, day = [], data['time_of_day'], data.get('day', 1)
         generated_chunks = set(areas.get(current_area, {}).get('generated_chunks', {0}))
         difficulty, money = data.get('difficulty', 'normal'), data.get('money', 0)
+        world_time = data.get('world_time', 0.0)
 
         print(f"Game loaded from {save_file_name}")
-        return blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty, day, money, current_area, areas
+        return blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty, day, money, current_area, areas, world_time
 
     except Exception as e:
         print(f"Error loading game: {e}")
@@ -220,99 +271,302 @@ def generate_farm():
     block_entities[(house_x + 8, house_y - 1)] = {'type': 'shipping_bin', 'inventory': [None] * 27}
     return blocks, enemies, block_entities
 
-def game_loop(initial_data, save_file_name="world.json"):
-    """Main loop of the game."""
+def update_simulation(game_state, spatial_grid, hotbar, dt, mouse_pos, world_mouse_pos, keys=None):
+    """Advances the world by one fixed simulation tick."""
+    player = game_state['player']
+    particles = game_state['particles']
+    enemies = game_state['enemies']
+    horde = game_state['horde']
+
+    with profiler.scope('sim.player'):
+        nearby_blocks = spatial_grid.get_nearby(player.rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2))
+        targets = enemies + horde.enemies_in(player.rect.inflate(assets.BLOCK_SIZE * 8, assets.BLOCK_SIZE * 8)) if horde else enemies
+        player.update(dt, nearby_blocks, game_state['blocks'], game_state['block_entities'], spatial_grid, mouse_pos, hotbar.get_selected_item_type(), world_mouse_pos, targets, particles, keys=keys)
+
+    # --- Day Cycle ---
+    # Streamed dungeons are in permanent day (see new_dungeon); elsewhere the clock runs and rolls over at midnight
+    if game_state['streamer'] is None:
+        game_state['time_of_day'] += dt
+        if game_state['time_of_day'] >= definitions.DAY_NIGHT_DURATION:
+            game_state['time_of_day'] -= definitions.DAY_NIGHT_DURATION
+            end_of_day(game_state)
+
+    streamed = False
+    streamer = game_state['streamer']
+    if streamer is not None:
+        with profiler.scope('sim.streaming'):
+            # Changes the block list, grid and enemy list in place when the player crosses into another section,
+            # and sends enemies that wander out of the loaded sections back to sleep
+            center = streamer.center
+            streamed = streamer.update(player.pos, game_state['blocks'], enemies, spatial_grid, horde)
+        if streamer.center != center and horde is not None:
+            horde.follow_blocks(game_state['blocks']) # The grid's box has to cover the newly loaded sections
+
+    if enemies or horde:
+        with profiler.scope('sim.flow_field'):
+            # Searches again only when the player stands on a new tile or the blocks change
+            game_state['flow_field'].update(player.rect, game_state['blocks'])
+
+    # Darkness mode's enemies freeze in daylight and in the player's light, and rush everywhere else
+    darkness = sky_darkness(game_state['time_of_day'])
+    lit_tiles = player_light(game_state, player) if game_state['difficulty'] == 'darkness' else frozenset()
+
+    with profiler.scope('sim.enemies'):
+        # Near enemies update every tick, mid-range ones every few ticks and far ones sleep until the player comes back
+        activity = game_state['enemy_activity']
+        for enemy, enemy_dt in activity.schedule(enemies, player.pos, dt):
+            enemy_blocks = spatial_grid.get_nearby(enemy.rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2))
+            enemy.update(enemy_dt, enemy_blocks, player, particles, darkness, lit_tiles, game_state['difficulty'], game_state['flow_field'])
+        game_state['enemies'] = [e for e in enemies if not e.is_dying]
+        if streamed or len(game_state['enemies']) != len(enemies):
+            activity.retain(game_state['enemies'])
+
+    if horde:
+        with profiler.scope('sim.horde'):
+            horde.sweep()
+            speed = horde.light_speed(darkness, lit_tiles) if game_state['difficulty'] == 'darkness' else 1.0
+            horde.update(dt, player, particles, speed, game_state['flow_field'])
+
+    with profiler.scope('sim.projectiles'):
+        for projectile in game_state['projectiles']:
+            targets = game_state['enemies']
+            if horde:
+                targets = targets + horde.enemies_in(pygame.Rect(projectile.pos.x - assets.BLOCK_SIZE, projectile.pos.y - assets.BLOCK_SIZE, assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2))
+            projectile.update(dt, spatial_grid, targets, particles)
+        game_state['projectiles'] = [p for p in game_state['projectiles'] if p.active]
+
+        for staff in game_state['thrown_staffs']:
+            targets = game_state['enemies'] + horde.enemies_in(staff.rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2)) if horde else game_state['enemies']
+            staff.update(dt, spatial_grid, targets, player, particles, game_state['camera_offset'], config.WINDOW_SIZE)
+        game_state['thrown_staffs'] = [s for s in game_state['thrown_staffs'] if s.active]
+
+    with profiler.scope('sim.particles'):
+        for particle in particles:
+            particle.update(dt, spatial_grid)
+        game_state['particles'] = [p for p in particles if p.active]
+
+    with profiler.scope('sim.block_entities'):
+        game_state['block_entity_ticker'].update(game_state['block_entities'], dt)
+
+    # Improved camera smoothing with pixel alignment to reduce jittering
+    target_x = player.rect.centerx - config.WINDOW_SIZE[0] / 2
+    target_y = player.rect.centery - config.WINDOW_SIZE[1] / 2
+    
+    # 加强防抖动死区 - 只有在玩家真正移动时才移动相机
+    dx = target_x - game_state['camera_offset'].x
+    dy = target_y - game_state['camera_offset'].y
+    
+    # 更严格的死区检测，结合玩家速度信息
+    camera_threshold = 2.0 if abs(player.vel.x) < 0.1 and abs(player.vel.y) < 0.1 else 1.0
+    
+    # 只有在移动足够大且玩家确实在移动时才更新相机
+    if abs(dx) > camera_threshold:
+        game_state['camera_offset'].x += dx * 0.15
+    if abs(dy) > camera_threshold:
+        game_state['camera_offset'].y += dy * 0.15
+    
+    # 强制整数化相机偏移，完全消除亚像素渲染
+    game_state['camera_offset'].x = round(game_state['camera_offset'].x)
+    game_state['camera_offset'].y = round(game_state['camera_offset'].y)
+
+def spike_context(game_state, frame_time):
+    """Describes the world at the moment of a frame-time spike, for watchdog snapshots."""
+    player = game_state['player']
+    return {
+        'area': game_state['current_area'], 'day': game_state['day'], 'time_of_day': round(game_state['time_of_day'], 1),
+        'blocks': len(game_state['blocks']), 'block_entities': len(game_state['block_entities']), 'enemies': len(game_state['enemies']),
+        'horde': len(game_state['horde']) if game_state['horde'] else 0,
+        'particles': len(game_state['particles']), 'projectiles': len(game_state['projectiles']),
+        'player_pos': (round(player.pos.x), round(player.pos.y)), 'active_ui': type(game_state['active_ui']).__name__ if game_state['active_ui'] else None,
+        'paused': game_state['paused'], 'previous_frame_ms': round(frame_time * 1000, 1),
+    }
+
+def game_loop(initial_data, save_file_name="world.json", max_ticks=None, input_script=None, streamer=None):
+    """Main loop of the game. With max_ticks set it returns the game state after that many simulation ticks.
+
+    streamer is a DungeonStreamer for worlds (dungeons) whose sections are loaded around the player.
+    """
     if len(initial_data) == 7: # New world
         blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty = initial_data
-        day, money, current_area = 1, 0, 'farm'
+        day, money, current_area, world_time = 1, 0, 'farm', 0.0
         areas = {'farm': {'blocks': blocks, 'enemies': enemies, 'block_entities': block_entities, 'player_pos': list(player.pos), 'generated_chunks': generated_chunks}}
     else: # Loaded world
-        blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty, day, money, current_area, areas = initial_data
+        blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty, day, money, current_area, areas, world_time = initial_data
+    # Area block lists index themselves by type and position as blocks change, for day rollover and resource spawning
+    for area_data in areas.values():
+        track_area_blocks(area_data)
+    blocks = areas[current_area]['blocks']
 
     game_state = {
         'blocks': blocks, 'player': player, 'enemies': enemies, 'block_entities': block_entities, 'time_of_day': time_of_day, 'day': day,
         'generated_chunks': generated_chunks, 'difficulty': difficulty, 'money': money, 'current_area': current_area, 'areas': areas,
         'projectiles': [], 'thrown_staffs': [], 'particles': [], 'camera_offset': pygame.Vector2(0, 0), 'running': True, 'paused': False,
         'active_ui': None, 'held_item': None, 'breaking_block_pos': None, 'break_start_time': 0, 'last_music_track': None,
+        'block_entity_ticker': BlockEntityTicker(config.BLOCK_ENTITY_TICK_RATE, world_time),
+        'tasks': TaskScheduler(config.TASK_BUDGET_MS), # Long jobs (day rollover, saves, lighting) run a slice per frame
+        'save_file': save_file_name,
+        'streamer': streamer,
+        # Common enemies, simulated as arrays (needs NumPy); streamed dungeons load theirs into it
+        'horde': Horde() if config.HORDE_ENABLED and HAS_NUMPY else None,
+        'flow_field': FlowField(config.FLOW_FIELD_RADIUS, config.FLOW_FIELD_INTERVAL), # Shared path toward the player for chasing enemies
+        'enemy_activity': EnemyActivity(config.ENEMY_NEAR_RADIUS * assets.BLOCK_SIZE, config.ENEMY_MID_RADIUS * assets.BLOCK_SIZE, config.ENEMY_MID_INTERVAL),
     }
+    # Furnaces keep working while their area isn't loaded; bring the current area's up to date before the first frame.
+    game_state['block_entity_ticker'].catch_up(game_state['block_entities'])
     
     hotbar, health_bar, time_display, pause_menu = Hotbar(player.inventory), HealthBar(player), TimeDisplay(), PauseMenu()
     inventory_ui = InventoryUI(player.inventory)
     spatial_grid = SpatialGrid(cell_size=assets.BLOCK_SIZE * 4)
-    spatial_grid.rebuild(game_state['blocks'] + game_state['enemies'])
+    if streamer is not None:
+        # Load the sections around the player, with their common enemies going into the horde
+        streamer.update(player.pos, game_state['blocks'], game_state['enemies'], spatial_grid, game_state['horde'])
+    # Only static blocks go in the grid; moving enemies would leave stale cells behind.
+    spatial_grid.rebuild(game_state['blocks'])
+    if game_state['horde'] is not None:
+        game_state['horde'].follow_blocks(game_state['blocks']) # Mining and placing blocks keeps its collision grid current
+    begin_lighting(game_state) # Shades the area over the first frames instead of before the first one
+
+    # The simulation runs at a fixed rate; rendering interpolates between the last two ticks.
+    timestep = FixedTimestep(config.SIMULATION_HZ, config.MAX_SIMULATION_STEPS)
+    prev_camera_offset = game_state['camera_offset'].copy()
+    prev_player_pos = player.pos.copy()
+    watchdog = SpikeWatchdog(config.SPIKE_THRESHOLD_MS, config.SPIKE_HISTORY_FRAMES, config.PROFILE_DIR, config.SPIKE_MAX_SNAPSHOTS, config.SPIKE_PROFILE_FRAMES, profile_window=config.SPIKE_PROFILE_WINDOW)
 
     while game_state['running']:
-        dt = clock.tick(60) / 1000.0
-        # Clamp dt to prevent large jumps that can cause jittering
-        dt = min(dt, 1.0/30.0)  # Limit to minimum 30 FPS equivalent
+        if max_ticks is not None and timestep.tick_count >= max_ticks:
+            return game_state
+        if config.HEADLESS:
+            # Headless runs step exactly one tick per frame, as fast as the machine allows.
+            clock.tick()
+            frame_time = timestep.dt
+        else:
+            frame_time = clock.tick(config.RENDER_FPS_CAP) / 1000.0
+        profiler.begin_frame()
+        watchdog.begin_frame()
+        if input_script:
+            for event in input_script.events_at(timestep.tick_count): pygame.event.post(event)
         
         mouse_pos, world_mouse_pos = pygame.mouse.get_pos(), pygame.Vector2(pygame.mouse.get_pos()) + game_state['camera_offset']
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: game_state['running'] = False
+        with profiler.scope('input'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: game_state['running'] = False
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and profiler.enabled:
+                    if not profiler.recording:
+                        profiler.start_recording()
+                    else:
+                        profiler.stop_recording()
+                        print("Profile written to {} and {}".format(*profiler.export(config.PROFILE_DIR)))
+                    continue
             
-            hotbar.handle_input(event)
-
-            if game_state['paused']:
-                result = pause_menu.handle_input(event)
-                if result == "resume": game_state['paused'] = False
-                elif result == "quit": save_game(game_state, save_file_name); return
-                continue
-
-            if game_state['active_ui']:
-                game_state['held_item'] = game_state['active_ui'].handle_input(event, game_state['held_item'])
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-                    game_state['held_item'] = game_state['active_ui'].toggle(game_state['held_item'])
-                    if not game_state['active_ui'].is_open:
-                        game_state['active_ui'] = None
-                continue
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    game_state['paused'] = True
-                elif event.key == pygame.K_e:
-                    if not game_state['active_ui']:
-                        game_state['active_ui'] = inventory_ui
-                    game_state['held_item'] = game_state['active_ui'].toggle(game_state['held_item'])
-                    if not game_state['active_ui'].is_open:
-                        game_state['active_ui'] = None
+                hotbar.handle_input(event)
+
+                if game_state['paused']:
+                    result = pause_menu.handle_input(event)
+                    if result == "resume": game_state['paused'] = False
+                    elif result == "quit":
+                        if not config.HEADLESS: begin_save(game_state)
+                        game_state['tasks'].finish() # Complete a pending day rollover and the save before leaving
+                        return game_state
+                    continue
+
+                if game_state['active_ui']:
+                    game_state['held_item'] = game_state['active_ui'].handle_input(event, game_state['held_item'])
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
+                        game_state['held_item'] = game_state['active_ui'].toggle(game_state['held_item'])
+                        if not game_state['active_ui'].is_open:
+                            game_state['active_ui'] = None
+                    continue
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        game_state['paused'] = True
+                    elif event.key == pygame.K_e:
+                        if not game_state['active_ui']:
+                            game_state['active_ui'] = inventory_ui
+                        game_state['held_item'] = game_state['active_ui'].toggle(game_state['held_item'])
+                        if not game_state['active_ui'].is_open:
+                            game_state['active_ui'] = None
 
         if not game_state['paused'] and not game_state['active_ui']:
-            nearby_blocks = spatial_grid.get_nearby(player.rect.inflate(assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE * 2))
-            player.update(dt, nearby_blocks, game_state['blocks'], game_state['block_entities'], spatial_grid, mouse_pos, hotbar.get_selected_item_type(), world_mouse_pos, game_state['enemies'], game_state['particles'])
-            # Improved camera smoothing with pixel alignment to reduce jittering
-            target_x = player.rect.centerx - config.WINDOW_SIZE[0] / 2
-            target_y = player.rect.centery - config.WINDOW_SIZE[1] / 2
-            
-            # 加强防抖动死区 - 只有在玩家真正移动时才移动相机
-            dx = target_x - game_state['camera_offset'].x
-            dy = target_y - game_state['camera_offset'].y
-            
-            # 更严格的死区检测，结合玩家速度信息
-            camera_threshold = 2.0 if abs(player.vel.x) < 0.1 and abs(player.vel.y) < 0.1 else 1.0
-            
-            # 只有在移动足够大且玩家确实在移动时才更新相机
-            if abs(dx) > camera_threshold:
-                game_state['camera_offset'].x += dx * 0.15
-            if abs(dy) > camera_threshold:
-                game_state['camera_offset'].y += dy * 0.15
-            
-            # 强制整数化相机偏移，完全消除亚像素渲染
-            game_state['camera_offset'].x = round(game_state['camera_offset'].x)
-            game_state['camera_offset'].y = round(game_state['camera_offset'].y)
-
-        screen.fill(assets.SKY_BLUE)
-        visible_blocks = spatial_grid.get_nearby(pygame.Rect(game_state['camera_offset'], config.WINDOW_SIZE))
-        for block in sorted(visible_blocks, key=lambda b: b.layer): draw_block_lod(screen, block, player.pos, game_state['camera_offset'])
-        player.draw(screen, game_state['camera_offset'])
-        hotbar.draw(screen); health_bar.draw(screen); time_display.draw(screen, game_state['day'], game_state['time_of_day'], game_state['money'])
+            first_tick = timestep.tick_count
+            for step in range(timestep.advance(frame_time)):
+                prev_camera_offset.update(game_state['camera_offset'])
+                prev_player_pos.update(player.pos)
+                keys = input_script.keys_at(first_tick + step) if input_script else None
+                update_simulation(game_state, spatial_grid, hotbar, timestep.dt, mouse_pos, world_mouse_pos, keys)
+            alpha = timestep.alpha
+        else:
+            timestep.reset()
+            alpha = 1.0
+
+        camera_offset = prev_camera_offset.lerp(game_state['camera_offset'], alpha)
+        camera_offset.x, camera_offset.y = round(camera_offset.x), round(camera_offset.y)
+        # Shift the player's draw offset so it lands on its interpolated position.
+        player_draw_offset = camera_offset + (player.pos - prev_player_pos.lerp(player.pos, alpha))
+
+        with profiler.scope('tasks'):
+            game_state['tasks'].run()
+
+        with profiler.scope('render.world'):
+            screen.fill(assets.SKY_BLUE)
+            visible_blocks = spatial_grid.get_nearby(pygame.Rect(camera_offset, config.WINDOW_SIZE))
+            draw_blocks(screen, visible_blocks, player.pos, camera_offset)
+        with profiler.scope('render.entities'):
+            for enemy in game_state['enemies']: enemy.draw(screen, camera_offset, game_state['difficulty'])
+            if game_state['horde']: game_state['horde'].draw(screen, camera_offset)
+            draw_sprites(screen, game_state['projectiles'], camera_offset)
+            for staff in game_state['thrown_staffs']: staff.draw(screen, camera_offset)
+        with profiler.scope('render.particles'):
+            draw_sprites(screen, game_state['particles'], camera_offset)
+        with profiler.scope('render.player'):
+            player.draw(screen, player_draw_offset)
+        with profiler.scope('ui.hotbar'): hotbar.draw(screen)
+        with profiler.scope('ui.health_bar'): health_bar.draw(screen)
+        with profiler.scope('ui.time_display'): time_display.draw(screen, game_state['day'], game_state['time_of_day'], game_state['money'])
         if game_state['active_ui']:
-            game_state['active_ui'].draw(screen, hotbar)
-        if game_state['paused']: pause_menu.draw(screen) # noqa
-        pygame.display.flip()
+            with profiler.scope('ui.' + type(game_state['active_ui']).__name__):
+                game_state['active_ui'].draw(screen, hotbar)
+        if game_state['paused']:
+            with profiler.scope('ui.pause_menu'): pause_menu.draw(screen) # noqa
+        profiler.draw(screen, assets.tiny_font)
+        with profiler.scope('flip'):
+            pygame.display.flip()
+        profiler.end_frame()
+        snapshot = watchdog.end_frame(lambda: spike_context(game_state, frame_time))
+        if snapshot: print(f"Frame spike, snapshot written to {snapshot}")
+    return game_state
 
 def process_new_day(game_state):
     """Handles daily events, including resource regeneration."""
+    for _ in process_new_day_steps(game_state): pass
+    return game_state
+
+def begin_new_day(game_state, on_done=None):
+    """Queues the day's events on the task scheduler so they're spread over the next frames."""
+    game_state['tasks'].add('new_day', process_new_day_steps(game_state), on_done)
+
+def end_of_day(game_state):
+    """Rolls over to the next day: regrows resources, then relights and autosaves, all as scheduler tasks."""
+    def done(_):
+        begin_lighting(game_state)
+        if not config.HEADLESS: begin_save(game_state)
+    begin_new_day(game_state, done)
+
+def begin_save(game_state):
+    """Queues a save of the world on the task scheduler, replacing one that's still being written."""
+    game_state['tasks'].add('save', save_game_steps(game_state, game_state['save_file']), replace=True)
+
+def begin_lighting(game_state):
+    """Queues a lighting pass over the current area on the task scheduler, replacing one still in progress."""
+    blocks = game_state['blocks']
+    game_state['tasks'].add('lighting', update_lighting_steps(list(blocks), blocks), replace=True)
+
+def process_new_day_steps(game_state):
+    """process_new_day as a scheduler task, yielding between resources and while spawning them."""
     print(f"A new day has begun! It is now Day {game_state['day'] + 1}.")
     game_state['day'] += 1
     # --- Resource Regeneration ---
@@ -322,28 +576,24 @@ def process_new_day(game_state):
             
             if 'resource_counts' not in area_data: area_data['resource_counts'] = {}
             current_counts = area_data['resource_counts']
-            blocks_in_area = area_data.get('blocks', [])
-            if not blocks_in_area: continue # Skip if area not generated yet
+            if not area_data.get('blocks'): continue # Skip if area not generated yet
+            blocks_in_area = track_area_blocks(area_data)
 
             print(f"Checking resources for {area_name}...")
             for resource_type, target_count in target_counts.items():
-                # Count current resources to get an accurate number
-                if resource_type == 'wood':
-                    current_count = sum(1 for b in blocks_in_area if b.type == 'wood')
-                else:
-                    current_count = sum(1 for b in blocks_in_area if b.type == resource_type)
-                
+                # The area's BlockList keeps its type counts current, so no scan is needed
+                current_count = blocks_in_area.count_type(resource_type)
                 current_counts[resource_type] = current_count
 
                 if current_count < target_count:
                     needed = target_count - current_count
                     print(f"Regenerating {needed} {resource_type} in {area_name}...")
                     
-                    spawn_resource(resource_type, needed, blocks_in_area, area_name)
-
-    return game_state
+                    yield from spawn_resource_steps(resource_type, needed, blocks_in_area, area_name)
+                yield
 
 # --- World Generation Settings ---
+if config.RANDOM_SEED is not None: random.seed(config.RANDOM_SEED) # Reproducible worlds for headless runs
 NOISE_SEED = random.randint(1, 10000)
 TERRAIN_NOISE = PerlinNoise(octaves=2, seed=NOISE_SEED)
 COAL_NOISE = PerlinNoise(octaves=4, seed=NOISE_SEED + 1)
@@ -425,10 +675,16 @@ def get_neighbors(pos, all_blocks):
 
 def update_lighting(blocks_to_update, all_blocks):
     """Calculates and applies ambient occlusion for a given list of blocks."""
+    for _ in update_lighting_steps(blocks_to_update, all_blocks, batch_size=None): pass
+
+def update_lighting_steps(blocks_to_update, all_blocks, batch_size=512):
+    """update_lighting as a scheduler task, yielding after every batch_size blocks (None never yields)."""
     # Create a set of all foreground solid block positions for fast lookups
     solid_block_grid = {tuple(b.grid_pos) for b in all_blocks if b.layer == 1 and b.is_solid}
 
-    for block in blocks_to_update:
+    for i, block in enumerate(blocks_to_update):
+        if batch_size and i % batch_size == batch_size - 1:
+            yield
         if block.layer == 2:
             continue # Layer 2 blocks have their own darkening, no AO.
 
@@ -481,6 +737,27 @@ def calculate_fov(player_pos, solid_blocks_grid, view_radius_blocks):
     
     return visible_tiles
 
+def sky_darkness(time_of_day):
+    """How dark the sky is: 1.0 at midnight, 0.0 at noon (time_of_day 0 is midnight, as TimeDisplay reads it)."""
+    return (1 + math.cos(2 * math.pi * time_of_day / definitions.DAY_NIGHT_DURATION)) / 2
+
+def player_light(game_state, player):
+    """Tiles lit by the player's light in darkness mode: those it can see within PLAYER_LIGHT_RADIUS blocks.
+
+    The rays are only cast again when the player moves to another tile or the blocks change.
+    """
+    blocks = game_state['blocks']
+    center = pygame.Vector2(player.rect.center)
+    key = (int(center.x / assets.BLOCK_SIZE), int(center.y / assets.BLOCK_SIZE), blocks.version)
+    cached = game_state.get('player_light')
+    if cached and cached[0] == key:
+        return cached[1]
+    radius = config.PLAYER_LIGHT_RADIUS
+    solid = {(x, y) for x in range(key[0] - radius, key[0] + radius + 1) for y in range(key[1] - radius, key[1] + radius + 1) if blocks.is_solid_at((x, y))}
+    lit = frozenset(calculate_fov(center, solid, radius))
+    game_state['player_light'] = (key, lit)
+    return lit
+
 def is_accessible(player_rect, target_block, spatial_grid):
     """
     Checks if a target block is accessible by casting a line from the player.
@@ -743,6 +1020,11 @@ class Projectile:
         if self.active:
             surface.blit(self.image, self.pos - camera_offset)
 
+def draw_sprites(surface, sprites, camera_offset):
+    """Draws active particles or projectiles (anything with .image, .pos and .active) in one blits() call."""
+    cam_x, cam_y = camera_offset.x, camera_offset.y
+    surface.blits([(sprite.image, (sprite.pos.x - cam_x, sprite.pos.y - cam_y)) for sprite in sprites if sprite.active], doreturn=False)
+
 # --- SPATIAL HASH GRID FOR OPTIMIZATION ---
 class SpatialGrid:
     def __init__(self, cell_size):
@@ -796,6 +1078,9 @@ class SpatialGrid:
             self.add(obj, obj.rect)
 
 # --- VOXEL DEFINITION ---
+def is_solid_type(block_type):
+    return 'open' not in block_type and block_type not in ['glass', 'tall_grass', 'water']
+
 class Voxel:
     def __init__(self, grid_pos, block_type="dirt", layer=1, lifespan=None):
         self.grid_pos = pygame.Vector2(grid_pos)
@@ -803,7 +1088,7 @@ class Voxel:
         self.type = block_type
         self.layer = layer
         self.light_level = 1.0
-        self.is_solid = 'open' not in self.type and self.type not in ['glass', 'tall_grass', 'water']
+        self.is_solid = is_solid_type(self.type)
 
         self.lifespan = lifespan
         # Special case for bed, which is 2 blocks wide visually
@@ -825,14 +1110,34 @@ class Voxel:
 
 
 
-        base_image = assets.textures.get(self.type, assets.dirt_texture).copy()
-        if self.layer == 2:
-            darken_surf = pygame.Surface(base_image.get_size(), pygame.SRCALPHA)
-            darken_surf.fill((0, 0, 0, 128)) # 50% transparent black
-            base_image.blit(darken_surf, (0, 0))
+        # Blocks draw from shared atlas regions instead of owning copies of their texture.
+        # Layer 2 is drawn at 50% darkness, and lighting adds its own shade on top.
+        self.layer_shade = (128,) if self.layer == 2 else ()
+        self.darkness = 0
+        self.break_image = None # Only set while the block is being mined
+        self.region = None
+        self.block_list = None # The area BlockList indexing this block, if any
 
-        self.image = base_image.copy()
-        self.original_image = base_image.copy()
+    @property
+    def image(self):
+        if self.break_image is not None:
+            return self.break_image
+        page, area = self.get_region()
+        return page.subsurface(area)
+
+    def get_region(self):
+        if self.region is None:
+            name = self.type if self.type in assets.textures else 'dirt'
+            shades = self.layer_shade + (self.darkness,) if self.darkness > 0 else self.layer_shade
+            self.region = texture_atlas.region(name, None, shades)
+        return self.region
+
+    def set_type(self, block_type):
+        old_type, was_solid = self.type, self.is_solid
+        self.type, self.is_solid = block_type, is_solid_type(block_type)
+        self.region = None
+        if self.block_list is not None:
+            self.block_list.type_changed(self, old_type, was_solid)
 
     def get_rect_for_grid(self):
         # Returns the 1x1 rect for grid logic, ignoring visual size like for beds
@@ -840,14 +1145,15 @@ class Voxel:
 
     def update_break_visual(self, progress_ratio):
         if progress_ratio <= 0:
-            self.image = self.original_image.copy()
+            self.break_image = None
         else:
             # Scaling logic
             scale = 1.0 - (progress_ratio * 0.2) # Scale from 1.0 down to 0.8
             new_size = int(assets.BLOCK_SIZE * scale)
             
-            # Create a scaled version of the original image
-            scaled_image = pygame.transform.scale(self.original_image, (new_size, new_size))
+            # Create a scaled version of the unlit block image
+            name = self.type if self.type in assets.textures else 'dirt'
+            scaled_image = pygame.transform.scale(texture_atlas.image(name, None, self.layer_shade), (new_size, new_size))
 
             # Apply darkening effect to the scaled image
             darken_surface = pygame.Surface(scaled_image.get_size(), pygame.SRCALPHA)
@@ -856,61 +1162,79 @@ class Voxel:
             scaled_image.blit(darken_surface, (0, 0))
 
             # Create a final transparent surface and center the result
-            self.image = pygame.Surface((assets.BLOCK_SIZE, assets.BLOCK_SIZE), pygame.SRCALPHA)
+            self.break_image = pygame.Surface((assets.BLOCK_SIZE, assets.BLOCK_SIZE), pygame.SRCALPHA)
             blit_pos = ((assets.BLOCK_SIZE - new_size) // 2, (assets.BLOCK_SIZE - new_size) // 2)
-            self.image.blit(scaled_image, blit_pos)
+            self.break_image.blit(scaled_image, blit_pos)
 
     def apply_lighting(self, light_level):
         self.light_level = light_level
-        self.image = self.original_image.copy()
 
         # Calculate darkness based on light level. 1.0 is full light, 0.0 is full dark.
+        # Darkness is a whole alpha value, so blocks with the same light share one atlas region.
         max_darkness_alpha = 220
-        darkness = int(max_darkness_alpha * (1.0 - self.light_level))
-        
-        if darkness > 0:
-            darken_surf = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-            darken_surf.fill((0, 0, 0, darkness))
-            self.image.blit(darken_surf, (0, 0))
+        self.darkness = int(max_darkness_alpha * (1.0 - self.light_level))
+        self.region = None
 
     def draw(self, surface, camera_offset):
         # Use the 1x1 grid rect for positioning, but draw the potentially larger image
         draw_pos = (self.grid_pos.x * assets.BLOCK_SIZE - camera_offset.x, self.grid_pos.y * assets.BLOCK_SIZE - camera_offset.y)
-        surface.blit(self.image, draw_pos)
+        if self.break_image is not None:
+            surface.blit(self.break_image, draw_pos)
+        else:
+            page, area = self.region or self.get_region()
+            surface.blit(page, draw_pos, area)
 
 
-def draw_block_lod(surface, block, player_pos, camera_offset):
-    """Draws a block with Level of Detail based on distance to player."""
+def draw_blocks(surface, blocks, player_pos, camera_offset):
+    """Draws blocks layer by layer with Level of Detail based on distance to player, one blits() call per layer."""
     # Using squared distances is faster as it avoids square roots
     LOD_DIST_SQUARED_HIGH = (25 * assets.BLOCK_SIZE)**2
     LOD_DIST_SQUARED_MEDIUM = (50 * assets.BLOCK_SIZE)**2
-    
-    dist_sq = player_pos.distance_squared_to(pygame.Vector2(block.rect.center))
+    half_block = assets.BLOCK_SIZE / 2
+    cam_x, cam_y = camera_offset.x, camera_offset.y
+    px, py = player_pos.x, player_pos.y
+
+    for layer in sorted({block.layer for block in blocks}):
+        batch = []
+        for block in blocks:
+            if block.layer != layer:
+                continue
+            x, y = block.rect.x, block.rect.y
+            dx, dy = x + half_block - px, y + half_block - py
+            dist_sq = dx * dx + dy * dy
 
-    if dist_sq <= LOD_DIST_SQUARED_HIGH:
-        block.draw(surface, camera_offset)
-    elif dist_sq <= LOD_DIST_SQUARED_MEDIUM:
-        # Medium detail: solid average color
-        avg_color = assets.avg_colors.get(block.type, (100, 100, 100))
-        
-        light_level = block.light_level
-        final_color = (
-            int(avg_color[0] * light_level),
-            int(avg_color[1] * light_level),
-            int(avg_color[2] * light_level)
-        )
+            if dist_sq <= LOD_DIST_SQUARED_HIGH:
+                if block.break_image is not None:
+                    batch.append((block.break_image, (x - cam_x, y - cam_y)))
+                else:
+                    page, area = block.region or block.get_region()
+                    batch.append((page, (x - cam_x, y - cam_y), area))
+            elif dist_sq <= LOD_DIST_SQUARED_MEDIUM:
+                draw_block_average(surface, block, (x - cam_x, y - cam_y))
+            # else: Low detail: don't draw very far blocks at all.
+        surface.blits(batch, doreturn=False)
+
+def draw_block_average(surface, block, pos):
+    """Medium detail: the block as a solid rect of its texture's average color."""
+    avg_color = assets.avg_colors.get(block.type, (100, 100, 100))
+    
+    light_level = block.light_level
+    final_color = (
+        int(avg_color[0] * light_level),
+        int(avg_color[1] * light_level),
+        int(avg_color[2] * light_level)
+    )
 
-        draw_rect = block.get_rect_for_grid().move(-camera_offset.x, -camera_offset.y)
-        
-        if block.type in ['water', 'glass', 'leaf', 'tall_grass']:
-            # For transparent blocks, draw a semi-transparent rect
-            s = pygame.Surface(draw_rect.size, pygame.SRCALPHA)
-            alpha = 150 if block.type == 'water' else 200
-            s.fill(final_color + (alpha,)) # Add alpha
-            surface.blit(s, draw_rect.topleft)
-        else:
-            pygame.draw.rect(surface, final_color, draw_rect)
-    # else: Low detail: don't draw very far blocks at all.
+    draw_rect = pygame.Rect(pos, (assets.BLOCK_SIZE, assets.BLOCK_SIZE))
+    
+    if block.type in ['water', 'glass', 'leaf', 'tall_grass']:
+        # For transparent blocks, draw a semi-transparent rect
+        s = pygame.Surface(draw_rect.size, pygame.SRCALPHA)
+        alpha = 150 if block.type == 'water' else 200
+        s.fill(final_color + (alpha,)) # Add alpha
+        surface.blit(s, draw_rect.topleft)
+    else:
+        pygame.draw.rect(surface, final_color, draw_rect)
 
 def generate_tree(base_pos):
     """Generates a tree at a specific grid position. base_pos is the grass_block to grow on."""
@@ -931,56 +1255,51 @@ def generate_tree(base_pos):
     return tree_blocks
 
 def spawn_resource(resource_type, count, blocks_list, area_name):
-    """Attempts to spawn a number of a given resource into an area's block list."""
+    """Attempts to spawn a number of a given resource into an area's BlockList."""
+    for _ in spawn_resource_steps(resource_type, count, blocks_list, area_name): pass
+
+def spawn_resource_steps(resource_type, count, blocks_list, area_name):
+    """spawn_resource as a scheduler task, yielding every few blocks or tree attempts."""
     if not blocks_list: return
 
     if resource_type.endswith('_ore') or resource_type == 'sand' or resource_type == 'sus_gold':
         # Find 'stone' blocks to replace for ores, or 'dirt' for sand/sus_gold in lakes
         replaceable_type = 'dirt' if area_name == 'lakes' else 'stone'
-        replaceable_blocks = [b for b in blocks_list if b.type == replaceable_type]
-        if not replaceable_blocks: return
+        replaceable_blocks = blocks_list.blocks_of(replaceable_type)
 
-        for _ in range(count):
+        for i in range(count):
             if not replaceable_blocks: break
-            block_to_replace = random.choice(replaceable_blocks)
-            block_to_replace.type = resource_type
-            block_to_replace.original_image = assets.textures[resource_type].copy()
-            block_to_replace.image = block_to_replace.original_image.copy()
-            replaceable_blocks.remove(block_to_replace)
+            # Converting a block takes it out of the replaceable set, in O(1)
+            replaceable_blocks.choice().set_type(resource_type)
+            if i % 64 == 63: yield
 
     elif resource_type == 'wood':
         # A tree has multiple wood blocks. Let's say avg 8 wood blocks per tree.
         trees_to_spawn = math.ceil(count / 8)
-        grass_blocks = [b for b in blocks_list if b.type == 'grass_block']
+        grass_blocks = blocks_list.blocks_of('grass_block')
         if not grass_blocks: return
-        solid_positions = {tuple(b.grid_pos) for b in blocks_list if b.is_solid}
         
         for _ in range(trees_to_spawn):
             spawned = False; attempts = 0
             while not spawned and attempts < 50: # Try 50 times to find a spot for a tree
                 attempts += 1
-                if not grass_blocks: break
-                grass_block = random.choice(grass_blocks)
-                is_space_clear = not any((grass_block.grid_pos.x, grass_block.grid_pos.y - y_offset) in solid_positions for y_offset in range(1, 15))
+                if attempts % 10 == 0: yield
+                grass_block = grass_blocks.choice()
+                is_space_clear = blocks_list.is_clear_above(grass_block.grid_pos, 14)
                 if is_space_clear:
-                    new_tree_blocks = generate_tree(grass_block.grid_pos)
-                    blocks_list.extend(new_tree_blocks)
-                    for b in new_tree_blocks:
-                        if b.is_solid: solid_positions.add(tuple(b.grid_pos))
+                    blocks_list.extend(generate_tree(grass_block.grid_pos))
                     spawned = True
+            yield
 
     elif resource_type == 'tall_grass':
-        grass_blocks = [b for b in blocks_list if b.type == 'grass_block']
+        grass_blocks = blocks_list.blocks_of('grass_block')
         if not grass_blocks: return
-        non_solid_positions = {tuple(b.grid_pos) for b in blocks_list if not b.is_solid}
-        for _ in range(count):
-            if not grass_blocks: break
-            grass_block = random.choice(grass_blocks)
+        for i in range(count):
+            grass_block = grass_blocks.choice()
             spot_above = (grass_block.grid_pos.x, grass_block.grid_pos.y - 1)
-            if spot_above not in non_solid_positions:
-                new_grass = Voxel(spot_above, 'tall_grass')
-                blocks_list.append(new_grass)
-                non_solid_positions.add(spot_above)
+            if not any(not b.is_solid for b in blocks_list.blocks_at(spot_above)):
+                blocks_list.append(Voxel(spot_above, 'tall_grass'))
+            if i % 64 == 63: yield
 
 def generate_chunk(chunk_x, world_type='farm'):
     """Generates all blocks for a single vertical chunk of the world, customized by world_type."""
@@ -999,7 +1318,7 @@ def generate_chunk(chunk_x, world_type='farm'):
     world_vertical_offset = 64 # Creates more sky
     bedrock_y_level = world_vertical_offset + 70 # Bedrock starts below the deepest caves
 
-    surface_points = [] # To store (x, y) of surface blocks
+    surface_y_by_x = {} # x -> y of the chunk's surface (grass) block
 
     for x_in_chunk in range(CHUNK_WIDTH):
         x = chunk_offset_x + x_in_chunk
@@ -1007,7 +1326,7 @@ def generate_chunk(chunk_x, world_type='farm'):
 
         # Surface layer
         new_blocks.append(Voxel((x, height - 1), "grass_block"))
-        surface_points.append((x, height - 1)) # Store surface point
+        surface_y_by_x[x] = height - 1
         if random.random() < p['grass_chance']:
             new_blocks.append(Voxel((x, height - 2), "tall_grass"))
 
@@ -1065,11 +1384,7 @@ def generate_chunk(chunk_x, world_type='farm'):
     if random.random() < p['lake_chance']:
         lake_center_x = chunk_offset_x + random.randint(0, CHUNK_WIDTH - 1)
 
-        surface_y_at_center = -1
-        for x_surf, y_surf in surface_points:
-            if x_surf == lake_center_x:
-                surface_y_at_center = y_surf
-                break
+        surface_y_at_center = surface_y_by_x.get(lake_center_x, -1)
 
         if surface_y_at_center != -1:
             lake_radius_x = random.randint(8, 20)
@@ -1096,6 +1411,13 @@ def generate_chunk(chunk_x, world_type='farm'):
     return new_blocks
 
 # --- ENEMY CONTROLLER ---
+def enemy_from_record(record):
+    """Brings back an enemy from its dormant record (see streaming.enemy_record)."""
+    enemy = EnemyController(record['pos'], record['type'])
+    if record.get('health') is not None:
+        enemy.health = record['health']
+    return enemy
+
 class EnemyController:
     def __init__(self, pos, enemy_type='zombie'):
         self.pos = pygame.Vector2(pos)
@@ -1126,7 +1448,7 @@ class EnemyController:
         self.knockback_strength = 150
         self.rect = pygame.Rect(self.pos.x, self.pos.y, self.width, self.height)
         
-        self.image = pygame.transform.scale(assets.textures[self.enemy_type], (self.width, self.height))
+        self.image = enemy_sprites.get(self.enemy_type, (self.width, self.height)) # Shared with every enemy of this type and size
 
         self.grounded = False
         self.health = self.max_health
@@ -1184,7 +1506,7 @@ class EnemyController:
         self.is_dying = True
         player.add_xp(self.xp_value)
 
-    def update(self, dt, blocks, player, particles_list, darkness_multiplier, light_cone_tiles, difficulty): # noqa
+    def update(self, dt, blocks, player, particles_list, darkness_multiplier, light_cone_tiles, difficulty, flow_field=None): # noqa
         if self.is_dying: return
 
         # --- Water Physics Check ---
@@ -1242,7 +1564,12 @@ class EnemyController:
                 self.ai_state = 'wandering'
 
             if self.ai_state == 'chasing':
-                if abs(player.pos.x - self.pos.x) > 5:
+                step = flow_field.step_for(self.rect) if flow_field is not None else None
+                if step is not None: # Follow the shared path toward the player around walls and gaps
+                    self.facing, climb = step
+                    if climb:
+                        self.jump()
+                elif abs(player.pos.x - self.pos.x) > 5:
                     self.facing = sign(player.pos.x - self.pos.x)
             elif self.ai_state == 'wandering':
                 self.ai_timer -= dt
@@ -1296,16 +1623,11 @@ class EnemyController:
                 self.vel.y = 0
 
     def draw(self, surface, camera_offset, difficulty='normal'):
-        final_image = pygame.transform.flip(self.image, True, False) if self.facing == 1 else self.image
-        # Apply damage flash
-        if self.damage_flash_timer > 0:
-            flash_image = final_image.copy()
-            flash_image.fill((255, 100, 100), special_flags=pygame.BLEND_RGB_ADD)
-            draw_pos = self.rect.topleft - camera_offset
-            surface.blit(flash_image, draw_pos)
-        else:
-            draw_pos = self.rect.topleft - camera_offset
-            surface.blit(final_image, draw_pos)
+        # Flipped and damage-flashed variants come from the shared cache, so drawing does no per-frame transforms
+        flashing = self.damage_flash_timer > 0
+        final_image = enemy_sprites.get(self.enemy_type, (self.width, self.height), self.facing == 1, DAMAGE_FLASH if flashing else None)
+        draw_pos = self.rect.topleft - camera_offset
+        surface.blit(final_image, draw_pos)
 
         if difficulty == 'darkness':
             eye_y = self.rect.top - camera_offset.y + self.height * 0.25
@@ -1327,13 +1649,15 @@ class EnemyController:
             pygame.draw.rect(surface, (80, 0, 0), (bar_x, bar_y, bar_width, bar_height))
             pygame.draw.rect(surface, (220, 0, 0), (bar_x, bar_y, bar_width * health_ratio, bar_height))
 
+BOSS_DAMAGE_FLASH = (255, 100, 100, 150)
+
 class BossController(EnemyController):
     def __init__(self, pos):
         super().__init__(pos, enemy_type='boss')
         self.width = assets.BLOCK_SIZE * 1.5
         self.height = assets.BLOCK_SIZE * 2.5
         self.rect = pygame.Rect(self.pos.x, self.pos.y, self.width, self.height)
-        self.image = pygame.transform.scale(assets.textures['boss'], (int(self.width), int(self.height)))
+        self.image = enemy_sprites.get('boss', (self.width, self.height))
 
         # Held item logic from PlayerController
         self.held_item_surface = None
@@ -1395,7 +1719,7 @@ class BossController(EnemyController):
             self.grounded = False
             self.jump_cooldown = 0.4 # Short cooldown for rapid "flaps"
 
-    def update(self, dt, blocks, player, particles_list, darkness_multiplier, light_cone_tiles, difficulty):
+    def update(self, dt, blocks, player, particles_list, darkness_multiplier, light_cone_tiles, difficulty, flow_field=None):
         if self.is_dying: return
 
         # Decrement timers
@@ -1608,16 +1932,12 @@ class BossController(EnemyController):
 
     def draw(self, surface, camera_offset, difficulty='normal'):
         # We override the base draw to handle the spinning animation
-        base_image = self.image
+        flash = BOSS_DAMAGE_FLASH if self.damage_flash_timer > 0 else None
         if self.is_charging_dash or self.is_dashing:
-            base_image = pygame.transform.rotate(self.image, self.dash_spin_angle)
-        
-        # Apply damage flash
-        final_image = base_image
-        if self.damage_flash_timer > 0:
-            flash_image = base_image.copy()
-            flash_image.fill((255, 100, 100, 150), special_flags=pygame.BLEND_RGBA_ADD)
-            final_image = flash_image
+            # The spin angle changes every frame, so only this pose transforms per frame
+            final_image = pygame.transform.rotate(enemy_sprites.get('boss', (self.width, self.height), tint=flash), self.dash_spin_angle)
+        else:
+            final_image = enemy_sprites.get('boss', (self.width, self.height), tint=flash)
 
         # Blit the final image, centered on the boss's rect
         draw_rect = final_image.get_rect(center=self.rect.center - camera_offset)
@@ -1667,77 +1987,35 @@ def new_world():
 
     return blocks, player, enemies, block_entities, time_of_day, generated_chunks
 
-def generate_dungeon(width=60, height=60):
-    # 1. Create a grid full of stone
-    grid = [['stone' for _ in range(width)] for _ in range(height)]
-    
-    # 2. Use recursive backtracking to carve a maze
-    stack = [(1, 1)]
-    visited = set()
-    
-    while stack:
-        x, y = stack[-1]
-        grid[y][x] = None # Carve path
-        visited.add((x, y))
-        
-        neighbors = []
-        for dx, dy in [(0, 2), (0, -2), (2, 0), (-2, 0)]:
-            nx, ny = x + dx, y + dy
-            if 1 <= nx < width - 1 and 1 <= ny < height - 1 and (nx, ny) not in visited:
-                neighbors.append((nx, ny))
-        
-        if neighbors:
-            nx, ny = random.choice(neighbors)
-            # Carve path between current and next cell
-            grid[(y + ny) // 2][(x + nx) // 2] = None
-            stack.append((nx, ny))
-        else:
-            stack.pop()
-
-    # 3. Convert grid to Voxel objects
-    blocks = []
-    enemies = []
-    block_entities = {} # noqa
-    
-    for y, row in enumerate(grid):
-        for x, cell_type in enumerate(row):
-            if cell_type:
-                blocks.append(Voxel((x, y), cell_type))
-            else: # It's a path
-                # Randomly place chests and enemies in open spaces
-                if random.random() < 0.02: # 2% chance for a chest
-                    chest_block = Voxel((x, y), 'chest')
-                    blocks.append(chest_block)
-                    # Populate chest with loot
-                    loot = []
-                    for _ in range(random.randint(1, 5)):
-                        loot_item = random.choice(['iron_ingot', 'gold', 'diamond'])
-                        loot_count = random.randint(1, 10)
-                        loot.append({'type': loot_item, 'count': loot_count})
-                    # Pad with None to fill inventory
-                    loot.extend([None] * (27 - len(loot)))
-                    block_entities[(x, y)] = {"type": "chest", "inventory": loot}
-                elif random.random() < 0.03: # 3% chance for an enemy
-                    enemy_type = random.choice(['zombie', 'zombie_brute', 'crawler'])
-                    enemies.append(EnemyController((x * assets.BLOCK_SIZE, y * assets.BLOCK_SIZE), enemy_type))
-
+def generate_dungeon(width=60, height=60, floors=1):
+    """Generates a maze dungeon and makes its blocks, chests and enemies from the layout."""
+    layout = dungeon.generate_layout(width, height, floors)
+    blocks = [Voxel((x, y), block_type) for x, y, block_type in layout.solid_cells()]
+    block_entities = dict(layout.chests())
+    enemies = [EnemyController((x * assets.BLOCK_SIZE, y * assets.BLOCK_SIZE), enemy_type) for x, y, enemy_type in layout.enemy_spawns()]
     return blocks, enemies, block_entities
 
-def new_dungeon():
+def new_dungeon(width=60, height=60, floors=1):
+    """Creates a dungeon world. Returns (initial_data, streamer) for game_loop, which loads the sections around the spawn."""
     print("Generating dungeon...")
-    blocks, enemies, block_entities = generate_dungeon()
+    layout = dungeon.generate_layout(width, height, floors)
+    streamer = DungeonStreamer(layout, lambda x, y, block_type: Voxel((x, y), block_type), enemy_from_record,
+                               config.DUNGEON_SECTION_SIZE, config.DUNGEON_STREAM_RADIUS)
     
     # Player
-    player = PlayerController((1.5 * assets.BLOCK_SIZE, 1.5 * assets.BLOCK_SIZE)) # Spawn at start of maze
+    player = PlayerController(((layout.spawn[0] + 0.5) * assets.BLOCK_SIZE, (layout.spawn[1] + 0.5) * assets.BLOCK_SIZE)) # Spawn at start of maze
     player.inventory = PlayerInventory()
     player.inventory.add_item("diamond_staff", 1)
     player.inventory.add_item("plank", 64)
 
+    blocks, enemies = BlockList(), []
+    block_entities = dict(layout.chests())
+
     time_of_day = definitions.DAY_NIGHT_DURATION * 0.25 # permanent day
     generated_chunks = {0} # no chunk generation
     difficulty = 'normal'
 
-    return blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty
+    return (blocks, player, enemies, block_entities, time_of_day, generated_chunks, difficulty), streamer
 
 def generate_arena():
     blocks = []
@@ -1957,6 +2235,8 @@ def world_selection_menu():
         clock.tick(60)
 
 def main_menu():
+    assets.init_audio()
+    assets.ensure_texture_cache()
     # Setup buttons
     button_width = 300
     button_height = 60
@@ -2026,12 +2306,40 @@ def main_menu():
         pygame.display.flip()
         clock.tick(60)
 
+def run_headless(ticks=config.HEADLESS_TICKS, input_script=None, difficulty='normal', world='farm'):
+    """Simulates a fresh world ('farm', or a streamed 'dungeon') for a number of ticks with no window or audio and returns the final game state."""
+    start = time.perf_counter()
+    if world == 'dungeon':
+        game_data, streamer = new_dungeon()
+    else:
+        game_data, streamer = new_world(difficulty), None
+    generated = time.perf_counter()
+    game_state = game_loop(game_data, max_ticks=ticks, input_script=input_script or default_input_script(ticks), streamer=streamer)
+    elapsed = time.perf_counter() - generated
+    print(f"World generated in {generated - start:.2f}s")
+    print(f"Simulated {ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if profiler.enabled:
+        print(f"{'scope':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, p50, p95, p99 in profiler.summary():
+            print(f"{name:<24}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}")
+    return game_state
+
 # --- INITIALIZE AND RUN ---
 if __name__ == '__main__':
     # This check is to prevent the main game logic from running when imported by other scripts,
     # which can be useful for testing or utility scripts in the future.
     # It ensures that main_menu() is the entry point only when main.py is executed directly.
 
+    if config.HEADLESS:
+        import argparse
+        parser = argparse.ArgumentParser(description="Run the world simulation without a window or audio.")
+        parser.add_argument('--headless', action='store_true', help="Use SDL's dummy video and audio drivers")
+        parser.add_argument('--ticks', type=int, default=config.HEADLESS_TICKS, help="Number of simulation ticks to run")
+        parser.add_argument('--world', choices=('farm', 'dungeon'), default='farm', help="World to simulate")
+        args = parser.parse_args()
+        run_headless(args.ticks, world=args.world)
+        sys.exit(0)
+
     # --- Populate world.json with texture data ---
     texture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'texture')
     if os.path.exists(texture_path):
@@ -14,6 +14,9 @@ setup(
         "perlin-noise>=1.0.0",
     ],
     extras_require={
+        "horde": [
+            "numpy>=1.17",
+        ],
         "dev": [
             "pytest>=6.0",
             "black>=21.0.0",
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+# File layout: MAGIC, u32 format version, u32 header length, JSON header, then raw RGBA pixels back to back.
+MAGIC = b'JSTC'
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct('<4sII')
+
+_to_bytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_stamps(directory, filenames):
+    """Returns {filename: {mtime_ns, size, sha1}} for the texture sources that exist."""
+    stamps = {}
+    for filename in sorted(set(filenames)):
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamps[filename] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': file_sha1(path)}
+    return stamps
+
+
+def sources_unchanged(directory, stamps, filenames):
+    """Checks the sources against the stamps in a cache. Only files whose mtime moved are re-hashed."""
+    if set(stamps) != {f for f in filenames if os.path.exists(os.path.join(directory, f))}:
+        return False
+    for filename, stamp in stamps.items():
+        path = os.path.join(directory, filename)
+        stat = os.stat(path)
+        if stat.st_size != stamp['size']:
+            return False
+        if stat.st_mtime_ns != stamp['mtime_ns'] and file_sha1(path) != stamp['sha1']:
+            return False # Touched files (e.g. after a checkout) are fine as long as the content is the same
+    return True
+
+
+def write_cache(path, key, stamps, surfaces, avg_colors):
+    """Writes surfaces ({name: Surface}) and their average colors into one cache file, atomically."""
+    entries, blobs, offset = {}, [], 0
+    for name, surface in surfaces.items():
+        if surface is None:
+            continue
+        pixels = _to_bytes(surface, 'RGBA')
+        entries[name] = {
+            'offset': offset, 'size': list(surface.get_size()), 'alpha': bool(surface.get_flags() & pygame.SRCALPHA),
+            'colorkey': list(surface.get_colorkey()) if surface.get_colorkey() else None,
+            'avg': list(avg_colors[name]) if name in avg_colors else None,
+        }
+        blobs.append(pixels)
+        offset += len(pixels)
+    header = json.dumps({'key': key, 'sources': stamps, 'entries': entries}).encode('utf-8')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+class TextureCache:
+    """Read side of the texture cache: memory-maps the file and hands out surfaces by name."""
+
+    def __init__(self, path):
+        self.path = path
+        self.valid = False
+        self.entries = {}
+        self._map = None
+        self._data_start = 0
+
+    def open(self, key, source_dir, filenames):
+        """Maps the cache file if it exists and matches the key and the current sources. Returns whether it's usable."""
+        self.close()
+        try:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, header_len = _PREFIX.unpack_from(self._map, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return self.close()
+            header = json.loads(self._map[_PREFIX.size:_PREFIX.size + header_len])
+            if header['key'] != key or not sources_unchanged(source_dir, header['sources'], filenames):
+                return self.close()
+        except (OSError, ValueError, KeyError, struct.error):
+            return self.close()
+        self.entries = header['entries']
+        self._data_start = _PREFIX.size + header_len
+        self.valid = True
+        return True
+
+    def close(self):
+        self.valid = False
+        self.entries = {}
+        # The map is left to the garbage collector: surfaces made with frombuffer may still point into it.
+        self._map = None
+        return False
+
+    def get(self, name):
+        """Returns (surface, entry) for a cached texture, or None. The surface is a raw RGBA view into the file."""
+        entry = self.entries.get(name) if self.valid else None
+        if entry is None:
+            return None
+        width, height = entry['size']
+        start = self._data_start + entry['offset']
+        view = memoryview(self._map)[start:start + width * height * 4]
+        return pygame.image.frombuffer(view, (width, height), 'RGBA'), entry
+
+    def avg_color(self, name):
+        entry = self.entries.get(name) if self.valid else None
+        return tuple(entry['avg']) if entry and entry['avg'] else None
+
+
+if __name__ == '__main__':
+    # Build step: python -m src.game.core.asset_cache
+    from src.game.core import assets
+    print(f"Texture cache written to {assets.build_texture_cache()}")
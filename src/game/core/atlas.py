@@ -0,0 +1,125 @@
+import pygame
+
+from . import assets
+
+
+class ShelfPacker:
+    """Places rectangles into a fixed-size page row by row ('shelves'), using the shortest shelf that fits."""
+
+    def __init__(self, width, height, padding=1):
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.shelves = [] # [y, height, next free x]
+        self.next_y = 0
+
+    def insert(self, width, height):
+        """Returns the Rect reserved for a width x height image, or None if the page is full."""
+        w, h = width + self.padding, height + self.padding
+        best = None
+        for shelf in self.shelves:
+            if shelf[1] >= h and shelf[2] + w <= self.width and (best is None or shelf[1] < best[1]):
+                best = shelf
+        if best is None:
+            if self.next_y + h > self.height or w > self.width:
+                return None
+            best = [self.next_y, h, 0]
+            self.shelves.append(best)
+            self.next_y += h
+        rect = pygame.Rect(best[2], best[0], width, height)
+        best[2] += w
+        return rect
+
+
+class TextureAtlas:
+    """Packs textures and their scaled or darkened variants into a few large pages, addressed by (page, rect) regions.
+
+    Regions are keyed by (name, size, shades) and packed the first time they're asked for. Opaque images go
+    into opaque pages and transparent ones into per-pixel-alpha pages, so opaque blocks keep the fast blit path.
+    """
+
+    def __init__(self, registry, page_size=1024, padding=1):
+        self.registry = registry
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = {False: [], True: []} # has alpha -> [(Surface, ShelfPacker)]
+        self.regions = {} # key -> (page Surface, Rect), or None for names the registry can't supply
+
+    # --- Lookup ---
+    def region(self, name, size=None, shades=()):
+        """Returns (page, rect) for a texture, scaled to size (None keeps it native) and darkened by each alpha in shades."""
+        key = (name, size, shades)
+        try:
+            return self.regions[key]
+        except KeyError:
+            pass
+        image = self.registry.get(name)
+        if image is not None:
+            if size is not None and image.get_size() != size:
+                image = pygame.transform.scale(image, size)
+            if shades:
+                image = image.copy()
+                for alpha in shades:
+                    overlay = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+                    overlay.fill((0, 0, 0, alpha))
+                    image.blit(overlay, (0, 0))
+        region = self.regions[key] = self.add(image) if image is not None else None
+        return region
+
+    def scaled_region(self, name, scale):
+        """Returns the region for a texture scaled by a factor of its native width, as the inventory screens draw items."""
+        image = self.registry.get(name)
+        if image is None or scale == 1.0:
+            return self.region(name)
+        side = int(image.get_width() * scale)
+        return self.region(name, (side, side))
+
+    def image(self, name, size=None, shades=()):
+        """Returns a region as a Surface (a subsurface sharing the page's pixels), for code that needs one."""
+        region = self.region(name, size, shades)
+        return region[0].subsurface(region[1]) if region else None
+
+    # --- Packing ---
+    def add(self, image):
+        """Copies an image into the first page with room and returns its (page, rect)."""
+        has_alpha = bool(image.get_flags() & pygame.SRCALPHA) or image.get_colorkey() is not None
+        width, height = image.get_size()
+        for page, packer in self.pages[has_alpha]:
+            rect = packer.insert(width, height)
+            if rect:
+                break
+        else:
+            page, packer = self._new_page(has_alpha, width, height)
+            rect = packer.insert(width, height)
+        page.blit(image, rect)
+        return page, rect
+
+    def _new_page(self, has_alpha, width, height):
+        # Anything too big for a standard page gets a page of its own
+        size = (max(self.page_size, width + self.padding), max(self.page_size, height + self.padding))
+        page = pygame.Surface(size, pygame.SRCALPHA if has_alpha else 0)
+        if pygame.display.get_surface() is not None:
+            page = page.convert_alpha() if has_alpha else page.convert()
+        if has_alpha:
+            page.fill((0, 0, 0, 0))
+        packer = ShelfPacker(size[0], size[1], self.padding)
+        self.pages[has_alpha].append((page, packer))
+        return page, packer
+
+    def pack(self, names, size=None):
+        """Packs several textures up front, e.g. everything a screen is about to draw."""
+        for name in names:
+            self.region(name, size)
+
+    def clear(self):
+        """Drops every page, e.g. after the display mode changes."""
+        self.pages = {False: [], True: []}
+        self.regions = {}
+
+    def page_count(self):
+        return len(self.pages[False]) + len(self.pages[True])
+
+
+# The shared atlases for block and item textures and for UI sprites; world and UI rendering draw from these.
+texture_atlas = TextureAtlas(assets.textures)
+sprite_atlas = TextureAtlas(assets.sprites, page_size=256)
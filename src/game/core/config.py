@@ -1,3 +1,5 @@
+import os
+
 # --- WINDOW SETTINGS ---
 WINDOW_TITLE = 'UrsinaCraft'
 WINDOW_FULLSCREEN = False
@@ -35,4 +37,50 @@ CROUCH_HEIGHT = 0.5
 FALL_DAMAGE_THRESHOLD = 9999
 HELD_ITEM_SIZE = 0.75 # As a factor of BLOCK_SIZE
 HELD_ITEM_ROTATION_SPEED = 2.0 # Multiplier for spin speed
-FALL_DAMAGE_MULTIPLIER = 1.2 # The base for exponential fall damage calculation.
\ No newline at end of file
+FALL_DAMAGE_MULTIPLIER = 1.2 # The base for exponential fall damage calculation.
+
+# --- SIMULATION SETTINGS ---
+SIMULATION_HZ = 60 # Fixed rate at which physics, AI and particles are stepped
+MAX_SIMULATION_STEPS = 5 # Max ticks per rendered frame before the simulation slows down instead of spiralling
+RENDER_FPS_CAP = 60 # Render frame cap. 0 renders uncapped; gameplay speed is unaffected either way.
+BLOCK_ENTITY_TICK_RATE = 4 # Furnaces and other block entities in the active area update this many times per second
+TASK_BUDGET_MS = 2.0 # Time per frame given to background jobs (day rollover, saves, lighting rebuilds)
+# Enemy activity tiers, in blocks from the player. Near covers the screen; past mid, enemies sleep until the player returns.
+ENEMY_NEAR_RADIUS = 28
+ENEMY_MID_RADIUS = 64
+ENEMY_MID_INTERVAL = 4 # Mid-range enemies update every this many ticks
+PLAYER_LIGHT_RADIUS = 6 # Blocks the player's light reaches in darkness mode; enemies it touches can't move
+FLOW_FIELD_RADIUS = 48 # How far (in path steps) chasing enemies can follow the shared path to the player
+FLOW_FIELD_INTERVAL = 6 # Fewest ticks between two flow field searches, however fast the player or the blocks change
+HORDE_ENABLED = True # Simulate hordes of common enemies as arrays. Needs NumPy; without it the horde is left out.
+
+# --- DUNGEON SETTINGS ---
+DUNGEON_SECTION_SIZE = 32 # Dungeons load and unload in square sections of this many blocks
+DUNGEON_STREAM_RADIUS = 1 # Sections around the player's own that stay loaded (1 = a 3x3 block of sections)
+
+# --- HEADLESS SETTINGS ---
+# Set JINGSHUONIUM_HEADLESS=1 (or run main.py --headless) to simulate with no window or audio device.
+HEADLESS = os.environ.get('JINGSHUONIUM_HEADLESS', '0') not in ('', '0')
+HEADLESS_TICKS = 600 # Default run length for headless mode, in simulation ticks
+# Set JINGSHUONIUM_SEED to make world generation reproducible (benchmarks, soak tests).
+RANDOM_SEED = int(os.environ['JINGSHUONIUM_SEED']) if os.environ.get('JINGSHUONIUM_SEED') else None
+
+# --- PROFILING SETTINGS ---
+# F3 toggles the frame profiler overlay in game; F4 starts/stops recording and exports CSV + Chrome trace.
+PROFILER_ENABLED = os.environ.get('JINGSHUONIUM_PROFILE', '0') not in ('', '0')
+PROFILER_WINDOW = 240 # Frames kept for the rolling p50/p95/p99 figures
+PROFILE_DIR = 'profiles' # Where profiler exports are written
+
+# --- SPIKE WATCHDOG SETTINGS ---
+# Frames slower than the threshold write a snapshot (context + recent frame times) to PROFILE_DIR.
+SPIKE_THRESHOLD_MS = 100
+SPIKE_HISTORY_FRAMES = 300 # Size of the ring buffer of recent frame times
+SPIKE_MAX_SNAPSHOTS = 20 # Oldest snapshots are deleted past this, to bound disk usage
+# After a spike, the next SPIKE_PROFILE_WINDOW frames run under cProfile and the first spike among them is
+# written with its call profile. SPIKE_PROFILE_FRAMES profiles every frame instead, at some cost in frame rate.
+SPIKE_PROFILE_WINDOW = 300
+SPIKE_PROFILE_FRAMES = os.environ.get('JINGSHUONIUM_SPIKE_PROFILE', '0') not in ('', '0')
+
+# --- ASSET SETTINGS ---
+ASSET_CACHE_ENABLED = True # Keep decoded/scaled textures in a cache file between launches
+ASSET_CACHE_DIR = '.cache' # Relative to the project root
@@ -2,6 +2,8 @@
 DAY_NIGHT_DURATION = 600 # 10 minutes for a full cycle
 
 # --- CRAFTING RECIPES ---
+# Shapes match anywhere in the 3x3 grid. "mirrored": True also accepts the left-right flip;
+# {"ingredients": [...], "shapeless": True} recipes match in any arrangement (see core/recipes.py).
 CRAFTING_RECIPES = [
     { # 1 Wood -> 4 Planks
         "shape": [["wood"]],
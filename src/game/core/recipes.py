@@ -0,0 +1,98 @@
+from . import definitions
+
+# Recipes in definitions.CRAFTING_RECIPES are dicts with a "result" and either
+#   "shape": rows of item types (None for empty), optionally with "mirrored": True to also match left-right flipped, or
+#   "ingredients": a list of item types with "shapeless": True, matching in any arrangement.
+
+
+def trim_shape(rows):
+    """Returns a shape as a tuple of equal-length row tuples with the empty border rows and columns removed, or None if it's empty."""
+    width = max((len(row) for row in rows), default=0)
+    grid = [tuple(row) + (None,) * (width - len(row)) for row in rows]
+    used_rows = [r for r, row in enumerate(grid) if any(cell is not None for cell in row)]
+    if not used_rows:
+        return None
+    used_cols = [c for c in range(width) if any(row[c] is not None for row in grid)]
+    return tuple(row[used_cols[0]:used_cols[-1] + 1] for row in grid[used_rows[0]:used_rows[-1] + 1])
+
+
+def mirror_shape(shape):
+    return tuple(row[::-1] for row in shape)
+
+
+def ingredient_key(item_types):
+    """The order-free key for a shapeless recipe: its non-empty item types, sorted."""
+    return tuple(sorted(t for t in item_types if t is not None))
+
+
+class RecipeIndex:
+    """Crafting recipes normalized once into dict keys, so matching a grid is a single lookup."""
+
+    def __init__(self, recipes):
+        self.shaped = {} # trimmed shape -> recipe
+        self.shapeless = {} # sorted ingredients -> recipe
+        self.by_result = {} # result type -> [recipes], for a recipe book
+        for recipe in recipes:
+            self.add(recipe)
+
+    def add(self, recipe):
+        """Indexes a recipe. When two recipes share a key, the one listed first wins, as with the old linear scan."""
+        if recipe.get('shapeless'):
+            ingredients = recipe['ingredients'] if 'ingredients' in recipe else [t for row in recipe['shape'] for t in row]
+            self.shapeless.setdefault(ingredient_key(ingredients), recipe)
+        else:
+            shape = trim_shape(recipe['shape'])
+            if shape is None:
+                return
+            self.shaped.setdefault(shape, recipe)
+            if recipe.get('mirrored'):
+                self.shaped.setdefault(mirror_shape(shape), recipe)
+        self.by_result.setdefault(recipe['result']['type'], []).append(recipe)
+
+    def match(self, grid, width=3):
+        """Returns the recipe for a flat, row-major list of item types (None for empty slots), or None."""
+        shape = trim_shape([grid[i:i + width] for i in range(0, len(grid), width)])
+        if shape is None:
+            return None
+        recipe = self.shaped.get(shape)
+        if recipe is None and self.shapeless:
+            recipe = self.shapeless.get(ingredient_key(grid))
+        return recipe
+
+    def recipes_for(self, result_type):
+        """Returns every recipe that makes an item type."""
+        return self.by_result.get(result_type, [])
+
+
+def ingredient_counts(recipe):
+    """Returns {item type: count} consumed by one craft of a recipe."""
+    item_types = recipe['ingredients'] if 'ingredients' in recipe else [t for row in recipe['shape'] for t in row]
+    counts = {}
+    for item_type in item_types:
+        if item_type is not None:
+            counts[item_type] = counts.get(item_type, 0) + 1
+    return counts
+
+
+def max_crafts_from_inventory(inventory, recipe):
+    """How many times a recipe can be crafted from the inventory's contents, limited by the room left for the results."""
+    needed = ingredient_counts(recipe)
+    if not needed:
+        return 0
+    times = min(inventory.count_item(item_type) // count for item_type, count in needed.items())
+    return min(times, inventory.room_for(recipe['result']['type']) // recipe['result']['count'])
+
+
+def craft_from_inventory(inventory, recipe, times=None):
+    """Crafts a recipe up to times (default: as many as possible) straight from the inventory. Returns how many were made."""
+    most = max_crafts_from_inventory(inventory, recipe)
+    times = most if times is None else min(times, most)
+    if times <= 0:
+        return 0
+    for item_type, count in ingredient_counts(recipe).items():
+        inventory.remove_item(item_type, count * times)
+    inventory.add_item(recipe['result']['type'], recipe['result']['count'] * times)
+    return times
+
+
+recipe_index = RecipeIndex(definitions.CRAFTING_RECIPES)
@@ -0,0 +1,41 @@
+import pygame
+
+from . import assets
+
+DAMAGE_FLASH = (255, 100, 100, 0) # Added to an enemy's colour while its damage flash is on, leaving alpha alone
+
+
+class SpriteCache:
+    """Scaled, mirrored and tinted variants of textures, made once and shared by every entity that draws them.
+
+    Variants are keyed by (name, size, flipped, tint), so spawning more enemies of a type costs no texture work
+    and drawing is a dictionary lookup instead of a scale, flip or copy-and-fill every frame.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.variants = {}
+
+    def get(self, name, size, flipped=False, tint=None):
+        """Returns the texture scaled to size, mirrored left-right if flipped, with tint (RGBA) added if given."""
+        size = (int(size[0]), int(size[1]))
+        key = (name, size, flipped, tint)
+        image = self.variants.get(key)
+        if image is None:
+            if tint:
+                image = self.get(name, size, flipped).copy()
+                image.fill(tint, special_flags=pygame.BLEND_RGBA_ADD)
+            elif flipped:
+                image = pygame.transform.flip(self.get(name, size), True, False)
+            else:
+                image = pygame.transform.scale(self.registry[name], size)
+            self.variants[key] = image
+        return image
+
+    def clear(self):
+        """Drops every variant, e.g. after the display mode changes."""
+        self.variants = {}
+
+
+# Shared by every enemy, the horde and the boss
+enemy_sprites = SpriteCache(assets.textures)
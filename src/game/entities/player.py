@@ -5,6 +5,7 @@ from ..core import config
 from ..core import assets
 from ..core import definitions
 from ..ui.inventory import PlayerInventory
+from ..world.block_index import BlockList
 # Placeholder imports for now, will be updated during full refactor
 # from entities.particles import Particle, create_hit_particles, create_explosion_particles
 
@@ -172,6 +173,14 @@ class PlayerController:
                 self.inventory.add_item('stone', 50) # Ammo for the gun
 
         self.pos.x, self.pos.y = self.start_pos.x, self.start_pos.y
+        # If something was built where the player would stand, respawn on top of those columns instead of inside them
+        if isinstance(all_blocks, BlockList):
+            size = assets.BLOCK_SIZE
+            columns = range(int(self.pos.x // size), int((self.pos.x + self.width - 1) // size) + 1)
+            rows = range(int(self.pos.y // size), int((self.pos.y + self.stand_height - 1) // size) + 1)
+            if any(all_blocks.is_solid_at((x, y)) for x in columns for y in rows):
+                top = min(all_blocks.top_solid(x) for x in columns if all_blocks.top_solid(x) is not None)
+                self.pos.y = (top - config.STAND_HEIGHT - 1) * size
         self.vel.x, self.vel.y = 0, 0
         self.is_falling = False
         self.health = self.max_health
@@ -193,7 +202,7 @@ class PlayerController:
                 self.is_crouching = False
                 self.pos.y -= self.stand_height - self.crouch_height
                 self.height = self.stand_height # noqa
-    def update(self, dt, nearby_blocks, all_blocks, block_entities, spatial_grid, mouse_pos=None, selected_item_type=None, world_mouse_pos=None, enemies=None, particles_list=None, break_progress=0, difficulty='normal', darkness_multiplier=0): # noqa
+    def update(self, dt, nearby_blocks, all_blocks, block_entities, spatial_grid, mouse_pos=None, selected_item_type=None, world_mouse_pos=None, enemies=None, particles_list=None, break_progress=0, difficulty='normal', darkness_multiplier=0, keys=None): # noqa
 
         if self.place_cooldown > 0:
             self.place_cooldown -= dt
@@ -225,7 +234,8 @@ class PlayerController:
             self.jumps_left = 0 # Can't jump in water
             self.is_falling = False # Reset fall damage when in water
 
-        keys = pygame.key.get_pressed()
+        # Headless runs pass in scripted keys instead of reading the keyboard
+        if keys is None: keys = pygame.key.get_pressed()
         
         # New facing logic: face mouse if holding a tool, otherwise use keys.
         # Only update facing if it would actually change to prevent micro-adjustments
@@ -0,0 +1,102 @@
+import math
+
+
+class EnemyActivity:
+    """Decides which enemies get updated each tick, so AI cost follows the enemies near the player.
+
+    Enemies within near_radius (pixels) of the player update every tick. Those within mid_radius update every
+    mid_interval ticks with the time they missed, staggered so the same fraction runs each tick. Past that they
+    fall asleep: they're frozen in place and filed in a coarse grid by cell, and each tick only the cells around
+    the player are checked for sleepers to wake. An enemy never sleeps while chasing, attacking or close enough
+    to aggro, and sleepers wake as soon as the player is within their aggro radius, so aggro works as before.
+    """
+
+    def __init__(self, near_radius, mid_radius, mid_interval=4, cell_size=512):
+        self.near_radius = near_radius
+        self.mid_radius = mid_radius
+        self.mid_interval = mid_interval
+        self.cell_size = cell_size
+        self.margin = cell_size / 4 # Sleep a little further out than sleepers wake, so nothing flips every tick
+        self.wake_radius = mid_radius # Grows to the largest aggro radius of anything put to sleep
+        self.sleeping = {} # cell -> {enemy: None}, in the order they fell asleep
+        self.asleep = {} # enemy -> cell
+        self.pending = {} # mid-tier enemy -> [time since its last update, phase]
+        self.tick = 0
+
+    def _cell_of(self, pos):
+        return math.floor(pos[0] / self.cell_size), math.floor(pos[1] / self.cell_size)
+
+    # --- Sleep ---
+    def sleep(self, enemy):
+        cell = self._cell_of(enemy.pos)
+        self.sleeping.setdefault(cell, {})[enemy] = None
+        self.asleep[enemy] = cell
+        self.pending.pop(enemy, None)
+        self.wake_radius = max(self.wake_radius, enemy.aggro_radius)
+
+    def wake(self, enemy):
+        cell = self.asleep.pop(enemy)
+        sleepers = self.sleeping[cell]
+        del sleepers[enemy]
+        if not sleepers:
+            del self.sleeping[cell]
+
+    def wake_near(self, pos):
+        """Wakes the sleepers within their wake distance of pos. Only the grid cells in range are looked at."""
+        px, py = pos[0], pos[1]
+        reach = math.ceil(self.wake_radius / self.cell_size)
+        cx, cy = self._cell_of(pos)
+        woken = []
+        for x in range(cx - reach, cx + reach + 1):
+            for y in range(cy - reach, cy + reach + 1):
+                sleepers = self.sleeping.get((x, y))
+                if sleepers:
+                    for enemy in sleepers:
+                        radius = max(self.mid_radius, enemy.aggro_radius)
+                        if (enemy.pos.x - px) ** 2 + (enemy.pos.y - py) ** 2 <= radius * radius:
+                            woken.append(enemy)
+        for enemy in woken:
+            self.wake(enemy)
+        return woken
+
+    def retain(self, enemies):
+        """Forgets enemies that have left the list (killed, or unloaded with a dungeon section)."""
+        alive = set(enemies)
+        for enemy in [e for e in self.asleep if e not in alive]:
+            self.wake(enemy)
+        for enemy in [e for e in self.pending if e not in alive]:
+            del self.pending[enemy]
+
+    # --- Scheduling ---
+    def schedule(self, enemies, player_pos, dt):
+        """Yields (enemy, dt to update it by) for the enemies that should update this tick."""
+        self.tick += 1
+        if self.sleeping:
+            self.wake_near(player_pos)
+        px, py = player_pos[0], player_pos[1]
+        near_sq = self.near_radius * self.near_radius
+        asleep, pending = self.asleep, self.pending
+        for enemy in enemies:
+            if enemy in asleep:
+                continue
+            distance_sq = (enemy.pos.x - px) ** 2 + (enemy.pos.y - py) ** 2
+            engaged = enemy.ai_state == 'chasing' or enemy.is_attacking
+            if engaged or distance_sq <= near_sq:
+                missed = pending.pop(enemy, None)
+                yield enemy, dt + missed[0] if missed else dt
+                continue
+            sleep_radius = max(self.mid_radius, enemy.aggro_radius) + self.margin
+            if distance_sq > sleep_radius * sleep_radius:
+                self.sleep(enemy)
+                continue
+            entry = pending.get(enemy)
+            if entry is None:
+                entry = pending[enemy] = [0.0, len(pending) % self.mid_interval]
+            entry[0] += dt
+            if (self.tick + entry[1]) % self.mid_interval == 0:
+                yield enemy, entry[0]
+                entry[0] = 0.0
+
+    def counts(self):
+        """Returns (enemies at a reduced rate, enemies asleep), for the debug overlay and benchmarks."""
+        return len(self.pending), len(self.asleep)
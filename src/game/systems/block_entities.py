@@ -0,0 +1,124 @@
+import math
+
+from ..core import definitions
+
+# Furnace entities are dicts: {'type': 'furnace', 'input', 'fuel', 'output'} ({'type', 'count'} or None) plus
+# smelt_progress (seconds into the current item), fuel_left (seconds of burn left) and last_fuel_type (for the UI's bar).
+OUTPUT_STACK_LIMIT = 99999 # Same as the player inventory's stacks
+_EPSILON = 1e-9
+
+
+def new_furnace():
+    return {'type': 'furnace', 'input': None, 'fuel': None, 'output': None, 'smelt_progress': 0.0, 'fuel_left': 0.0, 'last_fuel_type': None}
+
+
+def _smeltable(furnace):
+    """Returns (recipe, how many input items can be smelted before the output stack is full), or (None, 0)."""
+    item = furnace.get('input')
+    recipe = definitions.SMELTING_RECIPES.get(item['type']) if item else None
+    if recipe is None:
+        return None, 0
+    output = furnace.get('output')
+    if output is None:
+        room = OUTPUT_STACK_LIMIT
+    elif output['type'] == recipe['result']:
+        room = OUTPUT_STACK_LIMIT - output['count']
+    else:
+        return None, 0
+    return recipe, min(item['count'], room)
+
+
+def advance_furnace(furnace, elapsed):
+    """Advances a furnace by elapsed seconds in closed form, so a 0.25 s tick and an hour away cost the same. Returns items smelted.
+
+    A fuel item is lit whenever the fire is out and there's something to smelt; a lit fire burns down even with nothing to smelt.
+    Progress on an item is kept (not reset) when the fuel runs out, so it resumes once fuel is added.
+    """
+    progress = furnace.get('smelt_progress', 0.0)
+    fuel_left = furnace.get('fuel_left', 0.0)
+    recipe, items = _smeltable(furnace)
+    if recipe is None or items <= 0:
+        furnace['smelt_progress'] = 0.0 if recipe is None else progress
+        furnace['fuel_left'] = max(0.0, fuel_left - elapsed)
+        return 0
+
+    fuel = furnace.get('fuel')
+    fuel_value = definitions.FUEL_VALUES.get(fuel['type'], 0.0) if fuel else 0.0
+    fuel_count = fuel['count'] if fuel_value > 0 else 0
+
+    # Smelting runs until the time is up, the smeltable items are done or the fire and every fuel item have burnt out.
+    smelt_time = recipe['time']
+    run = max(0.0, min(elapsed, items * smelt_time - progress, fuel_left + fuel_count * fuel_value))
+    smelted = min(items, int((progress + run) / smelt_time + _EPSILON))
+
+    lit = 0
+    if run > fuel_left + _EPSILON:
+        lit = min(fuel_count, math.ceil((run - fuel_left) / fuel_value - _EPSILON))
+    fuel_left = max(0.0, fuel_left + lit * fuel_value - run)
+    progress = 0.0 if smelted == items else max(0.0, progress + run - smelted * smelt_time)
+    if smelted == items:
+        fuel_left = max(0.0, fuel_left - (elapsed - run)) # Nothing left to smelt, but the fire keeps burning
+
+    if lit:
+        furnace['last_fuel_type'] = fuel['type']
+        fuel['count'] -= lit
+        if fuel['count'] <= 0:
+            furnace['fuel'] = None
+    if smelted:
+        furnace['input']['count'] -= smelted
+        if furnace['input']['count'] <= 0:
+            furnace['input'] = None
+        if furnace.get('output'):
+            furnace['output']['count'] += smelted
+        else:
+            furnace['output'] = {'type': recipe['result'], 'count': smelted}
+    furnace['smelt_progress'] = progress
+    furnace['fuel_left'] = fuel_left
+    return smelted
+
+
+# Block entity type -> advance(entity, elapsed); types without one (chests, beds) are never ticked.
+ENTITY_UPDATERS = {
+    'furnace': advance_furnace,
+}
+
+
+def is_ticking(entity):
+    return entity.get('type') in ENTITY_UPDATERS
+
+
+class BlockEntityTicker:
+    """Updates block entities at a low fixed rate instead of every simulation tick.
+
+    The active area is stepped every 1/rate seconds of game time. Every entity it updates is stamped with
+    last_tick, so an area the player left (or a save loaded later) is brought up to date in one closed-form
+    step by catch_up() when it becomes active again.
+    """
+
+    def __init__(self, rate=4, world_time=0.0):
+        self.interval = 1.0 / rate
+        self.world_time = world_time # Seconds of game time simulated so far; saved with the world
+        self.accumulator = 0.0
+
+    def update(self, block_entities, dt):
+        """Adds a simulation tick's dt and updates the active area's entities when an interval has passed. Returns how many were updated."""
+        self.world_time += dt
+        self.accumulator += dt
+        if self.accumulator + _EPSILON < self.interval:
+            return 0
+        self.accumulator = 0.0
+        return self.catch_up(block_entities)
+
+    def catch_up(self, block_entities):
+        """Advances each ticking entity from its last_tick stamp to now, e.g. when the player enters an area."""
+        updated = 0
+        for entity in block_entities.values():
+            updater = ENTITY_UPDATERS.get(entity.get('type'))
+            if updater is None:
+                continue
+            elapsed = self.world_time - entity.get('last_tick', self.world_time)
+            if elapsed > 0:
+                updater(entity, elapsed)
+            entity['last_tick'] = self.world_time
+            updated += 1
+        return updated
@@ -0,0 +1,148 @@
+import heapq
+import math
+
+from ..core import assets
+
+MAX_JUMP = 2 # Blocks an enemy can climb: EnemyController.jump peaks at 3, with nothing to spare
+MAX_DROP = 8 # Longest fall a path may take, in blocks
+
+
+class FlowField:
+    """A Dijkstra map toward the player's tile that every chasing enemy reads its next step from.
+
+    Tiles are places an enemy can stand: open, with a solid block underneath. From a standing tile an enemy
+    can walk to the next one along, jump up to MAX_JUMP blocks onto a neighbouring column if there's headroom,
+    or step off an edge and drop up to MAX_DROP. The search runs backwards from the player's tile over those
+    moves, out to radius steps, and is only redone when the player stands on a new tile or the blocks change,
+    so a crowd of enemies costs one search per player move rather than one per enemy. Searches are at least
+    interval update calls apart, so a burst of mining or a fall through many tiles costs one search, not one
+    per change; in between, enemies steer by the last one.
+    """
+
+    def __init__(self, radius=40, interval=1):
+        self.radius = radius
+        self.interval = interval
+        self.calls_since_search = interval
+        self.target = None
+        self.blocks_version = None
+        self.distance = {} # (x, y) -> cost to reach the target
+        self.next_step = {} # (x, y) -> the tile to head for next
+        self.searches = 0
+
+    # --- Tiles ---
+    @staticmethod
+    def feet_tile(rect):
+        """The tile holding the bottom middle of rect: where something standing is standing."""
+        return math.floor(rect.centerx / assets.BLOCK_SIZE), math.floor((rect.bottom - 1) / assets.BLOCK_SIZE)
+
+    def standing_tile(self, rect, solid):
+        """The standing tile under rect, looking up to MAX_DROP blocks down if it's in the air, or None."""
+        x, y = self.feet_tile(rect)
+        for drop in range(MAX_DROP + 1):
+            if solid(x, y + drop + 1):
+                return (x, y + drop) if not solid(x, y + drop) else None
+        return None
+
+    # --- Search ---
+    def update(self, player_rect, blocks):
+        """Searches again if the player is standing on a new tile or blocks (a BlockList) changed, and the last
+        search is at least interval calls old. Returns True if it did."""
+        self.calls_since_search += 1
+        if self.calls_since_search < self.interval:
+            return False
+        solid = self._solid_lookup(blocks)
+        target = self.standing_tile(player_rect, solid)
+        if target is None: # Mid-jump over a pit: keep steering toward where the player last stood
+            return False
+        if target == self.target and blocks.version == self.blocks_version:
+            return False
+        self.calls_since_search = 0
+        self.target, self.blocks_version = target, blocks.version
+        self.search(target, solid)
+        return True
+
+    @staticmethod
+    def _solid_lookup(blocks):
+        at = blocks.at
+        cache = {}
+
+        def solid(x, y):
+            key = (x, y)
+            found = cache.get(key)
+            if found is None:
+                found = cache[key] = any(block.is_solid for block in at.get(key, ()))
+            return found
+        return solid
+
+    def search(self, target, solid):
+        """Fills distance and next_step with a Dijkstra search from target over the reversed moves."""
+        self.searches += 1
+
+        def standing(x, y):
+            return not solid(x, y) and solid(x, y + 1)
+
+        distance, next_step = {target: 0}, {}
+        queue = [(0, target)]
+        while queue:
+            cost, tile = heapq.heappop(queue)
+            if cost > distance[tile] or cost >= self.radius:
+                continue
+            x, y = tile
+            for nx in (x - 1, x + 1):
+                for origin, step_cost in self._arrivals(x, y, nx, solid, standing):
+                    new_cost = cost + step_cost
+                    if new_cost < distance.get(origin, new_cost + 1):
+                        distance[origin] = new_cost
+                        next_step[origin] = tile
+                        heapq.heappush(queue, (new_cost, origin))
+        self.distance, self.next_step = distance, next_step
+
+    @staticmethod
+    def _arrivals(x, y, nx, solid, standing):
+        """Yields (standing tile in column nx, cost) for every move from there that ends on (x, y)."""
+        if standing(nx, y):
+            yield (nx, y), 1 # Walk across
+        # Jump up from lower down column nx: the jumper rises in its own column, then moves over onto (x, y)
+        for rise in range(1, MAX_JUMP + 1):
+            if solid(nx, y + rise - 1):
+                break
+            if standing(nx, y + rise):
+                yield (nx, y + rise), 1 + rise
+        # Drop from higher up column nx: step sideways into column x above (x, y) and fall down onto it
+        for fall in range(1, MAX_DROP + 1):
+            if solid(x, y - fall):
+                break
+            if standing(nx, y - fall):
+                yield (nx, y - fall), 1 + fall // 2
+
+    # --- Steering ---
+    def step_for(self, rect):
+        """Returns (direction, climb) for something at rect: which way to walk (-1 or 1) and whether to jump.
+
+        Returns None if rect is on the player's tile or on none the field reaches (in the air, cut off or too
+        far), so the caller can fall back to steering straight at the player.
+        """
+        return self.step_at(self.feet_tile(rect), rect.left, rect.right)
+
+    def step_at(self, tile, left=None, right=None):
+        """Like step_for, for the tile under something's middle and, if given, the pixel span of its sides.
+
+        Overhanging a ledge, the middle can be over open air while a side still stands on the ledge, so the
+        sides' tiles are tried next. In mid-air the step is the one from the tile below, so a jump keeps its course.
+        """
+        x, y = tile
+        size = assets.BLOCK_SIZE
+        candidates = [(x, y)]
+        if left is not None:
+            candidates += [(column, y) for column in (left // size, (right - 1) // size) if column != x]
+        candidates += [(x, y + drop) for drop in range(1, MAX_JUMP + 2)]
+        for column, row in candidates:
+            step = self.next_step.get((column, row))
+            if step is not None:
+                direction, climb = (1 if step[0] > column else -1), step[1] < row
+                if climb and row == y and left is not None and (right > (column + 1) * size if direction > 0 else left < column * size):
+                    return -direction, False # Back off until clear of the next column, or the jump catches its edge
+                return direction, climb
+            if (column, row) in self.distance: # The player's own tile
+                return None
+        return None
@@ -0,0 +1,49 @@
+import pygame
+
+
+class ScriptedKeys:
+    """Stand-in for pygame.key.get_pressed() that reports a fixed set of held keys."""
+
+    def __init__(self, held=()):
+        self.held = set(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class InputScript:
+    """Replays held keys and one-off events against simulation tick numbers."""
+
+    def __init__(self, holds=None, events=None):
+        self.holds = holds or [] # (start_tick, end_tick, key) - key is held for start <= tick < end
+        self.events = events or {} # tick -> list of pygame events posted before that tick
+
+    def hold(self, key, start_tick, end_tick):
+        """Holds a key down for a range of ticks."""
+        self.holds.append((start_tick, end_tick, key))
+        return self
+
+    def post(self, tick, event_type, **attributes):
+        """Queues a pygame event to be delivered just before the given tick."""
+        self.events.setdefault(tick, []).append(pygame.event.Event(event_type, attributes))
+        return self
+
+    def keys_at(self, tick):
+        """Returns the keys held during a tick."""
+        return ScriptedKeys(key for start, end, key in self.holds if start <= tick < end)
+
+    def events_at(self, tick):
+        """Returns the events due at a tick."""
+        return self.events.get(tick, [])
+
+
+def default_input_script(ticks):
+    """Walks back and forth and jumps every so often, to exercise player physics and collisions."""
+    script = InputScript()
+    stride = 120
+    for start in range(0, ticks, stride * 2):
+        script.hold(pygame.K_d, start, start + stride)
+        script.hold(pygame.K_a, start + stride, start + stride * 2)
+    for start in range(30, ticks, 90):
+        script.hold(pygame.K_w, start, start + 10)
+    return script
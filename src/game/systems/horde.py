@@ -0,0 +1,375 @@
+import math
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError: # The horde is optional; without NumPy every enemy is an EnemyController
+    np = None
+
+from ..core import assets, config, definitions
+from ..core.sprite_cache import DAMAGE_FLASH, enemy_sprites
+
+HAS_NUMPY = np is not None
+
+JUMP_SPEED = math.sqrt(2 * 3 * assets.BLOCK_SIZE * assets.BLOCK_SIZE * config.GRAVITY * config.GRAVITY_MULTIPLIER) # Same 3-block jump as EnemyController
+MAX_FALL_SPEED = assets.BLOCK_SIZE * 20
+ATTACK_WINDUP = 0.5
+ATTACK_COOLDOWN = 1.0
+FLASH_DURATION = 0.2
+KNOCKBACK_STRENGTH = 150
+KNOCKBACK_LIFT = 120
+
+
+def enemy_size(enemy_type):
+    """(width, height) of an enemy's hitbox, as EnemyController sizes it."""
+    if enemy_type == 'goliath':
+        return assets.BLOCK_SIZE * 2 - 4, assets.BLOCK_SIZE * 2 - 4
+    return assets.BLOCK_SIZE - 2, assets.BLOCK_SIZE - 4
+
+
+class SolidGrid:
+    """Which tiles of a box of the world hold a solid block, as a 2D bool array for batch collision.
+
+    Tiles outside the box are open, like tiles with no block in them.
+    """
+
+    def __init__(self, x0, y0, width, height):
+        self.x0, self.y0 = x0, y0
+        self.cells = np.zeros((height, width), dtype=bool) # [y - y0, x - x0]
+
+    @classmethod
+    def from_blocks(cls, blocks, margin=4):
+        solid = [(int(b.grid_pos.x), int(b.grid_pos.y)) for b in blocks if b.is_solid]
+        if not solid:
+            return cls(0, 0, 1, 1)
+        xs, ys = np.array(solid).T
+        grid = cls(int(xs.min()) - margin, int(ys.min()) - margin, int(xs.max() - xs.min()) + 2 * margin + 1, int(ys.max() - ys.min()) + 2 * margin + 1)
+        grid.cells[ys - grid.y0, xs - grid.x0] = True
+        return grid
+
+    def clear(self):
+        self.cells[:] = False
+
+    def set_solid(self, x, y, solid):
+        gx, gy = int(x) - self.x0, int(y) - self.y0
+        if 0 <= gy < self.cells.shape[0] and 0 <= gx < self.cells.shape[1]:
+            self.cells[gy, gx] = solid
+
+    def lookup(self, tx, ty):
+        """Vectorized: whether each tile (tx[i], ty[i]) is solid."""
+        gx, gy = tx - self.x0, ty - self.y0
+        height, width = self.cells.shape
+        inside = (gx >= 0) & (gx < width) & (gy >= 0) & (gy < height)
+        result = np.zeros(len(tx), dtype=bool)
+        result[inside] = self.cells[gy[inside], gx[inside]]
+        return result
+
+
+class HordeEnemy:
+    """A horde enemy as the rest of the game sees it, for the weapons and projectiles that hit enemies one at a time.
+
+    Its state lives in the horde's arrays at index, which moves when other members are removed.
+    """
+
+    def __init__(self, horde, index, enemy_type):
+        self.horde = horde
+        self.index = index
+        self.enemy_type = enemy_type
+        self.is_dying = False
+
+    @property
+    def pos(self):
+        return pygame.Vector2(self.horde.pos[self.index].tolist())
+
+    @property
+    def rect(self):
+        x, y = self.horde.pos[self.index]
+        width, height = self.horde.size[self.index]
+        return pygame.Rect(int(x), int(y), int(width), int(height))
+
+    @property
+    def health(self):
+        return float(self.horde.health[self.index])
+
+    def take_damage(self, amount, player, source_pos=None, knockback_vector=None):
+        if not self.is_dying:
+            self.horde.damage(self.index, amount, player, source_pos, knockback_vector)
+
+
+class Horde:
+    """Common enemies (zombies, brutes, crawlers, goliaths) kept as NumPy arrays and stepped all at once.
+
+    Movement, gravity, wandering and chasing are array operations, and tile collision is resolved in batch
+    against a SolidGrid. Only the rare events (an attack landing, a hit, a death) drop to per-enemy Python.
+    Rows are kept dense: a dead enemy's row is filled from the last row, and its HordeEnemy moves with it.
+    The boss has its own behaviour and stays an EnemyController. Water isn't simulated for horde enemies.
+    """
+
+    TYPES = ('zombie', 'zombie_brute', 'crawler', 'goliath') # Enemy types the horde can stand in for
+
+    FIELDS = {
+        'pos': (2, float), 'vel': (2, float), 'size': (2, float), 'health': (None, float), 'max_health': (None, float),
+        'attack': (None, float), 'speed': (None, float), 'aggro': (None, float), 'xp': (None, int),
+        'facing': (None, float), 'ai_timer': (None, float), 'attack_cooldown': (None, float), 'jump_cooldown': (None, float),
+        'windup': (None, float), 'flash': (None, float),
+        'attacking': (None, bool), 'chasing': (None, bool), 'grounded': (None, bool), 'dying': (None, bool),
+    }
+
+    def __init__(self, solid_grid=None, capacity=256, rng=None):
+        if np is None:
+            raise ImportError('Horde needs NumPy')
+        self.solid = solid_grid if solid_grid is not None else SolidGrid(0, 0, 1, 1)
+        self.rng = rng or np.random.default_rng()
+        self.count = 0
+        self.members = []
+        for name, (columns, dtype) in self.FIELDS.items():
+            setattr(self, name, np.zeros((capacity, columns) if columns else capacity, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+
+    # --- Membership ---
+    def spawn(self, pos, enemy_type='zombie'):
+        """Adds an enemy with its top-left at pos. Returns its HordeEnemy."""
+        if self.count == len(self.health):
+            self._grow()
+        i = self.count
+        stats = definitions.ENEMY_STATS.get(enemy_type, definitions.ENEMY_STATS['zombie'])
+        for name in self.FIELDS:
+            getattr(self, name)[i] = 0
+        self.pos[i] = pos
+        self.size[i] = enemy_size(enemy_type)
+        self.health[i] = self.max_health[i] = stats['health']
+        self.attack[i] = stats['damage']
+        self.speed[i] = config.WALK_SPEED * stats['speed_mult'] * assets.BLOCK_SIZE * 0.5
+        self.aggro[i] = assets.BLOCK_SIZE * stats['aggro']
+        self.xp[i] = stats['xp']
+        self.facing[i] = -1
+        self.ai_timer[i] = self.rng.uniform(2, 5)
+        member = HordeEnemy(self, i, enemy_type)
+        self.members.append(member)
+        self.count += 1
+        return member
+
+    def follow_blocks(self, blocks):
+        """Rebuilds the collision grid from blocks (a BlockList), which then keeps it current as blocks are mined or placed."""
+        self.solid = SolidGrid.from_blocks(blocks)
+        blocks.solid_grid = self.solid
+
+    def remove_members(self, members):
+        """Takes members out of the horde without killing them, e.g. when their dungeon section unloads."""
+        for i in sorted((member.index for member in members if member.index is not None), reverse=True):
+            self._remove(i)
+
+    def _remove(self, i):
+        last = self.count - 1
+        self.members[i].is_dying = True
+        self.members[i].index = None
+        if i != last:
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[i] = array[last]
+            self.members[i] = self.members[last]
+            self.members[i].index = i
+        self.members.pop()
+        self.count -= 1
+
+    def sweep(self):
+        """Removes the enemies killed since the last update."""
+        for i in sorted(np.nonzero(self.dying[:self.count])[0].tolist(), reverse=True):
+            self._remove(i)
+
+    def enemies_in(self, rect):
+        """Returns the live HordeEnemys whose hitbox overlaps rect, for hit checks written against enemy lists."""
+        n = self.count
+        if not n:
+            return []
+        x, y = self.pos[:n, 0], self.pos[:n, 1]
+        width, height = self.size[:n, 0], self.size[:n, 1]
+        hit = (x < rect.right) & (x + width > rect.left) & (y < rect.bottom) & (y + height > rect.top) & ~self.dying[:n]
+        return [self.members[i] for i in np.nonzero(hit)[0].tolist()]
+
+    def members_outside(self, left, top, right, bottom):
+        """Returns the HordeEnemys whose top-left corner is outside the pixel box [left, right) x [top, bottom)."""
+        n = self.count
+        x, y = self.pos[:n, 0], self.pos[:n, 1]
+        outside = (x < left) | (x >= right) | (y < top) | (y >= bottom)
+        return [self.members[i] for i in np.nonzero(outside)[0].tolist()]
+
+    # --- Damage ---
+    def damage(self, i, amount, player, source_pos=None, knockback_vector=None):
+        self.health[i] -= amount
+        self.flash[i] = FLASH_DURATION
+        if knockback_vector:
+            self.vel[i] += (knockback_vector[0] * 0.15, knockback_vector[1] * 0.15 - KNOCKBACK_LIFT * 0.4)
+            self.grounded[i] = False
+        elif source_pos:
+            away = pygame.Vector2(self.pos[i].tolist()) - pygame.Vector2(source_pos)
+            if away.length_squared() > 0:
+                away.scale_to_length(KNOCKBACK_STRENGTH)
+                self.vel[i] += (away.x, away.y - KNOCKBACK_LIFT)
+                self.grounded[i] = False
+        if self.health[i] <= 0:
+            self.health[i] = 0
+            self.dying[i] = True
+            player.add_xp(int(self.xp[i]))
+
+    # --- Simulation ---
+    def light_speed(self, darkness_multiplier, light_cone_tiles):
+        """Per-enemy speed_multiplier for darkness mode, as EnemyController works it out: 0 in daylight or light, 3 in the dark."""
+        n = self.count
+        if darkness_multiplier < 0.1:
+            return np.zeros(n)
+        centers = np.floor(self.pos[:n] + self.size[:n] / 2).astype(int) // assets.BLOCK_SIZE
+        lit = [tuple(tile) in light_cone_tiles for tile in centers.tolist()] if light_cone_tiles else [False] * n
+        return np.where(lit, 0.0, 3.0)
+
+    def update(self, dt, player, particles_list=None, speed_multiplier=1.0, flow_field=None):
+        """Steps every horde enemy by dt. speed_multiplier is EnemyController's: one for all, or one per enemy (see light_speed).
+
+        With a FlowField, chasing enemies on a tile it reaches follow its path instead of heading straight for the player.
+        """
+        self.sweep()
+        n = self.count
+        if not n:
+            return
+        pos, vel = self.pos[:n], self.vel[:n]
+        facing, ai_timer = self.facing[:n], self.ai_timer[:n]
+        attacking, chasing, grounded = self.attacking[:n], self.chasing[:n], self.grounded[:n]
+        for name in ('flash', 'jump_cooldown', 'attack_cooldown'):
+            timer = getattr(self, name)[:n]
+            np.subtract(timer, dt, out=timer, where=timer > 0)
+
+        # --- AI ---
+        player_rect = player.rect
+        dx = player.pos.x - pos[:, 0]
+        dy = player.pos.y - pos[:, 1]
+        idle = ~attacking
+        chasing[idle] = (dx * dx + dy * dy < self.aggro[:n] ** 2)[idle]
+        turn = idle & chasing & (np.abs(dx) > 5)
+        facing[turn] = np.sign(dx[turn])
+        climb = None
+        if flow_field is not None and flow_field.next_step:
+            climb = self._follow(flow_field, idle & chasing)
+        wander = idle & ~chasing
+        ai_timer[wander] -= dt
+        flip = wander & (ai_timer <= 0)
+        if flip.any():
+            ai_timer[flip] = self.rng.uniform(2, 5, int(flip.sum()))
+            facing[flip] *= -1
+
+        # Attacks wind up in batch; the few that land are applied one by one
+        windup = self.windup[:n]
+        windup[attacking] -= dt
+        landed = attacking & (windup <= 0)
+        if landed.any():
+            overlapping = self._overlaps(player_rect, 0)
+            for i in np.nonzero(landed & overlapping)[0].tolist():
+                player.take_damage(float(self.attack[i]), source=self.members[i], source_pos=pygame.Vector2(pos[i].tolist()), particles_list=particles_list)
+            attacking[landed] = False
+            self.attack_cooldown[:n][landed] = ATTACK_COOLDOWN
+        target_vel_x = np.where(attacking, 0.0, facing * self.speed[:n] * speed_multiplier)
+        if climb is not None and climb.any():
+            self._jump(climb)
+        start = idle & (self.attack_cooldown[:n] <= 0) & self._overlaps(player_rect, assets.BLOCK_SIZE)
+        if start.any():
+            attacking[start] = True
+            windup[start] = ATTACK_WINDUP
+            vel[start, 0] = 0
+
+        # --- Physics ---
+        friction = np.where(grounded, config.FRICTION, config.AIR_FRICTION)
+        vel[:, 0] += (target_vel_x - vel[:, 0]) * friction * dt
+        vel[:, 1] = np.minimum(vel[:, 1] + config.GRAVITY * config.GRAVITY_MULTIPLIER * assets.BLOCK_SIZE * dt, MAX_FALL_SPEED)
+
+        pos[:, 0] += vel[:, 0] * dt
+        blocked = self._collide(0)
+        if blocked.any():
+            self._jump(blocked & chasing)
+            turn_back = blocked & ~chasing
+            facing[turn_back] *= -1
+            ai_timer[turn_back] = self.rng.uniform(1, 3, int(turn_back.sum()))
+
+        falling = vel[:, 1] > 0
+        pos[:, 1] += vel[:, 1] * dt
+        landed = self._collide(1)
+        grounded[:] = landed & falling
+
+    def _jump(self, wanted):
+        """Starts a jump for the enemies in wanted that are on the ground and off cooldown."""
+        n = self.count
+        jumps = wanted & self.grounded[:n] & (self.jump_cooldown[:n] <= 0)
+        self.vel[:n][jumps, 1] = -JUMP_SPEED
+        self.grounded[:n][jumps] = False
+        self.jump_cooldown[:n][jumps] = self.rng.uniform(0.5, 1.5, int(jumps.sum()))
+
+    def _follow(self, flow_field, chasing):
+        """Points chasing enemies along the flow field's path. Returns which of them need to jump to climb."""
+        n = self.count
+        size_px = assets.BLOCK_SIZE
+        indices = np.nonzero(chasing)[0]
+        climb = np.zeros(n, dtype=bool)
+        if not len(indices):
+            return climb
+        left, top = np.floor(self.pos[indices, 0]).astype(int), np.floor(self.pos[indices, 1]).astype(int)
+        width, height = self.size[indices, 0].astype(int), self.size[indices, 1].astype(int)
+        tile_x = ((left + width // 2) // size_px).tolist()
+        tile_y = ((top + height - 1) // size_px).tolist()
+        step_at = flow_field.step_at
+        for i, x, y, l, r in zip(indices.tolist(), tile_x, tile_y, left.tolist(), (left + width).tolist()):
+            step = step_at((x, y), l, r)
+            if step is not None:
+                self.facing[i], climb[i] = step
+        return climb
+
+    def _overlaps(self, rect, reach):
+        """Which enemies' hitboxes, widened by reach (half to either side), overlap rect."""
+        n = self.count
+        x, y = np.floor(self.pos[:n, 0]) - reach / 2, np.floor(self.pos[:n, 1])
+        return (x < rect.right) & (x + self.size[:n, 0] + reach > rect.left) & (y < rect.bottom) & (y + self.size[:n, 1] > rect.top)
+
+    def _collide(self, axis):
+        """Pushes enemies moving along axis (0 = x, 1 = y) out of the solid tiles on their leading edge. Returns who hit one.
+
+        A step never moves more than a tile at 60 Hz, so only the row or column of tiles just entered can be hit.
+        """
+        n, size_px = self.count, assets.BLOCK_SIZE
+        pos, vel, size = self.pos[:n], self.vel[:n], self.size[:n]
+        other = 1 - axis
+        forward = vel[:, axis] > 0
+        moving = forward | (vel[:, axis] < 0)
+        # Tiles a hitbox touches by any fraction of a pixel, so resting on the floor still registers as contact
+        lead = np.where(forward, np.ceil(pos[:, axis] + size[:, axis]) - 1, np.floor(pos[:, axis])).astype(int) // size_px
+        first = np.floor(pos[:, other]).astype(int) // size_px
+        last = (np.ceil(pos[:, other] + size[:, other]).astype(int) - 1) // size_px
+        hit = np.zeros(n, dtype=bool)
+        for k in range(int((last - first).max()) + 1):
+            across = first + k
+            tiles = (lead, across) if axis == 0 else (across, lead)
+            hit |= (across <= last) & self.solid.lookup(*tiles)
+        hit &= moving
+        if hit.any():
+            pos[hit, axis] = np.where(forward[hit], lead[hit] * size_px - size[hit, axis], (lead[hit] + 1) * size_px)
+            vel[hit, axis] = 0
+        return hit
+
+    # --- Drawing ---
+    def draw(self, surface, camera_offset):
+        n = self.count
+        if not n:
+            return
+        view = pygame.Rect(camera_offset, surface.get_size())
+        visible = np.nonzero(self._overlaps(view, 0))[0].tolist()
+        x = (np.floor(self.pos[:n, 0]) - camera_offset.x).tolist()
+        y = (np.floor(self.pos[:n, 1]) - camera_offset.y).tolist()
+        flipped = (self.facing[:n] == 1).tolist()
+        flashing = (self.flash[:n] > 0).tolist()
+        sizes = self.size[:n].tolist()
+        members, get = self.members, enemy_sprites.get
+        surface.blits([(get(members[i].enemy_type, sizes[i], flipped[i], DAMAGE_FLASH if flashing[i] else None), (x[i], y[i])) for i in visible], doreturn=False)
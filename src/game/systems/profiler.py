@@ -0,0 +1,175 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+from ..core import config
+
+
+class _NullScope:
+    """Shared do-nothing context manager handed out while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    """Times named scopes each frame and keeps a rolling window of per-scope frame totals."""
+
+    def __init__(self, window=240, enabled=False, max_trace_events=200000):
+        self.window = window
+        self.enabled = enabled
+        self.max_trace_events = max_trace_events
+        self.history = {} # scope name -> deque of per-frame milliseconds
+        self.current = {} # scope name -> milliseconds spent so far this frame
+        self.frame_index = 0
+        self.frame_start = None
+        self.recording = False
+        self.trace_events = [] # Chrome trace 'X' events while recording
+        self.csv_rows = [] # (frame_index, {scope: ms}) while recording
+        self._overlay = None
+        self._overlay_frame = -1
+
+    # --- Instrumentation ---
+    def scope(self, name):
+        """Returns a context manager that times the enclosed block under the given name."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def record(self, name, start, end):
+        """Adds a finished scope to the current frame."""
+        ms = (end - start) * 1000.0
+        self.current[name] = self.current.get(name, 0.0) + ms
+        if self.recording and len(self.trace_events) < self.max_trace_events:
+            self.trace_events.append({'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': ms * 1000.0, 'pid': 0, 'tid': 0})
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Closes the frame and pushes its scope totals into the rolling window."""
+        if not self.enabled or self.frame_start is None:
+            return
+        self.record('frame', self.frame_start, time.perf_counter())
+        for name, ms in self.current.items():
+            samples = self.history.get(name)
+            if samples is None:
+                samples = self.history[name] = deque(maxlen=self.window)
+            samples.append(ms)
+        if self.recording:
+            self.csv_rows.append((self.frame_index, self.current))
+        self.current = {}
+        self.frame_index += 1
+        self.frame_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = {}
+        self.frame_start = None
+        return self.enabled
+
+    # --- Statistics ---
+    def percentiles(self, name):
+        """Returns (p50, p95, p99) in milliseconds for a scope over the rolling window."""
+        samples = sorted(self.history.get(name, ()))
+        if not samples:
+            return 0.0, 0.0, 0.0
+        last = len(samples) - 1
+        return tuple(samples[min(last, int(p * len(samples)))] for p in (0.50, 0.95, 0.99))
+
+    def summary(self):
+        """Returns [(name, p50, p95, p99)] with the frame total first and the rest by p95, slowest first."""
+        rows = [(name,) + self.percentiles(name) for name in self.history if name != 'frame']
+        rows.sort(key=lambda row: row[2], reverse=True)
+        if 'frame' in self.history:
+            rows.insert(0, ('frame',) + self.percentiles('frame'))
+        return rows
+
+    # --- Overlay ---
+    def draw(self, surface, font, refresh_frames=15):
+        """Draws the F3 breakdown in the top-right corner. The text is only rebuilt every few frames."""
+        if not self.enabled:
+            return
+        if self._overlay is None or self.frame_index - self._overlay_frame >= refresh_frames:
+            self._overlay = self._build_overlay(font)
+            self._overlay_frame = self.frame_index
+        surface.blit(self._overlay, (surface.get_width() - self._overlay.get_width() - 10, 10))
+
+    def _build_overlay(self, font):
+        lines = [f"{'scope':<18}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        lines += [f"{name[:18]:<18}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}" for name, p50, p95, p99 in self.summary()]
+        if self.recording:
+            lines.append(f"recording: {len(self.csv_rows)} frames")
+        rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+        line_height = font.get_linesize()
+        width = max(r.get_width() for r in rendered) + 16
+        overlay = pygame.Surface((width, line_height * len(rendered) + 12), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, r in enumerate(rendered):
+            overlay.blit(r, (8, 6 + i * line_height))
+        return overlay
+
+    # --- Export ---
+    def start_recording(self):
+        """Starts keeping every frame's timings for CSV and Chrome-trace export."""
+        self.recording = True
+        self.trace_events = []
+        self.csv_rows = []
+
+    def stop_recording(self):
+        self.recording = False
+
+    def export(self, directory):
+        """Writes the recording as a CSV and a Chrome trace in directory and returns both paths."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        csv_path = os.path.join(directory, f'frames_{stamp}.csv')
+        trace_path = os.path.join(directory, f'trace_{stamp}.json')
+        self.export_csv(csv_path)
+        self.export_chrome_trace(trace_path)
+        return csv_path, trace_path
+
+    def export_csv(self, path):
+        """Writes one row per recorded frame with a column per scope, in milliseconds."""
+        names = sorted({name for _, frame in self.csv_rows for name in frame})
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame_index'] + names)
+            for index, frame in self.csv_rows:
+                writer.writerow([index] + [f"{frame.get(name, 0.0):.4f}" for name in names])
+
+    def export_chrome_trace(self, path):
+        """Writes the recorded scopes in Chrome's trace event format (open in chrome://tracing or Perfetto)."""
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}, f)
+
+
+# The game-wide profiler; game_loop and the UI draw code time themselves through this.
+profiler = FrameProfiler(config.PROFILER_WINDOW, config.PROFILER_ENABLED)
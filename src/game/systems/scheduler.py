@@ -0,0 +1,67 @@
+import time
+
+
+class TaskScheduler:
+    """Runs long jobs written as generators a slice at a time, within a time budget per frame.
+
+    A task does a small piece of work between yields. run() resumes the tasks round-robin until the frame's
+    budget is used up, so a day rollover or a save is spread over several frames instead of stalling one.
+    """
+
+    def __init__(self, budget_ms=2.0, clock=time.perf_counter):
+        self.budget = budget_ms / 1000.0
+        self.clock = clock
+        self.tasks = [] # [name, generator, on_done], in the order they're next resumed
+
+    def add(self, name, generator, on_done=None, replace=False):
+        """Queues a generator. on_done(result) is called with its return value when it finishes."""
+        if replace:
+            self.cancel(name)
+        self.tasks.append([name, generator, on_done])
+        return generator
+
+    def cancel(self, name):
+        for task in [t for t in self.tasks if t[0] == name]:
+            self.tasks.remove(task)
+            task[1].close()
+
+    def is_running(self, name):
+        return any(task[0] == name for task in self.tasks)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def _step(self, task):
+        """Resumes a task once. Returns False when it has finished."""
+        try:
+            next(task[1])
+            return True
+        except StopIteration as done:
+            if task[2] is not None:
+                task[2](done.value)
+            return False
+
+    def run(self, budget=None):
+        """Resumes tasks until the budget (seconds, default the scheduler's) is spent. Returns how many steps ran."""
+        deadline = self.clock() + (self.budget if budget is None else budget)
+        steps = 0
+        # At least one step always runs, so queued work finishes even on frames that are already over budget
+        while self.tasks and (steps == 0 or self.clock() < deadline):
+            task = self.tasks.pop(0)
+            if self._step(task):
+                self.tasks.append(task)
+            steps += 1
+        return steps
+
+    def finish(self, name=None):
+        """Runs tasks (all, or just those named) to completion right away, e.g. before quitting.
+
+        Tasks queued by on_done callbacks along the way are run too.
+        """
+        while True:
+            task = next((t for t in self.tasks if name is None or t[0] == name), None)
+            if task is None:
+                return
+            self.tasks.remove(task)
+            while self._step(task):
+                pass
@@ -0,0 +1,28 @@
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed simulation ticks."""
+
+    def __init__(self, tick_rate=60, max_steps=5):
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.tick_count = 0
+
+    def advance(self, frame_time):
+        """Adds a frame's elapsed time and returns how many ticks to simulate now."""
+        # Clamp very long frames so a hitch can't queue up an ever-growing backlog of ticks.
+        # Past this point the game slows down instead of freezing to catch up.
+        self.accumulator += min(frame_time, self.max_steps * self.dt)
+        # The epsilon keeps float error from turning e.g. 5 * dt into 4.999... ticks
+        steps = int(self.accumulator / self.dt + 1e-9)
+        self.accumulator = max(0.0, self.accumulator - steps * self.dt)
+        self.tick_count += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the renderer is between the previous and the current tick (0 to 1)."""
+        return min(1.0, max(0.0, self.accumulator / self.dt))
+
+    def reset(self):
+        """Drops any accumulated time, e.g. while paused, so resuming doesn't fast-forward."""
+        self.accumulator = 0.0
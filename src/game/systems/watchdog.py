@@ -0,0 +1,101 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import deque
+
+
+class SpikeWatchdog:
+    """Keeps a ring buffer of recent frame times and writes a snapshot whenever a frame runs too long.
+
+    Unless profile_frames is on, frames aren't profiled until a spike is seen; then the next profile_window
+    frames run under cProfile, and the first spike among them is written with its call profile, cooldown or not.
+    """
+
+    def __init__(self, threshold_ms=100, history=300, directory='profiles', max_snapshots=20, profile_frames=False, warmup_frames=30, cooldown=2.0, profile_window=300):
+        self.threshold_ms = threshold_ms
+        self.frame_times = deque(maxlen=history)
+        self.directory = directory
+        self.max_snapshots = max_snapshots
+        self.profile_frames = profile_frames # cProfile every frame so a spike comes with its call profile
+        self.warmup_frames = warmup_frames # The first frames after loading are always slow; don't report them
+        self.cooldown = cooldown # Seconds between snapshots, so a sustained slowdown doesn't write one per frame
+        self.profile_window = profile_window # Frames profiled after an unprofiled spike
+        self.profile_until = 0 # Frame count up to which frames are profiled
+        self.frame_count = 0
+        self.snapshots_written = 0
+        self._frame_start = None
+        self._profile = None
+        self._last_snapshot = float('-inf')
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+        if self.profile_frames or self.frame_count < self.profile_until:
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError: # Another profiler is already active (e.g. the game was started under cProfile)
+                self._profile = None
+
+    def end_frame(self, context=None):
+        """Closes the frame. context is a callable returning a dict, only evaluated for spikes. Returns the snapshot path, if any."""
+        if self._frame_start is None:
+            return None
+        now = time.perf_counter()
+        elapsed_ms = (now - self._frame_start) * 1000.0
+        profile, self._profile, self._frame_start = self._profile, None, None
+        if profile:
+            profile.disable()
+        self.frame_times.append(elapsed_ms)
+        self.frame_count += 1
+
+        if elapsed_ms < self.threshold_ms or self.frame_count <= self.warmup_frames:
+            return None
+        awaited = profile is not None and self.profile_until > 0 # The first profiled spike after an unprofiled one
+        if now - self._last_snapshot < self.cooldown and not awaited:
+            return None
+        if profile is None:
+            self.profile_until = self.frame_count + self.profile_window
+        elif not self.profile_frames:
+            self.profile_until = 0
+        self._last_snapshot = now
+        return self.write_snapshot(elapsed_ms, context() if context else {}, profile)
+
+    def write_snapshot(self, elapsed_ms, context, profile=None):
+        """Writes spike_<time>.txt (context, recent frames, hottest calls) and spike_<time>.prof for pstats/snakeviz."""
+        os.makedirs(self.directory, exist_ok=True)
+        stem = os.path.join(self.directory, time.strftime('spike_%Y%m%d-%H%M%S') + f'_{self.frame_count:08d}')
+        recent = list(self.frame_times)
+
+        lines = [f"Frame {self.frame_count} took {elapsed_ms:.1f} ms (threshold {self.threshold_ms} ms)", ""]
+        lines += [f"{key}: {value}" for key, value in context.items()]
+        lines += ["", f"Last {len(recent)} frames: avg {sum(recent) / len(recent):.1f} ms, max {max(recent):.1f} ms",
+                  " ".join(f"{ms:.1f}" for ms in recent[-60:])]
+        if profile:
+            profile.dump_stats(stem + '.prof')
+            stats_text = io.StringIO()
+            pstats.Stats(profile, stream=stats_text).sort_stats('cumulative').print_stats(30)
+            lines += ["", stats_text.getvalue()]
+        else:
+            lines += ["", f"No call profile: the next {self.profile_window} frames are profiled, so the next spike among them will have one.",
+                      "Enable SPIKE_PROFILE_FRAMES (JINGSHUONIUM_SPIKE_PROFILE=1) to profile every frame."]
+
+        with open(stem + '.txt', 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        self.snapshots_written += 1
+        self._prune()
+        return stem + '.txt'
+
+    def _prune(self):
+        """Deletes the oldest snapshots so the directory never holds more than max_snapshots."""
+        stems = {}
+        for name in os.listdir(self.directory):
+            if name.startswith('spike_'):
+                stem = os.path.join(self.directory, name.rsplit('.', 1)[0])
+                stems[stem] = max(stems.get(stem, 0), os.path.getmtime(os.path.join(self.directory, name)))
+        oldest_first = sorted(stems, key=lambda stem: (stems[stem], stem))
+        for stem in oldest_first[:max(0, len(stems) - self.max_snapshots)]:
+            for ext in ('.txt', '.prof'):
+                if os.path.exists(stem + ext):
+                    os.remove(stem + ext)
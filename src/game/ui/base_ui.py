@@ -2,11 +2,14 @@ import pygame
 from ..core import config
 from ..core import assets
 from ..core import definitions
+from ..core.atlas import texture_atlas, sprite_atlas
+from .ui_cache import PanelCache, screen_overlay, slot_signature, text_cache
 
 class InventoryUI:
     def __init__(self, player_inventory):
         self.inventory = player_inventory
         self.is_open = False
+        self.panel_cache = PanelCache()
 
         self.hotbar_cols = 9
         self.inventory_cols = 9
@@ -157,63 +160,58 @@ class InventoryUI:
             return
 
         # Draw semi-transparent background
-        panel_surf = pygame.Surface(tuple(config.WINDOW_SIZE), pygame.SRCALPHA)
-        panel_surf.fill((0, 0, 0, 180))
-        surface.blit(panel_surf, (0,0))
-
-        # Draw inventory panel background
-        pygame.draw.rect(surface, (20, 20, 20, 220), self.panel_rect, border_radius=5)
-        pygame.draw.rect(surface, (120, 120, 120), self.panel_rect, 2, border_radius=5)
-
-        # Draw armor slot
-        surface.blit(assets.inventory_slot_texture, self.armor_slot_rect)
-        if self.inventory.armor_slot:
-            rect = self.armor_slot_rect
-            slot_data = self.inventory.armor_slot
-            item_type = slot_data["type"]
-            item_texture = assets.textures[item_type]
-
-            if item_type in definitions.ITEM_SCALES:
-                scale = definitions.ITEM_SCALES[item_type]
-                new_size = int(item_texture.get_width() * scale)
-                item_texture = pygame.transform.scale(item_texture, (new_size, new_size))
-
-            item_rect = item_texture.get_rect(center=rect.center)
-            surface.blit(item_texture, item_rect)
-
-            count_str = str(slot_data["count"])
-            shadow_surf = assets.small_font.render(count_str, True, assets.BLACK)
-            text_surf = assets.small_font.render(count_str, True, assets.WHITE)
-            text_rect = text_surf.get_rect(bottomright=(rect.right - 3, rect.bottom - 3))
-            shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-            surface.blit(shadow_surf, shadow_rect)
-            surface.blit(text_surf, text_rect)
-        # Draw slots and items
-        for i, rect in enumerate(self.slot_rects):
-            is_hotbar_slot = i < self.hotbar_cols
-            is_selected_hotbar_slot = is_hotbar_slot and i == hotbar.selected_slot
-
-            surface.blit(assets.inventory_slot_texture, rect)
-            if is_selected_hotbar_slot:
-                pygame.draw.rect(surface, assets.WHITE, rect, 3)
-
-            slot_data = self.inventory.get_slot(i)
-            if slot_data:
-                item_type = slot_data["type"]
-                item_texture = assets.textures[item_type]
-
-                if item_type in definitions.ITEM_SCALES:
-                    scale = definitions.ITEM_SCALES[item_type]
-                    new_size = int(item_texture.get_width() * scale)
-                    item_texture = pygame.transform.scale(item_texture, (new_size, new_size))
-
-                item_rect = item_texture.get_rect(center=rect.center)
-                surface.blit(item_texture, item_rect)
-
-                count_str = str(slot_data["count"])
-                shadow_surf = assets.small_font.render(count_str, True, assets.BLACK)
-                text_surf = assets.small_font.render(count_str, True, assets.WHITE)
-                text_rect = text_surf.get_rect(bottomright=(rect.right - 3, rect.bottom - 3))
-                shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-                surface.blit(shadow_surf, shadow_rect)
-                surface.blit(text_surf, text_rect)
\ No newline at end of file
+        surface.blit(screen_overlay(config.WINDOW_SIZE, (0, 0, 0, 180)), (0, 0))
+
+        # Draw the panel, armor slot and inventory slots from a cached surface
+        slots = [(self.inventory.armor_slot, self.armor_slot_rect)]
+        slots += [(self.inventory.get_slot(i), rect) for i, rect in enumerate(self.slot_rects)]
+        self.draw_slot_panel(surface, 'inventory', slots, self.panel_rect, self.inventory.version)
+
+        # Highlight the selected hotbar slot
+        if hotbar.selected_slot < self.hotbar_cols:
+            pygame.draw.rect(surface, assets.WHITE, self.slot_rects[hotbar.selected_slot], 3)
+
+    def draw_slot_panel(self, surface, key, slots, frame_rect=None, version=None):
+        """Draws [(item, rect)] slots, and optionally a panel frame, from a surface that's only repainted when the items change.
+
+        Pass the inventory's version for slots it owns; other containers (chests, the crafting grid) are compared by content.
+        """
+        rects = [rect for _, rect in slots]
+        bounds = (frame_rect or rects[0]).unionall(rects)
+        contents = version if version is not None else slot_signature([item for item, _ in slots])
+        signature = (contents, tuple(map(tuple, rects)), tuple(frame_rect) if frame_rect else None)
+
+        def paint(panel):
+            if frame_rect:
+                frame = frame_rect.move(-bounds.x, -bounds.y)
+                pygame.draw.rect(panel, (20, 20, 20), frame, border_radius=5)
+                pygame.draw.rect(panel, (120, 120, 120), frame, 2, border_radius=5)
+            blits = []
+            for item, rect in slots:
+                blits += self.slot_blits(item, rect.move(-bounds.x, -bounds.y))
+            panel.blits(blits, doreturn=False)
+
+        surface.blit(self.panel_cache.get(key, signature, bounds.size, paint), bounds)
+
+    def slot_blits(self, item, rect):
+        """Returns the (source, dest[, area]) blits for one slot: its background, the item icon and its count."""
+        slot_page, slot_area = sprite_atlas.region('inventory_slot')
+        blits = [(slot_page, rect.topleft, slot_area)]
+        if item:
+            item_type = item["type"]
+            item_page, item_area = texture_atlas.scaled_region(item_type, definitions.ITEM_SCALES.get(item_type, 1.0))
+            item_rect = item_area.copy()
+            item_rect.center = rect.center
+            blits.append((item_page, item_rect, item_area))
+            blits += count_blits(item["count"], assets.small_font, (rect.right - 3, rect.bottom - 3))
+        return blits
+
+
+def count_blits(count, font, bottomright):
+    """Returns the blits for an item count drawn with a shadow for visibility, anchored at bottomright."""
+    count_str = str(count)
+    shadow_surf = text_cache.render(font, count_str, assets.BLACK)
+    text_surf = text_cache.render(font, count_str, assets.WHITE)
+    text_rect = text_surf.get_rect(bottomright=bottomright)
+    shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
+    return [(shadow_surf, shadow_rect), (text_surf, text_rect)]
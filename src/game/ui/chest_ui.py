@@ -1,6 +1,4 @@
 import pygame
-from ..core import assets
-from ..core import definitions
 from .base_ui import InventoryUI
 import math
 
@@ -91,10 +89,6 @@ class ChestUI(InventoryUI):
         # Draw player inventory UI first
         super().draw(surface, hotbar)
 
-        # Draw chest inventory panel background
-        pygame.draw.rect(surface, (20, 20, 20, 220), self.chest_panel_rect, border_radius=5)
-        pygame.draw.rect(surface, (120, 120, 120), self.chest_panel_rect, 2, border_radius=5)
-
         # Chest grid layout (dynamic)
         num_rows = math.ceil(len(self.active_chest_entity['inventory']) / self.inventory_cols)
         chest_panel_width = self.inventory_cols * (self.slot_size + self.gap) - self.gap
@@ -112,26 +106,6 @@ class ChestUI(InventoryUI):
             y = self.chest_panel_rect.y + self.gap + row * (self.slot_size + self.gap)
             self.chest_slot_rects[i] = pygame.Rect(x, y, self.slot_size, self.slot_size)
 
-        # Draw chest inventory slots and items
-        for i, rect in enumerate(self.chest_slot_rects):
-            surface.blit(assets.inventory_slot_texture, rect)
-            slot_data = self.active_chest_entity['inventory'][i]
-            if slot_data:
-                item_type = slot_data["type"]
-                item_texture = assets.textures[item_type]
-
-                if item_type in definitions.ITEM_SCALES:
-                    scale = definitions.ITEM_SCALES[item_type]
-                    new_size = int(item_texture.get_width() * scale)
-                    item_texture = pygame.transform.scale(item_texture, (new_size, new_size))
-
-                item_rect = item_texture.get_rect(center=rect.center)
-                surface.blit(item_texture, item_rect)
-
-                count_str = str(slot_data["count"])
-                shadow_surf = assets.small_font.render(count_str, True, assets.BLACK)
-                text_surf = assets.small_font.render(count_str, True, assets.WHITE)
-                text_rect = text_surf.get_rect(bottomright=(rect.right - 3, rect.bottom - 3))
-                shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-                surface.blit(shadow_surf, shadow_rect)
-                surface.blit(text_surf, text_rect)
\ No newline at end of file
+        # Draw chest inventory panel, slots and items
+        slots = list(zip(self.active_chest_entity['inventory'], self.chest_slot_rects))
+        self.draw_slot_panel(surface, 'chest', slots, self.chest_panel_rect)
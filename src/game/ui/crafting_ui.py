@@ -1,6 +1,6 @@
 import pygame
 from ..core import assets
-from ..core import definitions
+from ..core.recipes import recipe_index, craft_from_inventory
 from .base_ui import InventoryUI
 
 class CraftingUI(InventoryUI):
@@ -47,46 +47,32 @@ class CraftingUI(InventoryUI):
             self.result_slot = None
         return new_held_item
 
-    def _get_shape_bounds(self, shape_grid):
-        min_r, max_r, min_c, max_c = -1, -1, -1, -1
-        for r, row in enumerate(shape_grid):
-            for c, item in enumerate(row):
-                if item is not None:
-                    if min_r == -1: min_r = r
-                    max_r = r
-                    if min_c == -1 or c < min_c: min_c = c
-                    if max_c == -1 or c > max_c: max_c = c
-        if min_r == -1: return None
-        return (min_r, min_c, max_r - min_r + 1, max_c - min_c + 1)
-
     def check_recipe(self):
-        grid_types_3x3 = [[(self.crafting_slots[r*3+c]['type'] if self.crafting_slots[r*3+c] else None) for c in range(3)] for r in range(3)]
-        
-        user_bounds = self._get_shape_bounds(grid_types_3x3)
-        if not user_bounds:
-            self.result_slot = None
-            return
-
-        user_r, user_c, user_h, user_w = user_bounds
-        user_subgrid = [row[user_c:user_c+user_w] for row in grid_types_3x3[user_r:user_r+user_h]]
-
-        for recipe in definitions.CRAFTING_RECIPES:
-            recipe_shape_2d = [[None]*3 for _ in range(3)]
-            flat_shape = recipe['shape']
-            for r, row_items in enumerate(flat_shape):
-                for c, item_type in enumerate(row_items):
-                    if r < 3 and c < 3: recipe_shape_2d[r][c] = item_type
-
-            recipe_bounds = self._get_shape_bounds(recipe_shape_2d)
-            if not recipe_bounds: continue
-
-            recipe_r, recipe_c, recipe_h, recipe_w = recipe_bounds
-            if user_h == recipe_h and user_w == recipe_w:
-                recipe_subgrid = [row[recipe_c:recipe_c+recipe_w] for row in recipe_shape_2d[recipe_r:recipe_r+recipe_h]]
-                if user_subgrid == recipe_subgrid:
-                    self.result_slot = recipe['result'].copy()
-                    return
-        self.result_slot = None
+        recipe = recipe_index.match([slot['type'] if slot else None for slot in self.crafting_slots])
+        self.result_slot = recipe['result'].copy() if recipe else None
+
+    def craft_max(self, use_inventory=False):
+        """Crafts the grid's recipe as many times as the grid allows (and the inventory has room for) in one go.
+
+        With use_inventory, ingredients in the player's inventory are used up as well once the grid runs out.
+        Returns the number of crafts.
+        """
+        recipe = recipe_index.match([slot['type'] if slot else None for slot in self.crafting_slots])
+        if not recipe:
+            return 0
+        result = recipe['result']
+        times = min(slot['count'] for slot in self.crafting_slots if slot)
+        times = min(times, self.inventory.room_for(result['type']) // result['count'])
+        if times > 0:
+            for i, slot in enumerate(self.crafting_slots):
+                if slot:
+                    slot['count'] -= times
+                    if slot['count'] <= 0: self.crafting_slots[i] = None
+            self.inventory.add_item(result['type'], result['count'] * times)
+        if use_inventory:
+            times += craft_from_inventory(self.inventory, recipe)
+        self.check_recipe()
+        return times
 
     def _handle_drag_placement(self, event, held_item):
         if held_item and event.buttons[0]: # if left button is held
@@ -224,22 +210,8 @@ class CraftingUI(InventoryUI):
                 is_shift_click = keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]
 
                 if is_shift_click:
-                    # Craft all possible items and move to inventory
-                    max_crafts = 99999
-                    for slot in self.crafting_slots:
-                        if slot: max_crafts = min(max_crafts, slot['count'])
-                    
-                    if max_crafts > 0 and max_crafts != 99999:
-                        result_item = self.result_slot
-                        total_to_craft = result_item['count'] * max_crafts
-                        
-                        if self.inventory.can_add_item(result_item['type'], total_to_craft):
-                            self.inventory.add_item(result_item['type'], total_to_craft)
-                            for i in range(9):
-                                if self.crafting_slots[i]:
-                                    self.crafting_slots[i]['count'] -= max_crafts
-                                    if self.crafting_slots[i]['count'] <= 0: self.crafting_slots[i] = None
-                            self.check_recipe()
+                    # Craft as many as possible straight into the inventory; Ctrl also pulls ingredients from it
+                    self.craft_max(use_inventory=is_ctrl_click)
 
                 else: # Normal click, craft one
                     if not held_item or (held_item['type'] == self.result_slot['type'] and held_item['count'] + self.result_slot['count'] <= self.inventory.max_stack_size):
@@ -261,56 +233,12 @@ class CraftingUI(InventoryUI):
         # Draw main inventory UI first
         super().draw(surface, hotbar)
 
-        # Draw crafting grid
-        for rect in self.crafting_grid_rects:
-            surface.blit(assets.inventory_slot_texture, rect)
-        
-        # Draw items in crafting grid
-        for i, item in enumerate(self.crafting_slots):
-            if item:
-                rect = self.crafting_grid_rects[i]
-                item_type = item["type"]
-                item_texture = assets.textures[item_type]
-
-                if item_type in definitions.ITEM_SCALES:
-                    scale = definitions.ITEM_SCALES[item_type]
-                    new_size = int(item_texture.get_width() * scale)
-                    item_texture = pygame.transform.scale(item_texture, (new_size, new_size))
-
-                item_rect = item_texture.get_rect(center=rect.center)
-                surface.blit(item_texture, item_rect)
-                count_str = str(item["count"])
-                shadow_surf = assets.small_font.render(count_str, True, assets.BLACK)
-                text_surf = assets.small_font.render(count_str, True, assets.WHITE)
-                text_rect = text_surf.get_rect(bottomright=(rect.right - 3, rect.bottom - 3))
-                shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-                surface.blit(shadow_surf, shadow_rect)
-                surface.blit(text_surf, text_rect)
+        # Draw crafting grid, its items and the result slot
+        slots = list(zip(self.crafting_slots, self.crafting_grid_rects)) + [(self.result_slot, self.result_slot_rect)]
+        self.draw_slot_panel(surface, 'crafting', slots)
 
         # Draw arrow
         arrow_start = (self.crafting_grid_rects[4].right + self.gap * 2, self.result_slot_rect.centery)
         arrow_end = (self.result_slot_rect.left - self.gap * 2, self.result_slot_rect.centery)
         pygame.draw.line(surface, assets.WHITE, arrow_start, arrow_end, 3)
         pygame.draw.polygon(surface, assets.WHITE, [(arrow_end[0], arrow_end[1] - 6), (arrow_end[0], arrow_end[1] + 6), (arrow_end[0] + 8, arrow_end[1])])
-
-        # Draw result slot
-        surface.blit(assets.inventory_slot_texture, self.result_slot_rect)
-        if self.result_slot:
-            rect = self.result_slot_rect
-            item_type = self.result_slot["type"]
-            item_texture = assets.textures[item_type]
-
-            if item_type in definitions.ITEM_SCALES:
-                scale = definitions.ITEM_SCALES[item_type]
-                new_size = int(item_texture.get_width() * scale)
-                item_texture = pygame.transform.scale(item_texture, (new_size, new_size))
-
-            item_rect = item_texture.get_rect(center=rect.center)
-            surface.blit(item_texture, item_rect)
-            count_str = str(self.result_slot["count"])
-            shadow_surf = assets.small_font.render(count_str, True, assets.BLACK)
-            text_surf = assets.small_font.render(count_str, True, assets.WHITE)
-            text_rect = text_surf.get_rect(bottomright=(rect.right - 3, rect.bottom - 3))
-            shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-            surface.blit(shadow_surf, shadow_rect)
-            surface.blit(text_surf, text_rect)
\ No newline at end of file
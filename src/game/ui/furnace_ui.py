@@ -84,25 +84,6 @@ class FurnaceUI(InventoryUI):
 
         return held_item
 
-    def draw_slot(self, surface, item, rect):
-        surface.blit(assets.inventory_slot_texture, rect)
-        if item:
-            item_type = item["type"]
-            item_texture = assets.textures[item_type]
-            scale = definitions.ITEM_SCALES.get(item_type, 1.0)
-            new_size = int(item_texture.get_width() * scale)
-            item_texture = pygame.transform.scale(item_texture, (new_size, new_size))
-            item_rect = item_texture.get_rect(center=rect.center)
-            surface.blit(item_texture, item_rect)
-
-            count_str = str(item["count"])
-            shadow_surf = assets.small_font.render(count_str, True, assets.BLACK)
-            text_surf = assets.small_font.render(count_str, True, assets.WHITE)
-            text_rect = text_surf.get_rect(bottomright=(rect.right - 3, rect.bottom - 3))
-            shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-            surface.blit(shadow_surf, shadow_rect)
-            surface.blit(text_surf, text_rect)
-
     def draw(self, surface, furnace_entity, hotbar):
         if not self.is_open: return
 
@@ -110,9 +91,11 @@ class FurnaceUI(InventoryUI):
         super().draw(surface, hotbar)
 
         # Draw furnace slots
-        self.draw_slot(surface, furnace_entity['input'], self.input_slot_rect)
-        self.draw_slot(surface, furnace_entity['fuel'], self.fuel_slot_rect)
-        self.draw_slot(surface, furnace_entity['output'], self.output_slot_rect)
+        self.draw_slot_panel(surface, 'furnace', [
+            (furnace_entity['input'], self.input_slot_rect),
+            (furnace_entity['fuel'], self.fuel_slot_rect),
+            (furnace_entity['output'], self.output_slot_rect),
+        ])
 
         # Draw progress indicators
         # Smelting progress arrow
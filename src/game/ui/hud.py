@@ -3,12 +3,16 @@ import math
 from ..core import config
 from ..core import assets
 from ..core import definitions
+from ..core.atlas import texture_atlas, sprite_atlas
+from .base_ui import count_blits
+from .ui_cache import PanelCache, text_cache
 
 # --- HOTBAR --- 
 class Hotbar:
     def __init__(self, player_inventory):
         self.inventory = player_inventory
         self.selected_slot = 0
+        self.panel_cache = PanelCache()
 
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -39,37 +43,37 @@ class Hotbar:
         y_pos = config.WINDOW_SIZE[1] - hotbar_slot_size - 10
         hotbar_slots = self.inventory.slots[:9]
 
-        scaled_slot_texture = pygame.transform.scale(assets.inventory_slot_texture, (hotbar_slot_size, hotbar_slot_size))
+        # The slots, icons and counts come from a strip that's only repainted when the inventory changes
+        strip = self.panel_cache.get('hotbar', self.inventory.version, (hotbar_width, hotbar_slot_size),
+                                     lambda panel: self._paint_strip(panel, hotbar_slots, hotbar_slot_size))
+        surface.blit(strip, (start_x, y_pos))
 
+        # Highlight selected slot
+        selected_rect = pygame.Rect(start_x + self.selected_slot * hotbar_slot_size, y_pos, hotbar_slot_size, hotbar_slot_size)
+        pygame.draw.rect(surface, assets.WHITE, selected_rect, 3)
+
+    def _paint_strip(self, panel, hotbar_slots, hotbar_slot_size):
+        slot_page, slot_area = sprite_atlas.region('inventory_slot', (hotbar_slot_size, hotbar_slot_size))
+
+        blits = []
         for i, slot_data in enumerate(hotbar_slots):
-            slot_x = start_x + i * hotbar_slot_size
-            surface.blit(scaled_slot_texture, (slot_x, y_pos))
+            slot_x = i * hotbar_slot_size
+            blits.append((slot_page, (slot_x, 0), slot_area))
 
             if slot_data:
                 item_type = slot_data["type"]
-                item_texture = assets.textures[item_type]
 
                 item_base_scale = definitions.ITEM_SCALES.get(item_type, 1.0)
                 final_size = int(assets.BLOCK_SIZE * item_base_scale * definitions.HOTBAR_SCALE)
-                scaled_item_texture = pygame.transform.scale(item_texture, (final_size, final_size))
+                item_page, item_area = texture_atlas.region(item_type, (final_size, final_size))
 
-                item_rect = scaled_item_texture.get_rect(center=(slot_x + hotbar_slot_size / 2, y_pos + hotbar_slot_size / 2))
-                surface.blit(scaled_item_texture, item_rect)
+                item_rect = item_area.copy()
+                item_rect.center = (slot_x + hotbar_slot_size / 2, hotbar_slot_size / 2)
+                blits.append((item_page, item_rect, item_area))
 
-                # Draw item count with a shadow for visibility
-                count_str = str(slot_data["count"])
-                shadow_surf = assets.scaled_small_font.render(count_str, True, assets.BLACK)
-                text_surf = assets.scaled_small_font.render(count_str, True, assets.WHITE)
-
-                # Position text at the bottom-right of the slot
-                text_rect = text_surf.get_rect(bottomright=(slot_x + hotbar_slot_size - 3, y_pos + hotbar_slot_size - 3))
-                shadow_rect = shadow_surf.get_rect(bottomright=(text_rect.right + 1, text_rect.bottom + 1))
-                surface.blit(shadow_surf, shadow_rect)
-                surface.blit(text_surf, text_rect)
-
-        # Highlight selected slot
-        selected_rect = pygame.Rect(start_x + self.selected_slot * hotbar_slot_size, y_pos, hotbar_slot_size, hotbar_slot_size)
-        pygame.draw.rect(surface, assets.WHITE, selected_rect, 3)
+                # Item count at the bottom-right of the slot
+                blits += count_blits(slot_data["count"], assets.scaled_small_font, (slot_x + hotbar_slot_size - 3, hotbar_slot_size - 3))
+        panel.blits(blits, doreturn=False)
 
 # --- HEALTH BAR ---
 class HealthBar:
@@ -125,14 +129,14 @@ class TimeDisplay:
         money_str = f"${money}"
 
         # Render and blit
-        time_surf = self.font.render(time_str, True, assets.WHITE)
-        day_surf = self.font.render(day_str, True, assets.WHITE)
-        money_surf = self.font.render(money_str, True, (255, 223, 0)) # Gold color
+        time_surf = text_cache.render(self.font, time_str, assets.WHITE)
+        day_surf = text_cache.render(self.font, day_str, assets.WHITE)
+        money_surf = text_cache.render(self.font, money_str, (255, 223, 0)) # Gold color
 
         # Shadow
-        surface.blit(self.font.render(day_str, True, assets.BLACK), (config.WINDOW_SIZE[0] - day_surf.get_width() - 14, 11))
-        surface.blit(self.font.render(time_str, True, assets.BLACK), (config.WINDOW_SIZE[0] - time_surf.get_width() - 14, 11 + day_surf.get_height()))
-        surface.blit(self.font.render(money_str, True, assets.BLACK), (config.WINDOW_SIZE[0] - money_surf.get_width() - 14, 11 + day_surf.get_height() + time_surf.get_height()))
+        surface.blit(text_cache.render(self.font, day_str, assets.BLACK), (config.WINDOW_SIZE[0] - day_surf.get_width() - 14, 11))
+        surface.blit(text_cache.render(self.font, time_str, assets.BLACK), (config.WINDOW_SIZE[0] - time_surf.get_width() - 14, 11 + day_surf.get_height()))
+        surface.blit(text_cache.render(self.font, money_str, assets.BLACK), (config.WINDOW_SIZE[0] - money_surf.get_width() - 14, 11 + day_surf.get_height() + time_surf.get_height()))
         # Text
         surface.blit(day_surf, (config.WINDOW_SIZE[0] - day_surf.get_width() - 15, 10))
         surface.blit(time_surf, (config.WINDOW_SIZE[0] - time_surf.get_width() - 15, 10 + day_surf.get_height()))
@@ -1,33 +1,196 @@
+import heapq
+
+
+class ItemStack(dict):
+    """An inventory slot's {'type', 'count'} dict that reports in-place changes (slot['count'] -= 1) to its inventory."""
+    __slots__ = ('owner',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.owner = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self.owner is not None:
+            self.owner._stack_changed(self)
+
+
+class SlotList(list):
+    """The inventory's slot list. Assigning a slot wraps plain dicts in ItemStacks and notifies the inventory."""
+
+    def __init__(self, owner, items):
+        super().__init__(owner._adopt(item) for item in items)
+        self.owner = owner
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            raise TypeError("Inventory slots can't be assigned by slice; assign inventory.slots instead")
+        index = index % len(self)
+        old = self[index]
+        item = self.owner._adopt(item)
+        super().__setitem__(index, item)
+        self.owner._release(old) # The old stack may have left the inventory (e.g. picked up into the hand)
+        self.owner._index_slot(index)
+        self.owner._notify('slot', index)
+
+
 class PlayerInventory:
     def __init__(self):
+        self.version = 0 # Bumped on every change; compare against a stored value to see if anything moved
+        self.listeners = [] # callback(event, index) with event 'slot', 'armor' or 'bulk'
+        self._armor_slot = None
         self.slots = [None] * 36 # 9 hotbar slots + 27 inventory slots
         self.armor_slot = None # A single slot for a chestplate
         self.max_stack_size = 99999 # Effectively infinite
 
+    # --- Change Tracking ---
+    @property
+    def slots(self):
+        return self._slots
+
+    @slots.setter
+    def slots(self, items):
+        """Replacing the whole list (loading a save, respawning) counts as one bulk change."""
+        self._slots = SlotList(self, items)
+        self._rebuild_index()
+        self._notify('bulk', None)
+
+    @property
+    def armor_slot(self):
+        return self._armor_slot
+
+    @armor_slot.setter
+    def armor_slot(self, item):
+        old, self._armor_slot = self._armor_slot, self._adopt(item)
+        self._release(old)
+        self._notify('armor', None)
+
+    def subscribe(self, callback):
+        """Registers callback(event, index) to be called after every change."""
+        self.listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _adopt(self, item):
+        if item is None:
+            return None
+        if not isinstance(item, ItemStack):
+            item = ItemStack(item)
+        item.owner = self
+        return item
+
+    def _release(self, stack):
+        """Stops tracking a stack that's no longer in any slot."""
+        if stack is None or stack.owner is not self or stack is self._armor_slot:
+            return
+        if not any(slot is stack for slot in self._slots):
+            stack.owner = None
+
+    def _stack_changed(self, stack):
+        if stack is self._armor_slot:
+            self._notify('armor', None)
+            return
+        index = self._stack_slot.get(id(stack))
+        if index is not None and self._slots[index] is stack:
+            self._index_slot(index)
+            self._notify('slot', index)
+
+    def _notify(self, event, index):
+        self.version += 1
+        for callback in self.listeners:
+            callback(event, index)
+
+    # --- Index ---
+    # totals: type -> count across all slots, by_type: type -> slot indices holding it,
+    # free_heap: empty slot indices (lowest first, so hotbar slots fill before the main inventory).
+    def _rebuild_index(self):
+        self._seen = [None] * len(self._slots) # (type, count, stack) per slot as last indexed
+        self._totals, self._by_type, self._stack_slot = {}, {}, {}
+        self._free, self._free_heap = set(), []
+        for index in range(len(self._slots)):
+            self._index_slot(index)
+
+    def _index_slot(self, index):
+        """Brings the indexes up to date after slot index changed."""
+        seen = self._seen[index]
+        if seen is not None:
+            old_type, old_count, old_stack = seen
+            self._totals[old_type] -= old_count
+            indices = self._by_type[old_type]
+            indices.discard(index)
+            if not indices:
+                del self._by_type[old_type], self._totals[old_type]
+            if self._stack_slot.get(id(old_stack)) == index:
+                del self._stack_slot[id(old_stack)]
+
+        stack = self._slots[index]
+        if stack is None:
+            self._seen[index] = None
+            if index not in self._free:
+                self._free.add(index)
+                heapq.heappush(self._free_heap, index)
+        else:
+            item_type, count = stack['type'], stack['count']
+            self._seen[index] = (item_type, count, stack)
+            self._totals[item_type] = self._totals.get(item_type, 0) + count
+            self._by_type.setdefault(item_type, set()).add(index)
+            self._stack_slot[id(stack)] = index
+            self._free.discard(index) # Its heap entry goes stale and is skipped when popped
+
+    def _first_free_slot(self):
+        heap = self._free_heap
+        while heap and heap[0] not in self._free:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _insert(self, item_type, count):
+        """Adds items the way add_item always has (top up existing stacks in slot order, then the first empty slot). Returns what didn't fit."""
+        for i in sorted(self._by_type.get(item_type, ())):
+            slot = self._slots[i]
+            if slot['count'] < self.max_stack_size:
+                add_amount = min(count, self.max_stack_size - slot['count'])
+                slot['count'] += add_amount
+                count -= add_amount
+                if count == 0:
+                    return 0
+
+        # Next, the lowest empty slot: hotbar slots are 0-8, so they're preferred over the main inventory
+        free = self._first_free_slot()
+        if free is None:
+            return count # Inventory is full
+        self._slots[free] = {'type': item_type, 'count': count}
+        return 0
+
+    # --- Queries and Updates ---
+    def count_item(self, item_type):
+        """Returns how many of an item the inventory holds in total."""
+        return self._totals.get(item_type, 0)
+
     def has_item(self, item_type, count=1):
         """Checks if the inventory contains at least a certain count of an item."""
-        total_count = 0
-        for slot in self.slots:
-            if slot and slot['type'] == item_type:
-                total_count += slot['count']
-        return total_count >= count
+        return self._totals.get(item_type, 0) >= count
+
+    def free_slot_count(self):
+        return len(self._free)
 
     def remove_item(self, item_type, count=1):
         """Removes a given number of items from the inventory, starting from the end."""
         remaining_to_remove = count
-        # Iterate backwards to remove from the end of inventory first (non-hotbar)
-        for i in range(len(self.slots) - 1, -1, -1):
-            slot = self.slots[i]
-            if slot and slot['type'] == item_type:
-                remove_amount = min(remaining_to_remove, slot['count'])
-                slot['count'] -= remove_amount
-                remaining_to_remove -= remove_amount
-
-                if slot['count'] <= 0:
-                    self.slots[i] = None
-
-                if remaining_to_remove <= 0:
-                    return True
+        # Remove from the end of inventory first (non-hotbar)
+        for i in sorted(self._by_type.get(item_type, ()), reverse=True):
+            slot = self._slots[i]
+            remove_amount = min(remaining_to_remove, slot['count'])
+            slot['count'] -= remove_amount
+            remaining_to_remove -= remove_amount
+
+            if slot['count'] <= 0:
+                self._slots[i] = None
+
+            if remaining_to_remove <= 0:
+                return True
         return False # Not enough items were found to remove
 
     def get_slot(self, index):
@@ -39,46 +202,34 @@ class PlayerInventory:
         if 0 <= index < len(self.slots):
             self.slots[index] = item
 
+    def room_for(self, item_type):
+        """Returns how many more of an item fit: the room left in its stacks plus the empty slots."""
+        stacks = self._by_type.get(item_type, ())
+        return (len(stacks) + len(self._free)) * self.max_stack_size - self._totals.get(item_type, 0)
+
     def can_add_item(self, item_type, count):
         """Checks if a given number of items can be added to the inventory without actually adding them."""
-        remaining_count = count
-        
-        # Check how much can be added to existing stacks
-        for slot in self.slots:
-            if slot and slot['type'] == item_type and slot['count'] < self.max_stack_size:
-                can_add_to_stack = self.max_stack_size - slot['count']
-                remaining_count -= can_add_to_stack
-                if remaining_count <= 0:
-                    return True
-        
-        # Check how much can be added to empty slots
-        empty_slots = self.slots.count(None)
-        if remaining_count <= empty_slots * self.max_stack_size:
-            return True
-            
-        return False
+        return count <= self.room_for(item_type)
 
     def add_item(self, item_type, count=1):
-        # First, try to stack with existing items in both inventory and hotbar
-        for i, slot in enumerate(self.slots):
-            if slot and slot['type'] == item_type and slot['count'] < self.max_stack_size:
-                can_add = self.max_stack_size - slot['count']
-                add_amount = min(count, can_add)
-                slot['count'] += add_amount
-                count -= add_amount
-                if count == 0:
-                    return True
-        
-        # Next, find an empty slot (prefer hotbar, then main inventory)
-        # Hotbar slots are 0-8
-        for i in range(9):
-            if self.slots[i] is None:
-                self.slots[i] = {'type': item_type, 'count': count}
-                return True
-        # Main inventory slots are 9-35
-        for i in range(9, len(self.slots)):
-            if self.slots[i] is None:
-                self.slots[i] = {'type': item_type, 'count': count}
-                return True
-        
-        return False # Inventory is full
\ No newline at end of file
+        return self._insert(item_type, count) == 0
+
+    def add_stacks(self, stacks):
+        """Adds many {'type', 'count'} stacks at once. Returns the stacks (or remainders) that didn't fit."""
+        leftovers = []
+        for stack in stacks:
+            if stack:
+                left = self._insert(stack['type'], stack['count'])
+                if left:
+                    leftovers.append({'type': stack['type'], 'count': left})
+        return leftovers
+
+    def transfer_from(self, container):
+        """Moves everything it can from another slot list (e.g. a chest's inventory) into this inventory. Returns True if it all fit."""
+        all_moved = True
+        for i, stack in enumerate(container):
+            if stack:
+                left = self._insert(stack['type'], stack['count'])
+                container[i] = {'type': stack['type'], 'count': left} if left else None
+                all_moved = all_moved and not left
+        return all_moved
@@ -2,6 +2,7 @@ import pygame
 from ..core import config
 from ..core import assets
 from .menu_utils import Button
+from .ui_cache import screen_overlay, text_cache
 
 class PauseMenu:
     def __init__(self):
@@ -35,13 +36,11 @@ class PauseMenu:
         return None
 
     def draw(self, surface):
-        panel_surf = pygame.Surface(tuple(config.WINDOW_SIZE), pygame.SRCALPHA)
-        panel_surf.fill((0, 0, 0, 180))
-        surface.blit(panel_surf, (0,0))
+        surface.blit(screen_overlay(config.WINDOW_SIZE, (0, 0, 0, 180)), (0,0))
         
         # Paused text
-        paused_text_surf = assets.big_font.render("PAUSED", True, assets.WHITE)
-        paused_shadow_surf = assets.big_font.render("PAUSED", True, assets.BLACK)
+        paused_text_surf = text_cache.render(assets.big_font, "PAUSED", assets.WHITE)
+        paused_shadow_surf = text_cache.render(assets.big_font, "PAUSED", assets.BLACK)
         text_pos_x = config.WINDOW_SIZE[0]/2 - paused_text_surf.get_width()/2
         text_pos_y = config.WINDOW_SIZE[1] * 0.25
         surface.blit(paused_shadow_surf, (text_pos_x + 3, text_pos_y + 3))
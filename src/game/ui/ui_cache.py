@@ -0,0 +1,61 @@
+import pygame
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, color), for strings that repeat every frame like item counts."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = {}
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.entries.get(key)
+        if surface is None:
+            if len(self.entries) >= self.max_entries:
+                self.entries.clear() # Counts and labels are a small working set; starting over is cheaper than LRU bookkeeping
+            surface = self.entries[key] = font.render(text, antialias, color)
+        return surface
+
+
+class PanelCache:
+    """Pre-rendered panel surfaces that are only repainted when their contents signature changes."""
+
+    def __init__(self):
+        self.panels = {} # key -> (signature, Surface)
+        self.repaints = 0
+
+    def get(self, key, signature, size, paint):
+        """Returns the panel surface for key, calling paint(surface) first if the signature or size changed."""
+        cached = self.panels.get(key)
+        if cached is None or cached[0] != signature or cached[1].get_size() != size:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            paint(surface)
+            cached = self.panels[key] = (signature, surface)
+            self.repaints += 1
+        return cached[1]
+
+    def invalidate(self, key=None):
+        if key is None:
+            self.panels.clear()
+        else:
+            self.panels.pop(key, None)
+
+
+def slot_signature(items):
+    """Returns a hashable snapshot of a list of slots ({'type', 'count'} dicts or None) for change detection."""
+    return tuple((item['type'], item['count']) if item else None for item in items)
+
+
+def screen_overlay(size, color):
+    """Returns a shared full-screen translucent overlay surface."""
+    key = (tuple(size), color)
+    overlay = _overlays.get(key)
+    if overlay is None:
+        overlay = _overlays[key] = pygame.Surface(key[0], pygame.SRCALPHA)
+        overlay.fill(color)
+    return overlay
+
+
+_overlays = {}
+text_cache = TextCache()
@@ -0,0 +1,225 @@
+import random
+
+from .heightmap import HeightMap
+
+
+class IndexedRandomSet:
+    """A set with O(1) add, remove and uniform random choice.
+
+    Items live in a list and a dict maps each item to its index, so removing one moves the last item into its place.
+    Iteration order depends only on the order of operations, never on hashes, so seeded runs repeat exactly.
+    """
+    __slots__ = ('items', 'index')
+
+    def __init__(self, items=()):
+        self.items = []
+        self.index = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        i = self.index.pop(item, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.index[last] = i
+
+    def remove(self, item):
+        if item not in self.index:
+            raise KeyError(item)
+        self.discard(item)
+
+    def choice(self, rng=random):
+        """Returns a random item. Raises IndexError if the set is empty."""
+        if not self.items:
+            raise IndexError("choice from an empty IndexedRandomSet")
+        return self.items[rng.randrange(len(self.items))]
+
+    def pop_random(self, rng=random):
+        item = self.choice(rng)
+        self.discard(item)
+        return item
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class BlockList(list):
+    """An area's block list that keeps per-type and per-position indexes up to date as blocks are added, removed or change type.
+
+    Blocks report type changes through Voxel.set_type, so counting a type, picking a random block of a type
+    or checking a position never needs a scan of the whole area.
+    """
+
+    def __init__(self, blocks=()):
+        super().__init__()
+        self.by_type = {} # type -> IndexedRandomSet of blocks
+        self.at = {} # (x, y) -> [blocks], one per layer
+        self.heights = HeightMap()
+        self.version = 0 # Bumped whenever a block is added, removed or changes solidity, for caches of the layout
+        self.solid_grid = None # A SolidGrid (the horde's collision grid) to keep current, if any
+        self.extend(blocks)
+
+    # --- Queries ---
+    def count_type(self, block_type):
+        return len(self.by_type.get(block_type, ()))
+
+    def blocks_of(self, block_type):
+        """Returns the live IndexedRandomSet of blocks of a type; it follows later changes, so use choice() rather than iterating while converting."""
+        blocks = self.by_type.get(block_type)
+        if blocks is None:
+            blocks = self.by_type[block_type] = IndexedRandomSet()
+        return blocks
+
+    def blocks_at(self, pos):
+        return self.at.get((int(pos[0]), int(pos[1])), ())
+
+    def is_solid_at(self, pos):
+        return any(block.is_solid for block in self.blocks_at(pos))
+
+    def top_solid(self, x):
+        return self.heights.top_solid(x)
+
+    def top_any(self, x):
+        return self.heights.top_any(x)
+
+    def surface_block(self, x):
+        """Returns the highest solid block in column x (the foreground one if layers overlap), or None."""
+        y = self.heights.top_solid(x)
+        if y is None:
+            return None
+        solids = [block for block in self.blocks_at((x, y)) if block.is_solid]
+        return min(solids, key=lambda block: block.layer) if solids else None
+
+    def surface_type(self, x):
+        block = self.surface_block(x)
+        return block.type if block else None
+
+    def is_clear_above(self, pos, height):
+        """Checks that the height cells directly above pos hold no solid block."""
+        return self.heights.is_clear_above(pos[0], pos[1], height)
+
+    # --- Tracking ---
+    def _track(self, block, heights=True):
+        block.block_list = self
+        self.version += 1
+        self.blocks_of(block.type).add(block)
+        x, y = int(block.grid_pos.x), int(block.grid_pos.y)
+        self.at.setdefault((x, y), []).append(block)
+        if heights:
+            self.heights.add(x, y, block.is_solid)
+        if self.solid_grid is not None and block.is_solid:
+            self.solid_grid.set_solid(x, y, True)
+
+    def _untrack(self, block):
+        if block.block_list is self:
+            block.block_list = None
+        blocks = self.by_type.get(block.type)
+        if blocks is not None:
+            blocks.discard(block)
+        x, y = int(block.grid_pos.x), int(block.grid_pos.y)
+        here = self.at.get((x, y))
+        if here is not None and block in here:
+            here.remove(block)
+            if not here:
+                del self.at[(x, y)]
+            self.heights.remove(x, y, block.is_solid)
+            self.version += 1
+            if self.solid_grid is not None and block.is_solid:
+                self.solid_grid.set_solid(x, y, self.is_solid_at((x, y)))
+
+    def type_changed(self, block, old_type, was_solid=None):
+        """Called by a block after its type changed from old_type (and its solidity from was_solid, if given)."""
+        blocks = self.by_type.get(old_type)
+        if blocks is not None:
+            blocks.discard(block)
+        self.blocks_of(block.type).add(block)
+        if was_solid is not None and was_solid != block.is_solid:
+            self.heights.set_solid(block.grid_pos.x, block.grid_pos.y, block.is_solid)
+            self.version += 1
+            if self.solid_grid is not None:
+                self.solid_grid.set_solid(block.grid_pos.x, block.grid_pos.y, self.is_solid_at(block.grid_pos))
+
+    # --- List Operations ---
+    def append(self, block):
+        super().append(block)
+        self._track(block)
+
+    def extend(self, blocks):
+        blocks = list(blocks)
+        super().extend(blocks)
+        for block in blocks:
+            self._track(block, heights=False)
+        self.heights.add_many((block.grid_pos.x, block.grid_pos.y, block.is_solid) for block in blocks)
+
+    def __iadd__(self, blocks):
+        self.extend(blocks)
+        return self
+
+    def insert(self, index, block):
+        super().insert(index, block)
+        self._track(block)
+
+    def remove(self, block):
+        super().remove(block)
+        self._untrack(block)
+
+    def remove_many(self, blocks):
+        """Removes several blocks in one pass over the list, e.g. when a whole section unloads."""
+        doomed = set(blocks)
+        if not doomed:
+            return
+        super().__setitem__(slice(None), [block for block in self if block not in doomed])
+        for block in doomed:
+            self._untrack(block)
+
+    def pop(self, index=-1):
+        block = super().pop(index)
+        self._untrack(block)
+        return block
+
+    def clear(self):
+        for block in self:
+            block.block_list = None
+        super().clear()
+        self.by_type, self.at, self.heights = {}, {}, HeightMap()
+        self.version += 1
+        if self.solid_grid is not None:
+            self.solid_grid.clear()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+        old = self[index]
+        super().__setitem__(index, value)
+        for block in (old if isinstance(index, slice) else [old]):
+            self._untrack(block)
+        for block in (value if isinstance(index, slice) else [value]):
+            self._track(block)
+
+    def __delitem__(self, index):
+        old = self[index]
+        super().__delitem__(index)
+        for block in (old if isinstance(index, slice) else [old]):
+            self._untrack(block)
+
+
+def track_area_blocks(area_data):
+    """Makes sure an area's 'blocks' is a BlockList, converting a plain list once. Returns it."""
+    blocks = area_data.get('blocks')
+    if not isinstance(blocks, BlockList):
+        blocks = area_data['blocks'] = BlockList(blocks or ())
+    return blocks
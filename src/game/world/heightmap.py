@@ -0,0 +1,136 @@
+import bisect
+from array import array
+
+NO_BLOCK = 2 ** 31 - 1 # Stored for empty columns; never a real y
+
+
+class HeightMap:
+    """The highest solid block and the highest block of any kind in each column of an area.
+
+    Tops are kept in arrays indexed by x (offset by origin, growing to either side as columns appear), so
+    lookups are O(1). Each column also keeps its sorted block y values, so removing the top block finds the
+    next one down without a search. y grows downward: the top of a column is its smallest y.
+    """
+
+    def __init__(self):
+        self.origin = 0 # x of index 0
+        self.solid_tops = array('i')
+        self.any_tops = array('i')
+        self.solid_columns = {} # x -> sorted y of solid blocks (one entry per block, so layers can repeat a y)
+        self.columns = {} # x -> sorted y of all blocks
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        heights = cls()
+        for block in blocks:
+            heights.add(block.grid_pos.x, block.grid_pos.y, block.is_solid)
+        return heights
+
+    # --- Queries ---
+    def top_solid(self, x):
+        """Returns the y of the highest solid block in column x, or None."""
+        i = int(x) - self.origin
+        if 0 <= i < len(self.solid_tops) and self.solid_tops[i] != NO_BLOCK:
+            return self.solid_tops[i]
+        return None
+
+    def top_any(self, x):
+        """Returns the y of the highest block of any kind (water, tall grass, ...) in column x, or None."""
+        i = int(x) - self.origin
+        if 0 <= i < len(self.any_tops) and self.any_tops[i] != NO_BLOCK:
+            return self.any_tops[i]
+        return None
+
+    def is_sky_exposed(self, x, y):
+        """Checks that nothing solid is above (x, y)."""
+        top = self.top_solid(x)
+        return top is None or top >= int(y)
+
+    def is_clear_above(self, x, y, height):
+        """Checks that the height cells directly above (x, y) hold no solid block."""
+        x, y = int(x), int(y)
+        if self.is_sky_exposed(x, y):
+            return True
+        column = self.solid_columns[x]
+        i = bisect.bisect_left(column, y) # column[i - 1] is the nearest solid block above (x, y)
+        return i == 0 or column[i - 1] < y - height
+
+    def x_range(self):
+        """Returns (first x, last x + 1) of the columns tracked so far."""
+        return self.origin, self.origin + len(self.any_tops)
+
+    # --- Updates ---
+    def _index(self, x):
+        """Returns x's index into the top arrays, growing them to cover it."""
+        if not self.any_tops:
+            self.origin = x
+        i = x - self.origin
+        if i < 0:
+            padding = array('i', [NO_BLOCK]) * -i
+            self.solid_tops = padding + self.solid_tops
+            self.any_tops = padding + self.any_tops
+            self.origin, i = x, 0
+        elif i >= len(self.any_tops):
+            padding = array('i', [NO_BLOCK]) * (i + 1 - len(self.any_tops))
+            self.solid_tops.extend(padding)
+            self.any_tops.extend(padding)
+        return i
+
+    def add(self, x, y, solid):
+        x, y = int(x), int(y)
+        i = self._index(x)
+        bisect.insort(self.columns.setdefault(x, []), y)
+        self.any_tops[i] = min(self.any_tops[i], y)
+        if solid:
+            bisect.insort(self.solid_columns.setdefault(x, []), y)
+            self.solid_tops[i] = min(self.solid_tops[i], y)
+
+    def add_many(self, cells):
+        """Adds many (x, y, solid) cells at once, sorting each column once; for loading whole areas or chunks."""
+        touched = set()
+        for x, y, solid in cells:
+            x, y = int(x), int(y)
+            self.columns.setdefault(x, []).append(y)
+            if solid:
+                self.solid_columns.setdefault(x, []).append(y)
+            touched.add(x)
+        for x in sorted(touched): # Left to right, so the arrays grow to the left at most once
+            i = self._index(x)
+            column = self.columns[x]
+            column.sort()
+            self.any_tops[i] = column[0]
+            solids = self.solid_columns.get(x)
+            if solids:
+                solids.sort()
+                self.solid_tops[i] = solids[0]
+
+    def remove(self, x, y, solid):
+        x, y = int(x), int(y)
+        i = x - self.origin
+        if _remove_sorted(self.columns.get(x), y):
+            column = self.columns[x]
+            self.any_tops[i] = column[0] if column else NO_BLOCK
+        if solid:
+            self.set_solid(x, y, False)
+
+    def set_solid(self, x, y, solid):
+        """Records that the block at (x, y) became solid or stopped being solid."""
+        x, y = int(x), int(y)
+        i = self._index(x)
+        if solid:
+            bisect.insort(self.solid_columns.setdefault(x, []), y)
+            self.solid_tops[i] = min(self.solid_tops[i], y)
+        elif _remove_sorted(self.solid_columns.get(x), y):
+            column = self.solid_columns[x]
+            self.solid_tops[i] = column[0] if column else NO_BLOCK
+
+
+def _remove_sorted(column, y):
+    """Removes one y from a sorted column. Returns whether it was there."""
+    if not column:
+        return False
+    i = bisect.bisect_left(column, y)
+    if i < len(column) and column[i] == y:
+        del column[i]
+        return True
+    return False
@@ -0,0 +1,143 @@
+from ..core import assets
+from . import dungeon
+
+
+def enemy_record(enemy):
+    """The dormant form of a live enemy: just enough to bring it back."""
+    return {'type': enemy.enemy_type, 'pos': [enemy.pos.x, enemy.pos.y], 'health': enemy.health}
+
+
+class DungeonStreamer:
+    """Keeps only the dungeon sections around the player materialized.
+
+    The dungeon is split into section_size x section_size block sections. Sections within radius of the
+    player's section are active: their blocks are in the area's block list and spatial grid, and their enemies
+    are live. Other sections exist only as cells in the DungeonLayout, with their enemies as plain records, so
+    memory and per-frame work depend on the radius rather than on the size of the dungeon.
+    """
+
+    def __init__(self, layout, make_block, make_enemy, section_size=32, radius=1):
+        self.layout = layout
+        self.make_block = make_block # (x, y, block type) -> block
+        self.make_enemy = make_enemy # enemy record -> live enemy
+        self.section_size = section_size
+        self.radius = radius
+        self.active = set()
+        self.center = None
+        self.dormant = {} # section -> [enemy records]
+        self.placed = {} # section -> [(x, y, block type, layer)] for blocks the layout has no cell code for
+        for x, y, enemy_type in layout.enemy_spawns():
+            record = {'type': enemy_type, 'pos': [x * assets.BLOCK_SIZE, y * assets.BLOCK_SIZE], 'health': None}
+            self.dormant.setdefault(self.section_of(x, y), []).append(record)
+
+    # --- Sections ---
+    def section_of(self, x, y):
+        """Returns the section holding grid cell (x, y)."""
+        return int(x) // self.section_size, int(y) // self.section_size
+
+    def section_at_pixel(self, pos):
+        return self.section_of(pos[0] // assets.BLOCK_SIZE, pos[1] // assets.BLOCK_SIZE)
+
+    def section_box(self, section):
+        """Returns the section's grid cells as (x0, y0, x1, y1), end-exclusive."""
+        x0, y0 = section[0] * self.section_size, section[1] * self.section_size
+        return x0, y0, x0 + self.section_size, y0 + self.section_size
+
+    def sections_around(self, center):
+        last_x = (self.layout.width - 1) // self.section_size
+        last_y = (self.layout.height - 1) // self.section_size
+        return {(sx, sy)
+                for sx in range(max(0, center[0] - self.radius), min(last_x, center[0] + self.radius) + 1)
+                for sy in range(max(0, center[1] - self.radius), min(last_y, center[1] + self.radius) + 1)}
+
+    # --- Streaming ---
+    def update(self, player_pos, blocks, enemies, spatial_grid, horde=None):
+        """Loads and unloads sections as the player moves between them, and puts enemies that wander out of the
+        loaded sections to sleep (every call, as there are no blocks out there to hold them up). Returns True if
+        anything changed.
+
+        blocks is the area's BlockList and enemies its live enemy list; both are changed in place. With a horde,
+        enemies of the types it handles are loaded into it instead of the list.
+        """
+        center = self.section_at_pixel(player_pos)
+        if center == self.center:
+            return self.put_to_sleep(enemies, horde, self.active)
+        self.center = center
+        wanted = self.sections_around(center)
+
+        self.put_to_sleep(enemies, horde, wanted)
+        for section in self.active - wanted:
+            self.unload(section, blocks, spatial_grid)
+        for section in sorted(wanted - self.active):
+            self.load(section, blocks, enemies, spatial_grid, horde)
+        return True
+
+    def put_to_sleep(self, enemies, horde, sections):
+        """Turns the enemies outside sections into dormant records. Returns True if there were any."""
+        # Enemies wander, so they go dormant by where they are now rather than where they were loaded
+        leaving = [enemy for enemy in enemies if self.section_at_pixel(enemy.pos) not in sections]
+        if leaving:
+            for enemy in leaving:
+                if not enemy.is_dying:
+                    self.dormant.setdefault(self.section_at_pixel(enemy.pos), []).append(enemy_record(enemy))
+            gone = set(leaving)
+            enemies[:] = [enemy for enemy in enemies if enemy not in gone]
+        if horde is not None and len(horde) and sections:
+            horde.sweep()
+            # Loaded sections always form one rectangle, so the horde can check its members against it in one go
+            x0, y0, _, _ = self.section_box(min(sections))
+            _, _, x1, y1 = self.section_box(max(sections))
+            size = assets.BLOCK_SIZE
+            members = horde.members_outside(x0 * size, y0 * size, x1 * size, y1 * size)
+            for member in members:
+                self.dormant.setdefault(self.section_at_pixel(member.pos), []).append(enemy_record(member))
+            horde.remove_members(members)
+            leaving += members
+        return bool(leaving)
+
+    def load(self, section, blocks, enemies, spatial_grid, horde=None):
+        x0, y0, x1, y1 = self.section_box(section)
+        new_blocks = [self.make_block(x, y, block_type) for x, y, block_type in self.layout.solid_cells(x0, y0, x1, y1)]
+        for x, y, block_type, layer in self.placed.pop(section, ()):
+            block = self.make_block(x, y, block_type)
+            block.layer = layer
+            new_blocks.append(block)
+        blocks.extend(new_blocks)
+        for block in new_blocks:
+            spatial_grid.add(block, block.rect)
+        for record in self.dormant.pop(section, ()):
+            if horde is not None and record['type'] in horde.TYPES:
+                member = horde.spawn(record['pos'], record['type'])
+                if record.get('health') is not None:
+                    horde.health[member.index] = record['health']
+            else:
+                enemies.append(self.make_enemy(record))
+        self.active.add(section)
+
+    def unload(self, section, blocks, spatial_grid):
+        """Writes the section's blocks back into the layout (so edits survive) and drops them."""
+        x0, y0, x1, y1 = self.section_box(section)
+        leaving, placed = [], []
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                # Edge sections reach past the layout; blocks built out there are kept as placed blocks instead
+                inside = x < self.layout.width and y < self.layout.height
+                code = dungeon.OPEN
+                for block in blocks.blocks_at((x, y)):
+                    leaving.append(block)
+                    cell = dungeon.BLOCK_TYPE_CELLS.get(block.type)
+                    if cell is None or not inside:
+                        placed.append((x, y, block.type, block.layer))
+                    elif code == dungeon.OPEN:
+                        code = cell
+                if inside:
+                    self.layout.set_cell(x, y, code)
+        for block in leaving:
+            spatial_grid.remove(block, block.rect)
+        blocks.remove_many(leaving)
+        if placed:
+            self.placed[section] = placed
+        self.active.discard(section)
+
+    def dormant_enemy_count(self):
+        return sum(len(records) for records in self.dormant.values())
@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from src.game.core import assets
+
+
+class Block:
+    """Just the parts of Voxel that BlockList, the dungeon streamer, the horde and the flow field rely on."""
+
+    def __init__(self, x, y, block_type='stone', solid=True):
+        self.grid_pos = pygame.Vector2(x, y)
+        self.rect = pygame.Rect(x * assets.BLOCK_SIZE, y * assets.BLOCK_SIZE, assets.BLOCK_SIZE, assets.BLOCK_SIZE)
+        self.type = block_type
+        self.is_solid = solid
+        self.layer = 1
+        self.block_list = None
+
+    def set_type(self, block_type):
+        old_type, self.type = self.type, block_type
+        if self.block_list is not None:
+            self.block_list.type_changed(self, old_type)
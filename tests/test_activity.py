@@ -0,0 +1,61 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from src.game.systems.activity import EnemyActivity
+
+
+class Enemy:
+    """Just the parts of EnemyController that EnemyActivity looks at."""
+
+    def __init__(self, x, aggro_radius=100):
+        self.pos = pygame.Vector2(x, 0)
+        self.aggro_radius = aggro_radius
+        self.ai_state = 'wandering'
+        self.is_attacking = False
+
+
+def run_ticks(activity, enemies, player_pos, ticks, dt=0.25):
+    """Returns enemy -> [dt of each update it got]."""
+    updates = {enemy: [] for enemy in enemies}
+    for _ in range(ticks):
+        for enemy, enemy_dt in activity.schedule(enemies, player_pos, dt):
+            updates[enemy].append(enemy_dt)
+    return updates
+
+
+def test_tiers_update_at_their_rates_without_losing_time():
+    """Test that near enemies update every tick, mid ones every fourth with the missed time and far ones not at all."""
+    near, mid, far = Enemy(50), Enemy(300), Enemy(5000)
+    activity = EnemyActivity(near_radius=200, mid_radius=1000, mid_interval=4, cell_size=256)
+    updates = run_ticks(activity, [near, mid, far], (0, 0), 8)
+    assert updates[near] == [0.25] * 8
+    assert len(updates[mid]) == 2 and sum(updates[mid]) == pytest.approx(2.0)
+    assert updates[far] == [] and activity.counts() == (1, 1)
+
+
+def test_sleepers_wake_when_the_player_comes_within_aggro():
+    """Test that a sleeper with a long aggro radius wakes before the player reaches mid range, and keeps updating while chasing."""
+    boss = Enemy(3000, aggro_radius=1500)
+    activity = EnemyActivity(near_radius=200, mid_radius=1000, mid_interval=4, cell_size=256)
+    run_ticks(activity, [boss], (0, 0), 1)
+    assert boss in activity.asleep
+    run_ticks(activity, [boss], (1600, 0), 1) # Inside its aggro radius, still outside mid range
+    assert boss not in activity.asleep
+    boss.ai_state = 'chasing'
+    assert run_ticks(activity, [boss], (1600, 0), 3)[boss] == [0.5, 0.25, 0.25] # The tick it waited at mid rate comes first
+
+
+def test_retain_forgets_removed_enemies():
+    """Test that enemies dropped from the list (killed or streamed out) leave no sleeper or pending entry behind."""
+    enemies = [Enemy(300), Enemy(5000), Enemy(5200)]
+    activity = EnemyActivity(near_radius=200, mid_radius=1000, cell_size=256)
+    run_ticks(activity, enemies, (0, 0), 1)
+    activity.retain(enemies[2:])
+    assert activity.counts() == (0, 1) and list(activity.asleep) == [enemies[2]]
+    assert sum(len(sleepers) for sleepers in activity.sleeping.values()) == 1
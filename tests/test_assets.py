@@ -0,0 +1,71 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.core import assets
+
+
+def test_textures_are_built_on_first_access():
+    """Test that membership checks don't load and lookups are memoized."""
+    registry = assets.TextureRegistry(assets.TEXTURE_MANIFEST)
+    assert 'dirt' in registry and 'not_a_block' not in registry
+    assert registry.loaded() == []
+    dirt = registry['dirt']
+    assert dirt.get_size() == (assets.BLOCK_SIZE, assets.BLOCK_SIZE)
+    assert registry['dirt'] is dirt
+    assert registry.get('not_a_block') is None
+
+
+def test_missing_files_use_the_fallback():
+    """Test that an entry whose file is missing gets its fallback, and derived entries build on it."""
+    registry = assets.TextureRegistry({
+        'missing': {'file': 'does_not_exist.png', 'size': (2, 1), 'fallback': (1, 2, 3)},
+        'derived': {'derive': 'missing', 'build': lambda base: base.copy()},
+    })
+    assert registry['missing'].get_size() == (assets.BLOCK_SIZE * 2, assets.BLOCK_SIZE)
+    assert tuple(registry['missing'].get_at((0, 0)))[:3] == (1, 2, 3)
+    assert registry['derived'].get_size() == registry['missing'].get_size()
+
+
+def test_legacy_texture_attributes():
+    """Test that module attributes like assets.dirt_texture still resolve."""
+    assert assets.dirt_texture is assets.textures['dirt']
+    assert assets.inventory_slot_texture is assets.sprites['inventory_slot']
+    assert len(assets.avg_colors['stone']) >= 3
+    with pytest.raises(AttributeError):
+        assets.not_a_thing_texture
+
+
+def test_texture_cache_round_trip(tmp_path):
+    """Test that cached surfaces come back pixel-identical and a changed source invalidates the cache."""
+    import pygame
+    from src.game.core.asset_cache import TextureCache, source_stamps, write_cache
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'a.png').write_bytes(b'original')
+    image = pygame.Surface((4, 2), pygame.SRCALPHA)
+    image.fill((10, 20, 30, 40))
+    path = str(tmp_path / 'cache.bin')
+    write_cache(path, 'key', source_stamps(str(source), ['a.png']), {'textures/a': image}, {'textures/a': (1, 2, 3, 4)})
+
+    cache = TextureCache(path)
+    assert cache.open('key', str(source), ['a.png'])
+    surface, entry = cache.get('textures/a')
+    assert surface.get_size() == (4, 2) and entry['alpha']
+    assert tuple(surface.get_at((3, 1))) == (10, 20, 30, 40)
+    assert cache.avg_color('textures/a') == (1, 2, 3, 4)
+    assert not cache.open('other key', str(source), ['a.png'])
+
+    (source / 'a.png').write_bytes(b'modified source') # A different size, so the stamp changes even where mtimes are coarse
+    assert not cache.open('key', str(source), ['a.png'])
+
+
+def test_cache_key_tracks_tint_changes(monkeypatch):
+    """Test that changing a tint changes the texture cache key, even though every tint builder shares a name."""
+    key = assets._cache_key()
+    entry = dict(assets.TEXTURE_MANIFEST['shipping_bin'], build=assets._tinted((1, 2, 3)))
+    monkeypatch.setitem(assets.TEXTURE_MANIFEST, 'shipping_bin', entry)
+    assert assets._cache_key() != key
@@ -0,0 +1,46 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from src.game.core.atlas import ShelfPacker, TextureAtlas
+
+
+def _surface(size, color, alpha=False):
+    surface = pygame.Surface(size, pygame.SRCALPHA if alpha else 0)
+    surface.fill(color)
+    return surface
+
+
+def test_shelf_packer_never_overlaps():
+    """Test that packed rects stay inside the page and don't overlap."""
+    packer = ShelfPacker(160, 160, padding=1)
+    rects = [packer.insert(w, h) for w, h in [(32, 32), (20, 40), (32, 32), (60, 16), (16, 16)] * 3]
+    placed = [r for r in rects if r]
+    assert len(placed) == 15
+    for i, rect in enumerate(placed):
+        assert pygame.Rect(0, 0, 160, 160).contains(rect)
+        assert rect.collidelist(placed[i + 1:]) == -1
+    assert packer.insert(200, 10) is None
+
+
+def test_regions_are_shared_and_keep_their_pixels():
+    """Test that lookups are memoized, variants get their own region and opaque/alpha images use separate pages."""
+    atlas = TextureAtlas({'red': _surface((8, 8), (255, 0, 0)), 'ghost': _surface((8, 8), (0, 0, 255, 100), alpha=True)}, page_size=64)
+    page, rect = atlas.region('red')
+    assert atlas.region('red') is atlas.region('red')
+    assert tuple(page.get_at(rect.topleft))[:3] == (255, 0, 0)
+
+    dark_page, dark_rect = atlas.region('red', shades=(128,))
+    assert dark_rect != rect and dark_page.get_at(dark_rect.topleft)[0] < 255
+    big_page, big_rect = atlas.region('red', (16, 16))
+    assert big_rect.size == (16, 16)
+
+    ghost_page, ghost_rect = atlas.region('ghost')
+    assert ghost_page is not page
+    assert tuple(ghost_page.get_at(ghost_rect.topleft)) == (0, 0, 255, 100)
+    assert atlas.page_count() == 2
+    assert atlas.region('missing') is None
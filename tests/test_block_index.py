@@ -0,0 +1,84 @@
+import pytest
+import sys
+import os
+import random
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from src.game.world.block_index import BlockList, IndexedRandomSet
+from tests.conftest import Block
+
+
+def test_counts_follow_list_edits_and_type_changes():
+    """Test that the per-type counts match a full scan after random adds, removes and type changes."""
+    rng = random.Random(3)
+    types = ['stone', 'dirt', 'iron_ore', 'wood']
+    blocks = BlockList(Block(x, 0, rng.choice(types)) for x in range(50))
+    for step in range(500):
+        action = rng.random()
+        if action < 0.3:
+            blocks.append(Block(rng.randrange(100), rng.randrange(5), rng.choice(types)))
+        elif action < 0.5 and blocks:
+            blocks.remove(rng.choice(blocks))
+        elif action < 0.6 and blocks:
+            del blocks[rng.randrange(len(blocks))]
+        elif blocks:
+            rng.choice(blocks).set_type(rng.choice(types))
+    for block_type in types:
+        assert blocks.count_type(block_type) == sum(1 for b in blocks if b.type == block_type)
+        assert set(blocks.blocks_of(block_type)) == {b for b in blocks if b.type == block_type}
+
+
+def test_position_lookup():
+    """Test solid and occupancy lookups by position, including removed blocks."""
+    grass = Block(2, 5, 'grass_block')
+    flower = Block(2, 4, 'tall_grass', solid=False)
+    blocks = BlockList([grass, flower])
+    assert blocks.is_solid_at((2.0, 5.0)) and not blocks.is_solid_at((2, 4))
+    assert list(blocks.blocks_at((2, 4))) == [flower]
+    blocks.pop(0)
+    assert not blocks.is_solid_at((2, 5)) and grass.block_list is None
+
+
+def test_indexed_random_set_swap_remove():
+    """Test that removals keep the item -> index map consistent and choices stay uniform over what's left."""
+    items = IndexedRandomSet(range(10))
+    for value in (0, 9, 4):
+        items.remove(value)
+    assert sorted(items) == [1, 2, 3, 5, 6, 7, 8]
+    assert all(items.items[i] == item for item, i in items.index.items())
+    rng = random.Random(1)
+    seen = {items.choice(rng) for _ in range(500)}
+    assert seen == set(items)
+    with pytest.raises(KeyError):
+        items.remove(4)
+
+
+def test_clear_above_matches_probing():
+    """Test the column check against probing the 14 cells above each block, as tree placement used to."""
+    rng = random.Random(7)
+    blocks = BlockList(Block(rng.randrange(6), rng.randrange(40), 'stone', solid=rng.random() < 0.7) for _ in range(120))
+    solid = {(int(b.grid_pos.x), int(b.grid_pos.y)) for b in blocks if b.is_solid}
+    for x in range(6):
+        for y in range(40):
+            probed = not any((x, y - dy) in solid for dy in range(1, 15))
+            assert blocks.is_clear_above((x, y), 14) == probed
+
+
+def test_respawn_lands_above_blocks_in_any_occupied_cell():
+    """Test that a block under either side of a spawn point that straddles two columns moves the respawn up."""
+    from src.game.core import assets
+    from src.game.entities.player import PlayerController
+    B = assets.BLOCK_SIZE
+    blocks = BlockList([Block(x, 10, 'stone') for x in range(-3, 4)])
+    player = PlayerController((B // 2, 9 * B))
+    player.start_pos = pygame.Vector2(B // 2, 9 * B)
+    player.respawn(all_blocks=blocks)
+    assert player.pos.y == 9 * B # Nothing in the way
+    blocks.append(Block(1, 8, 'stone')) # Under the right half only
+    blocks.append(Block(1, 9, 'stone'))
+    player.respawn(all_blocks=blocks)
+    assert player.rect.bottom <= 8 * B
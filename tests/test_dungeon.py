@@ -0,0 +1,42 @@
+import pytest
+import sys
+import os
+import random
+from collections import deque
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.world import dungeon
+
+
+def reachable(layout, start):
+    seen, queue = {start}, deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (nx, ny) not in seen and layout.cell(nx, ny) != dungeon.STONE:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return seen
+
+
+def test_every_floor_is_connected():
+    """Test that every non-stone cell on every floor can be reached from the spawn point, through the shafts."""
+    layout = dungeon.generate_layout(41, 30, floors=3, rng=random.Random(5))
+    cells = {(x, y) for y in range(layout.height) for x in range(layout.width) if layout.cell(x, y) != dungeon.STONE}
+    assert reachable(layout, layout.spawn) == cells
+    assert all(layout.cell(x, y) == dungeon.OPEN for x, y in (layout.spawn, layout.floors[0].exit))
+
+
+def test_chests_and_enemies_come_from_open_cells():
+    """Test that chests become chest blocks with loot, enemies stand in open cells, and solid_cells matches the grid."""
+    layout = dungeon.generate_layout(61, 61, floors=2, rng=random.Random(9))
+    chests = dict(layout.chests())
+    assert chests and all(layout.cell(x, y) == dungeon.CHEST for x, y in chests)
+    assert all(len(entity['inventory']) == dungeon.CHEST_SLOTS for entity in chests.values())
+    spawns = list(layout.enemy_spawns())
+    assert spawns and all(layout.cell(x, y) == dungeon.OPEN for x, y, _ in spawns)
+    solid = {(x, y): block_type for x, y, block_type in layout.solid_cells()}
+    assert {pos for pos, block_type in solid.items() if block_type == 'chest'} == set(chests)
+    assert len(solid) == sum(1 for y in range(layout.height) for x in range(layout.width) if layout.is_solid(x, y))
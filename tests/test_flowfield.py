@@ -0,0 +1,85 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from src.game.core import assets
+from src.game.systems.flowfield import FlowField
+from src.game.world.block_index import BlockList
+from tests.conftest import Block
+
+B = assets.BLOCK_SIZE
+
+
+def standing_rect(x, y):
+    """A player-sized rect standing on tile (x, y)."""
+    return pygame.Rect(x * B + 4, (y + 1) * B - 56, 24, 56)
+
+
+def tower_with_stairs():
+    """A floor at y = 20, a 6-high tower at x = 20..22 and floating steps at the far left leading to a bridge onto it.
+
+    Heading straight for the tower runs into its wall; the only way up is left to the steps, then back along the bridge.
+    """
+    cells = [(x, 20) for x in range(-5, 40)]
+    cells += [(x, y) for x in range(20, 23) for y in range(14, 20)]
+    cells += [(3, 18), (4, 16), (5, 14)] # Each step is 2 up from the last
+    cells += [(x, 14) for x in range(6, 20)]
+    return BlockList(Block(x, y) for x, y in cells)
+
+
+def test_path_goes_around_to_reach_the_tower_top():
+    """Test that following next_step from under the bridge leads over the steps and the bridge to the player."""
+    blocks = tower_with_stairs()
+    field = FlowField(radius=60)
+    assert field.update(standing_rect(21, 13), blocks)
+    assert field.target == (21, 13)
+    tile, path = (10, 19), [(10, 19)]
+    while tile != field.target and len(path) < 100:
+        tile = field.next_step[tile]
+        path.append(tile)
+    assert tile == field.target
+    assert path[path.index((4, 19)):path.index((5, 13)) + 1] == [(4, 19), (3, 17), (4, 15), (5, 13)] # Up the steps
+    assert field.step_at((10, 19)) == (-1, False) # Away from the player, toward the steps
+    assert field.step_at((4, 19)) == (-1, True) # Jump onto the first step
+
+
+def test_search_only_reruns_when_the_player_tile_or_blocks_change():
+    """Test that an unchanged tile and block list reuse the field, and that either changing searches again."""
+    blocks = tower_with_stairs()
+    field = FlowField(radius=60)
+    field.update(standing_rect(21, 13), blocks)
+    field.update(standing_rect(21, 13).move(5, -20), blocks) # Same tile, mid-hop
+    assert field.searches == 1
+    field.update(standing_rect(22, 13), blocks)
+    assert field.searches == 2
+    blocks.extend([Block(8, 13), Block(8, 12), Block(8, 11)]) # Wall off the bridge, too high to jump
+    field.update(standing_rect(22, 13), blocks)
+    assert field.searches == 3 and field.step_at((5, 13)) is None
+
+
+def test_searches_are_rate_limited():
+    """Test that changes within interval calls of a search wait for it, then get one search between them."""
+    blocks = tower_with_stairs()
+    field = FlowField(radius=60, interval=3)
+    field.update(standing_rect(21, 13), blocks)
+    blocks.append(Block(8, 13))
+    assert not field.update(standing_rect(22, 13), blocks)
+    blocks.append(Block(8, 12))
+    assert not field.update(standing_rect(22, 13), blocks)
+    assert field.update(standing_rect(22, 13), blocks)
+    assert field.searches == 2 and field.target == (22, 13)
+
+
+def test_unreachable_and_far_tiles_have_no_step():
+    """Test that a sealed-off pocket and tiles past the radius get no step, so enemies fall back to plain chasing."""
+    cells = [(x, 10) for x in range(0, 100)] + [(30, 9), (30, 8), (30, 7), (30, 6)] # A wall too tall to jump
+    field = FlowField(radius=20)
+    field.update(standing_rect(5, 9), BlockList(Block(x, y) for x, y in cells))
+    assert field.step_at((20, 9)) == (-1, False)
+    assert field.step_at((29, 9)) is None # Past the radius
+    assert field.step_at((31, 9)) is None # Behind the wall
@@ -0,0 +1,52 @@
+import pytest
+import sys
+import os
+import subprocess
+
+# Add the project root to the path for testing
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pygame
+from src.game.systems.headless import InputScript, default_input_script
+
+
+def test_scripted_keys_follow_tick_ranges():
+    """Test that held keys are only reported inside their tick range."""
+    script = InputScript().hold(pygame.K_d, 10, 20)
+    assert not script.keys_at(9)[pygame.K_d]
+    assert script.keys_at(10)[pygame.K_d]
+    assert not script.keys_at(20)[pygame.K_d]
+    assert not script.keys_at(15)[pygame.K_a]
+
+
+def test_scripted_events_are_due_on_their_tick():
+    """Test that posted events are returned for their tick only."""
+    script = InputScript().post(5, pygame.KEYDOWN, key=pygame.K_1)
+    assert script.events_at(4) == []
+    assert script.events_at(5)[0].key == pygame.K_1
+
+
+def test_default_script_moves_both_ways():
+    """Test that the default script walks in both directions."""
+    script = default_input_script(240)
+    assert script.keys_at(0)[pygame.K_d]
+    assert script.keys_at(150)[pygame.K_a]
+
+
+def test_headless_run_exits_cleanly():
+    """Test that main.py runs a short headless simulation without a display."""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    result = subprocess.run([sys.executable, 'main.py', '--headless', '--ticks', '30'],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert 'Simulated 30 ticks' in result.stdout
+
+
+def test_headless_dungeon_run_streams_sections():
+    """Test that a headless run can simulate a streamed dungeon."""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    result = subprocess.run([sys.executable, 'main.py', '--headless', '--world', 'dungeon', '--ticks', '30'],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert 'Simulated 30 ticks' in result.stdout
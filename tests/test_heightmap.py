@@ -0,0 +1,43 @@
+import pytest
+import sys
+import os
+import random
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.world.heightmap import HeightMap
+
+
+def test_tops_match_brute_force():
+    """Test top_solid and top_any against a scan after random adds, removes and solidity changes on both sides of x = 0."""
+    rng = random.Random(11)
+    heights, blocks = HeightMap(), []
+    for step in range(2000):
+        if blocks and rng.random() < 0.4:
+            x, y, solid = blocks.pop(rng.randrange(len(blocks)))
+            heights.remove(x, y, solid)
+        elif blocks and rng.random() < 0.2:
+            i = rng.randrange(len(blocks))
+            x, y, solid = blocks[i]
+            blocks[i] = (x, y, not solid)
+            heights.set_solid(x, y, not solid)
+        else:
+            block = (rng.randrange(-20, 20), rng.randrange(0, 50), rng.random() < 0.6)
+            blocks.append(block)
+            heights.add(*block)
+    for x in range(-25, 25):
+        solid_ys = [y for bx, y, solid in blocks if bx == x and solid]
+        any_ys = [y for bx, y, _ in blocks if bx == x]
+        assert heights.top_solid(x) == (min(solid_ys) if solid_ys else None)
+        assert heights.top_any(x) == (min(any_ys) if any_ys else None)
+
+
+def test_sky_exposure():
+    """Test that only blocks at or above a column's top solid block count as exposed."""
+    heights = HeightMap()
+    heights.add(3, 10, True)
+    heights.add(3, 14, True)
+    heights.add(3, 8, False) # Tall grass doesn't shade
+    assert heights.is_sky_exposed(3, 10) and not heights.is_sky_exposed(3, 14)
+    assert heights.is_sky_exposed(4, 99) and heights.x_range() == (3, 4)
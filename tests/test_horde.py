@@ -0,0 +1,132 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+np = pytest.importorskip('numpy')
+
+import random
+
+from src.game.core import assets
+from src.game.systems.horde import Horde, SolidGrid
+from src.game.world import dungeon
+from src.game.world.block_index import BlockList
+from src.game.world.streaming import DungeonStreamer
+from tests.conftest import Block
+
+B = assets.BLOCK_SIZE
+
+
+class Player:
+    """Just what the horde reads from and calls on PlayerController."""
+
+    def __init__(self, x, y):
+        self.pos = pygame.Vector2(x, y)
+        self.rect = pygame.Rect(x, y, B - 8, B * 2 - 8)
+        self.hits = []
+        self.xp = 0
+
+    def take_damage(self, amount, source=None, source_pos=None, particles_list=None):
+        self.hits.append((amount, source))
+
+    def add_xp(self, amount):
+        self.xp += amount
+
+
+class NoGrid:
+    def add(self, obj, rect):
+        pass
+
+    def remove(self, obj, rect):
+        pass
+
+
+def walled_floor():
+    """A floor at y = 10 from x = 0 to 40, with walls at x = 0 and x = 40."""
+    blocks = [Block(x, 10) for x in range(41)] + [Block(x, y) for x in (0, 40) for y in range(3, 10)]
+    return SolidGrid.from_blocks(blocks)
+
+
+def test_enemies_land_and_stay_inside_walls():
+    """Test that falling enemies land on the floor and that walls keep wanderers in, over many steps."""
+    horde = Horde(walled_floor(), capacity=4, rng=np.random.default_rng(1))
+    for x in range(2, 38, 3):
+        horde.spawn((x * B, 4 * B), 'zombie' if x % 2 else 'crawler')
+    far_away = Player(-1000 * B, 0)
+    for _ in range(600):
+        horde.update(1 / 60, far_away)
+    assert len(horde) == 12
+    assert horde.grounded[:12].all()
+    assert np.allclose(horde.pos[:12, 1] + horde.size[:12, 1], 10 * B)
+    assert (horde.pos[:12, 0] >= B).all() and (horde.pos[:12, 0] + horde.size[:12, 0] <= 40 * B).all()
+
+
+def test_attack_winds_up_then_lands_once_per_cooldown():
+    """Test that an enemy next to the player hits after the wind-up and then waits out its cooldown."""
+    horde = Horde(walled_floor(), rng=np.random.default_rng(2))
+    zombie = horde.spawn((20 * B, 10 * B - (B - 4)))
+    player = Player(20 * B + B // 2, 8 * B + 8)
+    for _ in range(20):
+        horde.update(1 / 60, player)
+    assert player.hits == []
+    for _ in range(20):
+        horde.update(1 / 60, player)
+    assert [source for _, source in player.hits] == [zombie]
+    for _ in range(30):
+        horde.update(1 / 60, player)
+    assert len(player.hits) == 1
+
+
+def test_killed_members_are_removed_and_rows_stay_matched():
+    """Test that removing dead enemies moves the last row into the gap and the moved member follows its row."""
+    horde = Horde(walled_floor())
+    members = [horde.spawn((x * B, 9 * B - 4), enemy_type) for x, enemy_type in ((5, 'zombie'), (10, 'crawler'), (15, 'zombie_brute'))]
+    player = Player(-1000 * B, 0)
+    members[0].take_damage(10000, player)
+    assert horde.enemies_in(pygame.Rect(0, 0, 40 * B, 20 * B)) == members[1:]
+    horde.update(1 / 60, player)
+    assert len(horde) == 2 and members[0].is_dying and members[0].index is None
+    assert members[2].index == 0 and horde.max_health[0] == 600
+    assert player.xp == 5
+
+
+def test_collision_grid_follows_block_changes():
+    """Test that mining and placing blocks in a followed BlockList updates the horde's grid."""
+    blocks = BlockList(Block(x, 10) for x in range(10))
+    horde = Horde()
+    horde.follow_blocks(blocks)
+
+    def solid(x, y):
+        return bool(horde.solid.lookup(np.array([x]), np.array([y]))[0])
+
+    assert solid(3, 10)
+    blocks.remove(blocks.blocks_at((3, 10))[0])
+    assert not solid(3, 10)
+    blocks.append(Block(3, 9))
+    assert solid(3, 9)
+
+
+def test_light_speed_freezes_lit_enemies():
+    """Test that only enemies in daylight or on lit tiles get a speed of 0 in darkness mode."""
+    horde = Horde(walled_floor())
+    horde.spawn((5 * B, 9 * B))
+    horde.spawn((20 * B, 9 * B))
+    assert horde.light_speed(1.0, {(5, 9)}).tolist() == [0.0, 3.0]
+    assert horde.light_speed(0.0, set()).tolist() == [0.0, 0.0]
+
+
+def test_streamed_common_enemies_load_into_the_horde():
+    """Test that a streamed dungeon loads common enemies into the horde and puts them back to sleep when they leave."""
+    layout = dungeon.generate_layout(161, 161, rng=random.Random(2))
+    streamer = DungeonStreamer(layout, Block, lambda record: pytest.fail('common enemies go to the horde'), section_size=32, radius=1)
+    total = streamer.dormant_enemy_count()
+    blocks, enemies, horde = BlockList(), [], Horde()
+    for x, y in ((16, 16), (80, 16), (144, 80), (16, 144)):
+        streamer.update(pygame.Vector2(x * B, y * B), blocks, enemies, NoGrid(), horde)
+        assert enemies == [] and len(horde) > 0
+        assert len(horde) + streamer.dormant_enemy_count() == total
+        assert all(streamer.section_at_pixel(member.pos) in streamer.active for member in horde.members)
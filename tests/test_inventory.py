@@ -0,0 +1,84 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.ui.inventory import PlayerInventory
+
+
+def test_every_kind_of_change_bumps_the_version():
+    """Test that slot assignment, in-place count edits, armor swaps and bulk loads are all seen."""
+    inventory = PlayerInventory()
+    events = []
+    inventory.subscribe(lambda event, index: events.append((event, index)))
+
+    inventory.add_item('stone', 5)
+    assert events[-1] == ('slot', 0)
+    version = inventory.version
+    inventory.slots[0]['count'] -= 1
+    assert inventory.version > version and events[-1] == ('slot', 0)
+
+    inventory.armor_slot = {'type': 'iron_armor', 'count': 1}
+    inventory.armor_slot['count'] = 1
+    assert events[-2:] == [('armor', None), ('armor', None)]
+
+    inventory.slots = [{'type': 'dirt', 'count': 3}] + [None] * 35
+    assert events[-1] == ('bulk', None)
+    assert inventory.has_item('dirt', 3) and not inventory.has_item('stone')
+
+
+def test_stacks_taken_out_stop_reporting():
+    """Test that a stack picked up into the hand no longer changes the inventory's version."""
+    inventory = PlayerInventory()
+    inventory.add_item('plank', 10)
+    held = inventory.get_slot(0)
+    inventory.set_slot(0, None)
+    version = inventory.version
+    held['count'] -= 5
+    assert inventory.version == version
+    inventory.set_slot(4, held)
+    held['count'] += 1
+    assert inventory.version > version and inventory.get_slot(4)['count'] == 6
+
+
+def test_index_matches_a_slot_scan():
+    """Test that counts, free slots and hotbar-first placement stay right through mixed operations."""
+    import random
+    rng = random.Random(7)
+    inventory = PlayerInventory()
+    inventory.max_stack_size = 20
+    types = ['stone', 'dirt', 'plank', 'coal']
+    for _ in range(500):
+        op = rng.random()
+        item_type = rng.choice(types)
+        if op < 0.4:
+            inventory.add_item(item_type, rng.randint(1, 30))
+        elif op < 0.6:
+            inventory.remove_item(item_type, rng.randint(1, 15))
+        elif op < 0.8:
+            slot = inventory.get_slot(rng.randrange(36))
+            if slot and slot['count'] > 1:
+                slot['count'] -= 1 # In-place edits, as the UIs do
+        else:
+            inventory.set_slot(rng.randrange(36), None)
+        for t in types:
+            assert inventory.count_item(t) == sum(s['count'] for s in inventory.slots if s and s['type'] == t)
+        assert inventory.free_slot_count() == inventory.slots.count(None)
+
+    inventory.slots = [None] * 36
+    inventory.set_slot(0, {'type': 'dirt', 'count': 1})
+    inventory.add_item('stone', 5)
+    assert inventory.get_slot(1)['type'] == 'stone' # First empty slot, hotbar first
+
+
+def test_bulk_transfer_from_a_chest():
+    """Test that a chest empties into the inventory and keeps only what didn't fit."""
+    inventory = PlayerInventory()
+    inventory.slots = [{'type': 'dirt', 'count': 1}] * 35 + [None]
+    chest = [{'type': 'stone', 'count': 4}, None, {'type': 'dirt', 'count': 2}, {'type': 'coal', 'count': 1}]
+    assert not inventory.transfer_from(chest)
+    assert chest == [None, None, None, {'type': 'coal', 'count': 1}]
+    assert inventory.count_item('stone') == 4 and inventory.count_item('dirt') == 37
+    assert inventory.add_stacks([{'type': 'coal', 'count': 3}]) == [{'type': 'coal', 'count': 3}]
@@ -0,0 +1,53 @@
+import pytest
+import sys
+import os
+import csv
+import json
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.systems.profiler import FrameProfiler
+
+
+def test_disabled_profiler_records_nothing():
+    """Test that scopes are no-ops while the profiler is off."""
+    profiler = FrameProfiler(enabled=False)
+    profiler.begin_frame()
+    with profiler.scope('render'):
+        pass
+    profiler.end_frame()
+    assert profiler.history == {}
+    assert profiler.scope('a') is profiler.scope('b')
+
+
+def test_percentiles_over_rolling_window():
+    """Test p50/p95/p99 and that old frames fall out of the window."""
+    profiler = FrameProfiler(window=100, enabled=True)
+    for ms in range(200):
+        profiler.record('work', 0.0, ms / 1000.0)
+        profiler.begin_frame()
+        profiler.end_frame()
+    assert len(profiler.history['work']) == 100
+    p50, p95, p99 = profiler.percentiles('work')
+    assert (p50, p95, p99) == pytest.approx((150, 195, 199))
+    assert profiler.summary()[0][0] == 'frame'
+
+
+def test_export_csv_and_chrome_trace(tmp_path):
+    """Test that a recording exports one CSV row per frame and a trace event per scope."""
+    profiler = FrameProfiler(enabled=True)
+    profiler.start_recording()
+    for _ in range(3):
+        profiler.begin_frame()
+        with profiler.scope('sim'):
+            pass
+        profiler.end_frame()
+    csv_path, trace_path = profiler.export(str(tmp_path))
+    with open(csv_path) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['frame_index', 'frame', 'sim']
+    assert len(rows) == 4
+    with open(trace_path) as f:
+        events = json.load(f)['traceEvents']
+    assert sum(1 for e in events if e['name'] == 'sim') == 3
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.core import definitions
+from src.game.core.recipes import RecipeIndex, recipe_index, trim_shape
+
+
+def _place(shape, row=0, col=0):
+    """Lays a shape into a flat 3x3 grid at an offset."""
+    grid = [None] * 9
+    for r, cells in enumerate(shape):
+        for c, item_type in enumerate(cells):
+            if item_type is not None:
+                grid[(row + r) * 3 + col + c] = item_type
+    return grid
+
+
+def test_every_recipe_matches_anywhere_it_fits():
+    """Test that each listed recipe is found wherever its shape is placed in the grid."""
+    for recipe in definitions.CRAFTING_RECIPES:
+        shape = trim_shape(recipe['shape'])
+        for row in range(4 - len(shape)):
+            for col in range(4 - len(shape[0])):
+                assert recipe_index.match(_place(shape, row, col))['result'] == recipe['result']
+
+
+def test_mirrored_and_shapeless_recipes():
+    """Test that flipped shapes only match mirrored recipes and shapeless ones match in any order."""
+    index = RecipeIndex([
+        {'shape': [['a', 'a'], ['b', None]], 'mirrored': True, 'result': {'type': 'hoe', 'count': 1}},
+        {'shape': [['c', None], ['d', 'd']], 'result': {'type': 'one_way', 'count': 1}},
+        {'ingredients': ['x', 'y', 'y'], 'shapeless': True, 'result': {'type': 'mix', 'count': 2}},
+    ])
+    assert index.match(_place([['a', 'a'], [None, 'b']]))['result']['type'] == 'hoe'
+    assert index.match(_place([[None, 'c'], ['d', 'd']])) is None
+    assert index.match(['y', None, None, None, 'x', None, None, None, 'y'])['result']['type'] == 'mix'
+    assert index.match(['y', 'x', None, None, None, None, None, None, None]) is None
+    assert index.match([None] * 9) is None
+    assert [r['result']['type'] for r in index.recipes_for('mix')] == ['mix']
+
+
+def test_craft_max_uses_the_grid_then_the_inventory():
+    """Test that shift-crafting makes every result in one go, and ctrl also draws on the inventory."""
+    from src.game.ui.inventory import PlayerInventory
+    from src.game.ui.crafting_ui import CraftingUI
+    inventory = PlayerInventory()
+    crafting = CraftingUI(inventory)
+    crafting.crafting_slots[4] = {'type': 'wood', 'count': 500}
+    crafting.check_recipe()
+    assert crafting.craft_max() == 500
+    assert inventory.count_item('plank') == 2000 and crafting.crafting_slots[4] is None and crafting.result_slot is None
+
+    inventory.add_item('wood', 99)
+    crafting.crafting_slots[0] = {'type': 'wood', 'count': 1}
+    assert crafting.craft_max(use_inventory=True) == 100
+    assert inventory.count_item('wood') == 0 and inventory.count_item('plank') == 2400
@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.systems.scheduler import TaskScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_task(clock, log, name, steps, cost):
+    for i in range(steps):
+        clock.now += cost
+        log.append((name, i))
+        yield
+    return name
+
+
+def test_run_stays_within_budget_and_round_robins():
+    """Test that each run stops once the budget is spent and that tasks take turns."""
+    clock, log, done = FakeClock(), [], []
+    scheduler = TaskScheduler(budget_ms=2.0, clock=clock)
+    scheduler.add('a', counting_task(clock, log, 'a', 4, 0.0005), done.append)
+    scheduler.add('b', counting_task(clock, log, 'b', 4, 0.0005), done.append)
+    assert scheduler.run() == 4 # 4 x 0.5 ms fills the 2 ms budget
+    assert log == [('a', 0), ('b', 0), ('a', 1), ('b', 1)]
+    while scheduler:
+        scheduler.run()
+    assert sorted(done) == ['a', 'b'] and len(log) == 8
+
+
+def test_slow_step_still_makes_progress_and_finish_drains():
+    """Test that a step over budget still runs once per frame, and that finish() completes named tasks."""
+    clock, log = FakeClock(), []
+    scheduler = TaskScheduler(budget_ms=2.0, clock=clock)
+    scheduler.add('slow', counting_task(clock, log, 'slow', 3, 0.010))
+    scheduler.add('save', counting_task(clock, log, 'save', 5, 0.0))
+    assert scheduler.run() == 1
+    scheduler.finish('save')
+    assert not scheduler.is_running('save') and scheduler.is_running('slow')
+    scheduler.cancel('slow')
+    assert len(scheduler) == 0
+
+
+def test_finish_runs_tasks_queued_by_callbacks():
+    """Test that finish() also completes a task that an on_done callback queues in place of an existing one."""
+    clock, log = FakeClock(), []
+    scheduler = TaskScheduler(clock=clock)
+
+    def follow_up(_):
+        scheduler.add('save', counting_task(clock, log, 'late save', 2, 0.0), replace=True)
+
+    scheduler.add('new_day', counting_task(clock, log, 'new_day', 2, 0.0), follow_up)
+    scheduler.add('save', counting_task(clock, log, 'save', 2, 0.0))
+    scheduler.finish()
+    assert len(scheduler) == 0
+    assert [name for name, _ in log] == ['new_day', 'new_day', 'late save', 'late save']
@@ -0,0 +1,38 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from src.game.core.sprite_cache import DAMAGE_FLASH, SpriteCache
+
+
+def _half_red():
+    """An 8x8 texture, red on the left half and blue on the right."""
+    surface = pygame.Surface((8, 8), pygame.SRCALPHA)
+    surface.fill((0, 0, 255, 255))
+    surface.fill((255, 0, 0, 255), pygame.Rect(0, 0, 4, 8))
+    return surface
+
+
+def test_variants_are_made_once_and_shared():
+    """Test that repeated lookups return the same surface and that sizes are normalised to ints."""
+    cache = SpriteCache({'zombie': _half_red()})
+    image = cache.get('zombie', (30, 28))
+    assert image.get_size() == (30, 28)
+    assert cache.get('zombie', (30.0, 28.0)) is image
+    assert cache.get('zombie', (30, 28), True) is cache.get('zombie', (30, 28), True)
+    assert len(cache.variants) == 2
+
+
+def test_flipped_and_flashed_pixels():
+    """Test that the flipped variant is mirrored and the flash variant is tinted without touching the base."""
+    cache = SpriteCache({'zombie': _half_red()})
+    base = cache.get('zombie', (8, 8))
+    flipped = cache.get('zombie', (8, 8), flipped=True)
+    assert tuple(base.get_at((0, 0)))[:3] == (255, 0, 0) and tuple(flipped.get_at((0, 0)))[:3] == (0, 0, 255)
+    flashed = cache.get('zombie', (8, 8), flipped=True, tint=DAMAGE_FLASH)
+    assert tuple(flashed.get_at((0, 0))) == (255, 100, 255, 255)
+    assert tuple(flipped.get_at((0, 0)))[:3] == (0, 0, 255)
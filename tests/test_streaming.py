@@ -0,0 +1,105 @@
+import pytest
+import sys
+import os
+import random
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from src.game.core import assets
+from src.game.world import dungeon
+from src.game.world.block_index import BlockList
+from src.game.world.streaming import DungeonStreamer
+from tests.conftest import Block
+
+
+class Enemy:
+    def __init__(self, record):
+        self.enemy_type = record['type']
+        self.pos = pygame.Vector2(record['pos'])
+        self.health = record['health'] or 10
+        self.is_dying = False
+
+
+class Grid:
+    def __init__(self):
+        self.objects = set()
+
+    def add(self, obj, rect):
+        self.objects.add(obj)
+
+    def remove(self, obj, rect):
+        self.objects.discard(obj)
+
+
+def pixel(x, y):
+    return pygame.Vector2(x * assets.BLOCK_SIZE, y * assets.BLOCK_SIZE)
+
+
+def test_only_nearby_sections_are_materialized():
+    """Test that walking across a dungeon keeps a 3x3 window loaded, conserves enemies and writes the cells back unchanged."""
+    layout = dungeon.generate_layout(161, 161, rng=random.Random(2))
+    original = bytes(layout.floors[0].cells)
+    streamer = DungeonStreamer(layout, Block, Enemy, section_size=32, radius=1)
+    total_enemies = streamer.dormant_enemy_count()
+    blocks, enemies, grid = BlockList(), [], Grid()
+
+    for x, y in ((1, 1), (80, 40), (150, 150), (40, 120), (1, 1)):
+        streamer.update(pixel(x, y), blocks, enemies, grid)
+        assert len(streamer.active) <= 9
+        expected = sum(1 for section in streamer.active for _ in layout.solid_cells(*streamer.section_box(section)))
+        assert len(blocks) == len(grid.objects) == expected
+        assert len(enemies) + streamer.dormant_enemy_count() == total_enemies
+        assert all(streamer.section_at_pixel(enemy.pos) in streamer.active for enemy in enemies)
+
+    for section in list(streamer.active):
+        streamer.unload(section, blocks, grid)
+    assert bytes(layout.floors[0].cells) == original and not blocks
+
+
+def test_edits_survive_unloading():
+    """Test that a mined cell stays open and a placed block comes back after its section reloads."""
+    layout = dungeon.generate_layout(96, 96, rng=random.Random(4))
+    streamer = DungeonStreamer(layout, Block, Enemy, section_size=32, radius=0)
+    blocks, enemies, grid = BlockList(), [], Grid()
+    streamer.update(pixel(1, 1), blocks, enemies, grid)
+    blocks.remove(blocks.blocks_at((0, 0))[0]) # Mine the corner
+    blocks.append(Block(1, 1, 'plank')) # And build where the player stands
+    streamer.update(pixel(90, 90), blocks, enemies, grid)
+    assert layout.cell(0, 0) == dungeon.OPEN
+    streamer.update(pixel(1, 1), blocks, enemies, grid)
+    assert not blocks.blocks_at((0, 0)) and blocks.blocks_at((1, 1))[0].type == 'plank'
+
+
+def test_blocks_past_the_layout_edge_survive_unloading():
+    """Test that blocks built in the part of an edge section past the layout are unloaded and come back."""
+    layout = dungeon.generate_layout(80, 80, rng=random.Random(5))
+    streamer = DungeonStreamer(layout, Block, Enemy, section_size=32, radius=0)
+    blocks, enemies, grid = BlockList(), [], Grid()
+    streamer.update(pixel(70, 70), blocks, enemies, grid)
+    loaded = len(blocks)
+    blocks.extend([Block(90, 70, 'stone'), Block(70, 90, 'plank')])
+    streamer.update(pixel(1, 1), blocks, enemies, grid)
+    assert not blocks.blocks_at((90, 70)) and not blocks.blocks_at((70, 90))
+    streamer.update(pixel(70, 70), blocks, enemies, grid)
+    assert len(blocks) == loaded + 2
+    assert blocks.blocks_at((90, 70))[0].type == 'stone' and blocks.blocks_at((70, 90))[0].type == 'plank'
+
+
+def test_enemies_leaving_the_loaded_sections_go_dormant():
+    """Test that an enemy wandering out of the loaded sections is put to sleep even while the player stays put."""
+    layout = dungeon.generate_layout(161, 161, rng=random.Random(3))
+    streamer = DungeonStreamer(layout, Block, Enemy, section_size=32, radius=0)
+    blocks, enemies, grid = BlockList(), [], Grid()
+    streamer.update(pixel(80, 80), blocks, enemies, grid)
+    total = len(enemies) + streamer.dormant_enemy_count()
+    wanderer = Enemy({'type': 'zombie', 'pos': pixel(70, 70), 'health': None})
+    enemies.append(wanderer)
+    assert not streamer.update(pixel(80, 80), blocks, enemies, grid)
+    wanderer.pos = pixel(100, 70) # Out past the edge of section (2, 2)
+    assert streamer.update(pixel(81, 80), blocks, enemies, grid)
+    assert wanderer not in enemies
+    assert len(enemies) + streamer.dormant_enemy_count() == total + 1
+    assert streamer.dormant[(3, 2)][-1]['pos'] == [100 * assets.BLOCK_SIZE, 70 * assets.BLOCK_SIZE]
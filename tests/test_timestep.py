@@ -0,0 +1,32 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.systems.timestep import FixedTimestep
+
+
+def test_ticks_are_independent_of_frame_rate():
+    """Test that the same real time yields the same number of ticks at any frame rate."""
+    fast, slow = FixedTimestep(60), FixedTimestep(60)
+    fast_ticks = sum(fast.advance(1 / 240) for _ in range(240))
+    slow_ticks = sum(slow.advance(1 / 30) for _ in range(30))
+    assert fast_ticks == slow_ticks == 60
+
+
+def test_long_frames_are_clamped():
+    """Test that a huge hitch is capped at max_steps ticks."""
+    timestep = FixedTimestep(60, max_steps=5)
+    assert timestep.advance(2.0) == 5
+    assert timestep.alpha < 1.0
+
+
+def test_alpha_and_reset():
+    """Test interpolation factor and that reset drops leftover time."""
+    timestep = FixedTimestep(50)
+    assert timestep.advance(0.03) == 1
+    assert timestep.alpha == pytest.approx(0.5)
+    timestep.reset()
+    assert timestep.alpha == 0.0
@@ -0,0 +1,39 @@
+import pytest
+import sys
+import os
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from src.game.ui.ui_cache import PanelCache, TextCache, slot_signature
+
+
+def test_panel_only_repaints_when_contents_change():
+    """Test that a panel is reused until its slot signature changes, including in-place count changes."""
+    cache = PanelCache()
+    slots = [{'type': 'stone', 'count': 3}, None]
+    painted = []
+
+    def draw():
+        return cache.get('inv', slot_signature(slots), (10, 10), painted.append)
+
+    first = draw()
+    assert draw() is first and len(painted) == 1
+    slots[0]['count'] -= 1
+    assert draw() is not first and len(painted) == 2
+    cache.invalidate('inv')
+    draw()
+    assert cache.repaints == 3
+
+
+def test_text_cache_reuses_renders():
+    """Test that the same font, text and color give back the same surface."""
+    pygame.font.init()
+    font = pygame.font.Font(None, 16)
+    cache = TextCache(max_entries=2)
+    white = cache.render(font, '12', (255, 255, 255))
+    assert cache.render(font, '12', (255, 255, 255)) is white
+    assert cache.render(font, '12', (0, 0, 0)) is not white
+    cache.render(font, '13', (0, 0, 0)) # Over the limit: the cache starts over
+    assert len(cache.entries) == 1
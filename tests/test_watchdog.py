@@ -0,0 +1,58 @@
+import pytest
+import sys
+import os
+import time
+
+# Add the project root to the path for testing
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game.systems.watchdog import SpikeWatchdog
+
+
+def slow_frame(watchdog, ms, context=None):
+    watchdog.begin_frame()
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+    return watchdog.end_frame(context)
+
+
+def test_fast_frames_write_nothing(tmp_path):
+    """Test that frames under the threshold only go into the ring buffer."""
+    watchdog = SpikeWatchdog(threshold_ms=50, history=3, directory=str(tmp_path), warmup_frames=0)
+    for _ in range(5):
+        assert slow_frame(watchdog, 1) is None
+    assert len(watchdog.frame_times) == 3
+    assert os.listdir(tmp_path) == []
+
+
+def test_spike_writes_context_and_profile(tmp_path):
+    """Test that a slow frame dumps its context and a pstats file."""
+    watchdog = SpikeWatchdog(threshold_ms=5, directory=str(tmp_path), profile_frames=True, warmup_frames=0)
+    path = slow_frame(watchdog, 10, lambda: {'area': 'mines', 'enemies': 42})
+    assert path and os.path.exists(path)
+    assert os.path.exists(path[:-len('.txt')] + '.prof')
+    with open(path) as f:
+        text = f.read()
+    assert 'area: mines' in text and 'enemies: 42' in text
+
+
+def test_snapshots_are_bounded(tmp_path):
+    """Test that old snapshots are deleted past max_snapshots."""
+    watchdog = SpikeWatchdog(threshold_ms=1, directory=str(tmp_path), max_snapshots=2, warmup_frames=0, cooldown=0, profile_window=0)
+    for _ in range(4):
+        slow_frame(watchdog, 2)
+    assert watchdog.snapshots_written == 4
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_spike_starts_a_profiling_window(tmp_path):
+    """Test that an unprofiled spike profiles the following frames and the next spike comes with a profile."""
+    watchdog = SpikeWatchdog(threshold_ms=5, directory=str(tmp_path), warmup_frames=0, cooldown=60, profile_window=10)
+    first = slow_frame(watchdog, 10)
+    assert first and not os.path.exists(first[:-len('.txt')] + '.prof')
+    slow_frame(watchdog, 1)
+    second = slow_frame(watchdog, 10) # Inside the cooldown, but it's the profiled spike being waited for
+    assert second and os.path.exists(second[:-len('.txt')] + '.prof')
+    assert watchdog.profile_until == 0
+    assert slow_frame(watchdog, 10) is None # Back to the cooldown